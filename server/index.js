@@ -9,6 +9,7 @@ const authRoutes = require('./routes/auth');
 const borewellRoutes = require('./routes/borewell');
 const weatherRoutes = require('./routes/weather');
 const predictionRoutes = require('./routes/prediction');
+const { getPredictionPool } = require('./services/predictionWorkerPool');
 
 const app = express();
 const PORT = process.env.PORT || 5000;
@@ -72,6 +73,8 @@ app.use('*', (req, res) => {
 
 app.listen(PORT, () => {
   console.log(`Server running on port ${PORT}`);
+  // Start the Python workers now so the first prediction request is warm
+  getPredictionPool();
 });
 
 module.exports = app;
@@ -0,0 +1,305 @@
+"""
+Streaming batch scoring of coordinate files.
+
+`score_file` reads a CSV or JSONL file of coordinates as a generator, scores it
+in fixed-size chunks (vectorised features and one model call per chunk) and
+streams each scored chunk to the output file, so memory stays flat however
+large the input is. Used by `python -m groundwater_predictor score`.
+
+With `workers` > 1 chunks are sharded across a process pool. Each worker
+process loads the model once in its initializer, results are written in input
+order, and inputs that fit in a single chunk are scored in-process.
+"""
+import csv
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from groundwater_predictor import (
+    GroundwaterPredictor, FEATURE_CACHE, OPTIONAL_FIELDS, resolve_fields, resolve_model_path
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+LATITUDE_KEYS = ('latitude', 'lat')
+LONGITUDE_KEYS = ('longitude', 'lng', 'lon')
+LEVEL_COLUMNS = ['currentWaterLevel', 'futureWaterLevel', 'isSuitableForBorewell']
+
+
+def detect_format(path: str) -> str:
+    """'csv' or 'jsonl' from a file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the format of {path}; use a .csv or .jsonl file or pass the format")
+
+
+class _UnreadableRow(dict):
+    """An input line that could not be parsed; `score_chunk` passes it through as an error row."""
+
+
+def read_rows(path: str, input_format: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Yield input rows as dicts, one at a time. A JSONL line that is not valid
+    JSON or not an object is yielded as {'line': n, 'error': ...} so the rest
+    of the file is still scored.
+    """
+    input_format = input_format or detect_format(path)
+    with open(path, newline='' if input_format == 'csv' else None) as f:
+        if input_format == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield _UnreadableRow(line=number, error=f"Invalid JSON on line {number}: {str(e)}")
+                    continue
+                if isinstance(row, dict):
+                    yield row
+                else:
+                    yield _UnreadableRow(line=number, error=f"Invalid row on line {number}: expected a JSON object")
+
+
+def iter_chunks(rows: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Group rows into lists of at most `chunk_size`."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _coordinate(row: Dict, keys) -> float:
+    for key in keys:
+        for candidate in (key, key.capitalize(), key.upper()):
+            if candidate in row and row[candidate] not in (None, ''):
+                return float(row[candidate])
+    raise ValueError(f"missing {keys[0]}")
+
+
+def output_columns(sections: Optional[frozenset]) -> List[str]:
+    """Prediction columns appended to each input row."""
+    optional = [field for field in OPTIONAL_FIELDS if sections is None or field in sections]
+    return LEVEL_COLUMNS + optional + ['error']
+
+
+def score_chunk(predictor: GroundwaterPredictor, rows: List[Dict],
+                sections: Optional[frozenset] = None, levels_only: bool = True) -> List[Dict]:
+    """
+    Score one chunk of input rows. Each output row is the input row plus the
+    prediction columns; rows with unusable coordinates get an `error` instead,
+    as do rows that are not dicts (kept under 'value') or could not be read.
+    `levels_only` uses the vectorised `predict_levels` path (numbers only).
+    """
+    rows = [row if isinstance(row, dict) else _UnreadableRow(value=row, error="Invalid row: expected an object")
+            for row in rows]
+    latitudes = np.full(len(rows), np.nan)
+    longitudes = np.full(len(rows), np.nan)
+    errors: List[Optional[str]] = [None] * len(rows)
+    for i, row in enumerate(rows):
+        if isinstance(row, _UnreadableRow):
+            errors[i] = row['error']
+            continue
+        try:
+            latitudes[i] = _coordinate(row, LATITUDE_KEYS)
+            longitudes[i] = _coordinate(row, LONGITUDE_KEYS)
+            if not (-90 <= latitudes[i] <= 90 and -180 <= longitudes[i] <= 180):
+                raise ValueError("coordinates out of range")
+        except (TypeError, ValueError) as e:
+            errors[i] = f"Invalid coordinates: {str(e)}"
+
+    valid = np.array([error is None for error in errors], dtype=bool)
+    predictions: List[Dict] = [{} for _ in rows]
+    if valid.any():
+        indices = np.flatnonzero(valid).tolist()
+        if levels_only:
+            levels = predictor.predict_levels(latitudes[valid], longitudes[valid])
+            current = levels['currentWaterLevel'].tolist()
+            future = levels['futureWaterLevel'].tolist()
+            suitable = levels['isSuitableForBorewell'].tolist()
+            for j, i in enumerate(indices):
+                predictions[i] = {
+                    'currentWaterLevel': round(current[j], 2),
+                    'futureWaterLevel': round(future[j], 2),
+                    'isSuitableForBorewell': suitable[j]
+                }
+        else:
+            results = predictor.predict_water_levels(latitudes[valid], longitudes[valid], sections=sections)
+            for i, result in zip(indices, results):
+                result.pop('location', None)
+                predictions[i] = result
+
+    return [
+        {**row, **prediction, 'error': error} if error else {**row, **prediction}
+        for row, prediction, error in zip(rows, predictions, errors)
+    ]
+
+
+# Set in each pool process by _init_worker
+_worker_state: Dict = {}
+
+
+def _init_worker(model_path: str, sections: Optional[frozenset], levels_only: bool, allow_fallback: bool = False):
+    """Pool initializer: load the model once per worker process."""
+    _worker_state['predictor'] = GroundwaterPredictor(model_path, FEATURE_CACHE, allow_fallback)
+    _worker_state['sections'] = sections
+    _worker_state['levels_only'] = levels_only
+
+
+def _score_chunk_in_worker(rows: List[Dict]) -> List[Dict]:
+    return score_chunk(_worker_state['predictor'], rows, _worker_state['sections'], _worker_state['levels_only'])
+
+
+def score_chunks(chunks: Iterable[List[Dict]], model_path: Optional[str] = None, sections: Optional[frozenset] = None,
+                 levels_only: bool = True, workers: int = 1, allow_fallback: bool = False) -> Iterator[List[Dict]]:
+    """
+    Score chunks of rows and yield the scored chunks in input order.
+    With `allow_fallback` a missing model file gives heuristic fallback levels
+    (scored a chunk at a time like model predictions) instead of an error.
+
+    With `workers` > 1 (0 means one per CPU) chunks are scored in a process
+    pool with at most two chunks in flight per worker, so memory stays bounded.
+    Falls back to in-process scoring when the input is a single chunk or the
+    pool cannot be started.
+    """
+    model_path = resolve_model_path(model_path)
+    workers = workers or os.cpu_count() or 1
+    chunks = iter(chunks)
+    # Look ahead one chunk: a single-chunk input is not worth starting a pool for
+    head = list(itertools.islice(chunks, 2))
+    chunks = itertools.chain(head, chunks)
+
+    executor = None
+    if workers > 1 and len(head) > 1:
+        try:
+            executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                           initargs=(model_path, sections, levels_only, allow_fallback))
+        except (OSError, ValueError, NotImplementedError) as e:
+            logger.error(f"Could not start {workers} scoring processes, scoring in-process: {str(e)}")
+
+    if executor is None:
+        predictor = GroundwaterPredictor(model_path, FEATURE_CACHE, allow_fallback)
+        for chunk in chunks:
+            yield score_chunk(predictor, chunk, sections, levels_only)
+        return
+
+    with executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_score_chunk_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_records(rows: Iterable[Dict], model_path: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  fields=None, detail: Optional[str] = None, workers: int = 1) -> List[Dict]:
+    """Score in-memory rows (dicts with latitude/longitude) and return them in input order."""
+    levels_only = fields is None and detail is None
+    sections = None if levels_only else resolve_fields(fields, detail)
+    scored = []
+    for chunk in score_chunks(iter_chunks(rows, chunk_size), model_path, sections, levels_only, workers):
+        scored.extend(chunk)
+    return scored
+
+
+class _RowWriter:
+    """
+    Write scored rows as CSV (nested values JSON-encoded) or JSONL.
+    CSV columns come from the first row; keys that only appear in later rows
+    (possible with JSONL input) are dropped, with a warning logged once.
+    """
+
+    def __init__(self, path: str, output_format: str, prediction_columns: List[str]):
+        self.output_format = output_format
+        self.prediction_columns = prediction_columns
+        self._file = open(path, 'w', newline='' if output_format == 'csv' else None)
+        self._csv = None
+        self._columns = frozenset()
+        self._warned = False
+
+    def write(self, rows: List[Dict]):
+        if self.output_format == 'jsonl':
+            self._file.writelines(json.dumps(row) + '\n' for row in rows)
+            return
+
+        if self._csv is None:
+            input_columns = [key for key in rows[0] if key not in self.prediction_columns]
+            self._csv = csv.DictWriter(self._file, input_columns + self.prediction_columns, extrasaction='ignore')
+            self._csv.writeheader()
+            self._columns = frozenset(self._csv.fieldnames)
+        if not self._warned:
+            extra = {key for row in rows for key in row if key not in self._columns}
+            if extra:
+                logger.warning(f"Dropping columns missing from the first row of the CSV output: {', '.join(sorted(extra))}")
+                self._warned = True
+        self._csv.writerows(
+            {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in row.items()}
+            for row in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+
+def score_file(input_path: str, output_path: str, model_path: Optional[str] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, fields=None, detail: Optional[str] = None,
+               input_format: Optional[str] = None, output_format: Optional[str] = None, workers: int = 1,
+               allow_fallback: bool = False) -> Dict:
+    """
+    Score every row of `input_path` and stream the results to `output_path`.
+
+    Without `fields`/`detail` only the water levels and suitability are written
+    (vectorised fast path); otherwise the selected response sections are added.
+    `workers` > 1 scores chunks in parallel processes and `allow_fallback`
+    tolerates a missing model file (see `score_chunks`).
+    Progress and throughput are logged after each chunk. Returns a summary.
+    """
+    input_format = input_format or detect_format(input_path)
+    output_format = output_format or detect_format(output_path)
+    levels_only = fields is None and detail is None
+    sections = None if levels_only else resolve_fields(fields, detail)
+
+    writer = _RowWriter(output_path, output_format, output_columns(frozenset() if levels_only else sections))
+
+    total = 0
+    errors = 0
+    start_time = time.perf_counter()
+    try:
+        chunks = iter_chunks(read_rows(input_path, input_format), chunk_size)
+        for scored in score_chunks(chunks, model_path, sections, levels_only, workers, allow_fallback):
+            writer.write(scored)
+            total += len(scored)
+            errors += sum(1 for row in scored if 'error' in row)
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"Scored {total} rows ({total / max(elapsed, 1e-9):.0f} rows/s)")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start_time
+    summary = {
+        'rows': total,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rowsPerSecond': round(total / max(elapsed, 1e-9), 1),
+        'output': output_path
+    }
+    logger.info(f"Scoring complete: {json.dumps(summary)}")
+    return summary
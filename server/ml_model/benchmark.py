@@ -0,0 +1,343 @@
+"""
+Offline performance benchmarks for the prediction engine.
+
+The repository ships no model file, so `build_reference_model` generates a
+deterministic 72-feature tree ensemble from a seed (random complete trees
+whose thresholds are drawn from real feature distributions) and saves it as a
+compiled .npz model. The suite times feature preparation, full predictions,
+confidence scoring, region classification and seasonal analysis at several
+batch sizes and writes the results as JSON. Given a baseline report from an
+earlier run, it flags stages that became slower than a threshold. With
+--concurrency it also measures serving throughput when `predict_groundwater`
+is called from 1 to N threads in one process.
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json
+    python benchmark.py --sizes --concurrency 1 2 4 8 16 32
+"""
+import argparse
+import datetime
+import hashlib
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from groundwater_predictor import (
+    GroundwaterPredictor, N_FEATURES, RESULT_CACHE, classify_regions, configure_threads, predict_groundwater,
+    region_mask
+)
+from tree_compiler import CompiledTreeEnsemble
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1, 1000, 100000)
+DEFAULT_THRESHOLD = 0.25  # Slowdown (fraction of the baseline median) reported as a regression
+DEFAULT_MIN_TIME = 1.0  # Seconds of repeats per stage and size
+MAX_REPEATS = 10000
+SINGLE_POINT_POOL = 10000  # Distinct points cycled through by single-point stages
+DEFAULT_CONCURRENCY = (1, 2, 4, 8, 16, 32)
+CONCURRENCY_REQUESTS = 2000  # Requests served at each thread count
+
+# (west, south, east, north) of the benchmark points
+BENCHMARK_BBOX = (68.0, 8.0, 97.0, 35.0)
+
+
+def build_reference_model(seed: int = 0, n_trees: int = 100, depth: int = 6,
+                          base: float = 18.0) -> CompiledTreeEnsemble:
+    """
+    Build a deterministic stand-in for the trained XGBoost model: `n_trees`
+    complete trees of `depth` levels over the 72 model features. Split
+    thresholds are quantiles of features computed for random Indian locations
+    and dates, so samples spread across the branches like they would with a
+    trained model.
+    """
+    rng = np.random.default_rng(seed)
+    west, south, east, north = BENCHMARK_BBOX
+    n_samples = 2000
+    dates = np.datetime64('2000-01-01') + rng.integers(0, 365 * 25, n_samples)
+    predictor = GroundwaterPredictor.__new__(GroundwaterPredictor)
+    predictor.feature_cache = None
+    samples = predictor.prepare_features_batch(rng.uniform(south, north, n_samples),
+                                               rng.uniform(west, east, n_samples), dates)
+
+    n_internal = 2 ** depth - 1
+    n_nodes = 2 * n_internal + 1
+    # Breadth-first layout: the children of node i are 2i + 1 and 2i + 2
+    children = np.arange(n_internal) * 2 + 1
+    feature, threshold, left, right, value = [], [], [], [], []
+    for tree in range(n_trees):
+        offset = tree * n_nodes
+        split_features = rng.integers(0, N_FEATURES, n_internal)
+        quantiles = rng.uniform(0.1, 0.9, n_internal)
+        feature.append(np.concatenate([split_features, np.full(n_nodes - n_internal, -1)]))
+        threshold.append(np.concatenate([
+            [np.quantile(samples[:, j], q) for j, q in zip(split_features, quantiles)],
+            np.zeros(n_nodes - n_internal)
+        ]))
+        left.append(np.concatenate([children + offset, np.full(n_nodes - n_internal, -1)]))
+        right.append(np.concatenate([children + 1 + offset, np.full(n_nodes - n_internal, -1)]))
+        value.append(np.concatenate([np.zeros(n_internal), rng.normal(0.0, 0.5, n_nodes - n_internal)]))
+
+    return CompiledTreeEnsemble(
+        np.concatenate(feature), np.concatenate(threshold), np.concatenate(left), np.concatenate(right),
+        np.zeros(n_trees * n_nodes, dtype=bool), np.concatenate(value), np.arange(n_trees) * n_nodes,
+        base=base, strict=True, float32_sum=True, n_features=N_FEATURES, source=f'reference-seed{seed}'
+    )
+
+
+def model_fingerprint(model: CompiledTreeEnsemble) -> str:
+    """Short hash of the node arrays, so reports from different models are not compared by accident."""
+    digest = hashlib.sha1()
+    for array in (model.feature, model.threshold, model.left, model.value, model.roots):
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:12]
+
+
+def benchmark_points(n: int, seed: int = 0):
+    """Deterministic latitudes and longitudes inside `BENCHMARK_BBOX`."""
+    rng = np.random.default_rng(seed + 1)
+    west, south, east, north = BENCHMARK_BBOX
+    return rng.uniform(south, north, n), rng.uniform(west, east, n)
+
+
+def _stages(predictor: GroundwaterPredictor, size: int, seed: int = 0) -> Dict[str, Callable]:
+    """
+    The timed operations for one batch size. Size 1 uses the scalar code
+    paths and moves to the next of `SINGLE_POINT_POOL` points on every call,
+    so memoised lookups are not timed as hits.
+    """
+    lat, lng = benchmark_points(SINGLE_POINT_POOL if size == 1 else size, seed)
+    features = predictor.prepare_features_batch(lat, lng)
+    predictions = np.clip(np.asarray(predictor.model.predict(features), dtype=float), 0, 100)
+
+    if size == 1:
+        latitudes, longitudes, levels = lat.tolist(), lng.tolist(), predictions.tolist()
+        cursor = itertools.cycle(range(SINGLE_POINT_POOL))
+
+        def single(function):
+            def call():
+                i = next(cursor)
+                return function(i, latitudes[i], longitudes[i])
+            return call
+
+        return {
+            'prepare_features': single(lambda i, la, lo: predictor.prepare_features(la, lo)),
+            'predict_water_level': single(lambda i, la, lo: predictor.predict_water_level(la, lo)),
+            'confidence': single(lambda i, la, lo: predictor._compute_confidence_components(
+                features[i:i + 1], levels[i], la, lo)),
+            'region_classification': single(lambda i, la, lo: region_mask(la, lo)),
+            'seasonal_analysis': single(lambda i, la, lo: predictor._generate_seasonal_analysis(levels[i], la, lo))
+        }
+
+    return {
+        'prepare_features': lambda: predictor.prepare_features_batch(lat, lng),
+        'predict_water_level': lambda: predictor.predict_water_levels(lat, lng),
+        'confidence': lambda: predictor._compute_confidence_components_batch(features, predictions, lat, lng),
+        'region_classification': lambda: classify_regions(lat, lng),
+        'seasonal_analysis': lambda: predictor._generate_seasonal_analyses(predictions, lat, lng)
+    }
+
+
+def time_call(function: Callable, min_time: float = DEFAULT_MIN_TIME, max_repeats: int = MAX_REPEATS) -> Dict:
+    """Call `function` repeatedly for about `min_time` seconds (at least once) and summarise the timings."""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeats:
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - started >= min_time:
+            break
+    timings = np.array(timings) * 1000
+    return {
+        'repeats': len(timings),
+        'medianMs': round(float(np.median(timings)), 4),
+        'minMs': round(float(timings.min()), 4)
+    }
+
+
+def run_concurrency(model_path: str, thread_counts=DEFAULT_CONCURRENCY, requests: int = CONCURRENCY_REQUESTS,
+                    seed: int = 0) -> Dict[str, Dict]:
+    """
+    Serve `requests` single-point `predict_groundwater` calls from a pool of
+    each number of threads in `thread_counts` and report throughput and
+    latency percentiles. Every request is a distinct point and the result
+    cache is disabled, so each one reaches the model.
+    """
+    lat, lng = benchmark_points(requests, seed)
+    latitudes, longitudes = lat.tolist(), lng.tolist()
+    max_entries = RESULT_CACHE.max_entries
+    RESULT_CACHE.max_entries = 0
+    results = {}
+    try:
+        predict_groundwater(latitudes[0], longitudes[0], model_path)
+        for threads in thread_counts:
+            latencies = np.zeros(requests)
+
+            def serve(i):
+                start = time.perf_counter()
+                predict_groundwater(latitudes[i], longitudes[i], model_path)
+                latencies[i] = time.perf_counter() - start
+
+            with ThreadPoolExecutor(threads) as executor:
+                started = time.perf_counter()
+                list(executor.map(serve, range(requests)))
+                elapsed = time.perf_counter() - started
+            latencies *= 1000
+            results[str(threads)] = {
+                'requests': requests,
+                'seconds': round(elapsed, 4),
+                'requestsPerSecond': round(requests / elapsed, 1),
+                'p50Ms': round(float(np.percentile(latencies, 50)), 4),
+                'p99Ms': round(float(np.percentile(latencies, 99)), 4)
+            }
+            logger.info(f"{threads} threads: {results[str(threads)]['requestsPerSecond']} requests/s, "
+                        f"p99 {results[str(threads)]['p99Ms']} ms")
+    finally:
+        RESULT_CACHE.max_entries = max_entries
+    return results
+
+
+def run_benchmarks(model_path: Optional[str] = None, sizes=DEFAULT_SIZES, stages: Optional[List[str]] = None,
+                   min_time: float = DEFAULT_MIN_TIME, seed: int = 0, concurrency=None,
+                   concurrency_requests: int = CONCURRENCY_REQUESTS, intra_op_threads: Optional[int] = None) -> Dict:
+    """
+    Time every stage at every batch size and return a JSON-ready report.
+    Without `model_path` the seeded reference model is built and used.
+    `concurrency` lists thread counts for `run_concurrency`, run after
+    `configure_threads(intra_op_threads)` when that is given.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if model_path is None:
+            reference = build_reference_model(seed)
+            model_path = os.path.join(directory, 'reference_model.npz')
+            reference.save(model_path)
+            model_info = {'type': 'reference', 'seed': seed, 'trees': reference.n_trees,
+                          'nodes': reference.n_nodes, 'fingerprint': model_fingerprint(reference)}
+        else:
+            model_info = {'type': 'file', 'path': os.path.abspath(model_path)}
+        threads = configure_threads(intra_op_threads) if intra_op_threads else None
+        predictor = GroundwaterPredictor(model_path)
+        model_info['version'] = predictor.model_version
+
+        results: Dict[str, Dict[str, Dict]] = {}
+        for size in sizes:
+            for stage, function in _stages(predictor, size, seed).items():
+                if stages and stage not in stages:
+                    continue
+                timing = time_call(function, min_time)
+                timing['perPointUs'] = round(timing['medianMs'] * 1000 / size, 3)
+                results.setdefault(stage, {})[str(size)] = timing
+                logger.info(f"{stage} x{size}: {timing['medianMs']:.3f} ms median ({timing['repeats']} runs)")
+
+        report = {
+            'createdAt': datetime.datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpus': os.cpu_count()
+            },
+            'model': model_info,
+            'results': results
+        }
+        if concurrency:
+            report['concurrency'] = run_concurrency(model_path, concurrency, concurrency_requests, seed)
+            report['threads'] = threads
+        return report
+
+
+def compare_reports(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> Dict:
+    """
+    Compare the median timings of two reports. A stage/size is a regression
+    when it is more than `threshold` (a fraction) slower than the baseline and
+    an improvement when it is that much faster.
+    """
+    rows = []
+    for stage, sizes in current['results'].items():
+        for size, timing in sizes.items():
+            previous = baseline.get('results', {}).get(stage, {}).get(size)
+            if previous is None:
+                rows.append({'stage': stage, 'size': int(size), 'status': 'new', 'currentMs': timing['medianMs']})
+                continue
+            ratio = timing['medianMs'] / max(previous['medianMs'], 1e-9)
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold):
+                status = 'improvement'
+            else:
+                status = 'ok'
+            rows.append({
+                'stage': stage, 'size': int(size), 'status': status,
+                'baselineMs': previous['medianMs'], 'currentMs': timing['medianMs'], 'ratio': round(ratio, 3)
+            })
+
+    warnings = []
+    if current.get('model', {}).get('fingerprint') != baseline.get('model', {}).get('fingerprint'):
+        warnings.append('Reports were produced with different models')
+    if current.get('environment') != baseline.get('environment'):
+        warnings.append('Reports were produced in different environments')
+    return {
+        'threshold': threshold,
+        'regressions': sum(1 for row in rows if row['status'] == 'regression'),
+        'rows': rows,
+        'warnings': warnings
+    }
+
+
+def main():
+    """Command line entry point."""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Benchmark the groundwater prediction engine')
+    parser.add_argument('--model-path', default=None, help='Model to benchmark (default: seeded reference model)')
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(DEFAULT_SIZES),
+                        help='Batch sizes to time (none skips the stage timings)')
+    parser.add_argument('--stages', nargs='+', default=None, help='Only time these stages')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help='Seconds of repeats per measurement')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the reference model and benchmark points')
+    parser.add_argument('--concurrency', type=int, nargs='*', default=None,
+                        help=f"Measure serving throughput at these thread counts (no value: {' '.join(map(str, DEFAULT_CONCURRENCY))})")
+    parser.add_argument('--requests', type=int, default=CONCURRENCY_REQUESTS,
+                        help='Requests served at each thread count')
+    parser.add_argument('--intra-op-threads', type=int, default=None,
+                        help='Threads per model call and BLAS/OpenMP pool during the run')
+    parser.add_argument('--output', default=None, help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', default=None, help='Earlier report to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Slowdown fraction counted as a regression')
+    args = parser.parse_args()
+
+    concurrency = DEFAULT_CONCURRENCY if args.concurrency == [] else args.concurrency
+    report = run_benchmarks(args.model_path, args.sizes, args.stages, args.min_time, args.seed, concurrency,
+                            args.requests, args.intra_op_threads)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'] = compare_reports(report, json.load(f), args.threshold)
+        for row in report['comparison']['rows']:
+            if row['status'] == 'regression':
+                logger.error(f"Regression: {row['stage']} x{row['size']} {row['baselineMs']} ms -> {row['currentMs']} ms")
+        for warning in report['comparison']['warnings']:
+            logger.warning(warning)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Benchmark report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline and report['comparison']['regressions']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Incremental re-scoring of registered borewells.
+
+`rescore_borewells` reads a JSONL export of Borewell documents (mongoexport
+output, standing in for MongoDB) and keeps a JSONL file of water-level
+predictions per well up to date. Only wells that are new, whose document
+changed since they were scored, or whose score came from another model
+version are predicted; everything else is carried over. A watermark file
+records the newest `updatedAt` seen and the model version of the run, so a
+nightly run over a large export only pays for parsing plus the few changed
+wells. The model version is a hash of the model file's contents, so only a
+retrained model makes every well stale; touching, copying or redeploying the
+same file does not. Full re-scores therefore only happen with a new model (or
+with `full=True`). Used by `python groundwater_predictor.py rescore`.
+"""
+import datetime
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from batch_scoring import score_chunk
+from groundwater_predictor import GroundwaterPredictor, FEATURE_CACHE, resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def _unwrap(value):
+    """Strip MongoDB extended JSON wrappers such as {"$oid": ...} and {"$date": ...}."""
+    while isinstance(value, dict) and len(value) == 1:
+        key = next(iter(value))
+        if key not in ('$oid', '$date', '$numberLong', '$numberInt', '$numberDouble'):
+            break
+        value = value[key]
+    return value
+
+
+def timestamp_ms(value) -> Optional[int]:
+    """Epoch milliseconds of an exported timestamp (ISO string, number or extended JSON), or None."""
+    value = _unwrap(value)
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value)
+    if text.lstrip('-').isdigit():
+        return int(text)
+    parsed = datetime.datetime.fromisoformat(text.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def read_export(path: str, invalid_lines: Optional[List[int]] = None) -> Iterator[Dict]:
+    """
+    Yield borewell documents from a JSONL export. Lines that are not JSON
+    objects are skipped with a warning and their numbers appended to
+    `invalid_lines`, so one bad line does not stop the nightly run.
+    """
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                document = json.loads(line)
+                problem = None if isinstance(document, dict) else "not a JSON object"
+            except json.JSONDecodeError as e:
+                problem = f"invalid JSON ({str(e)})"
+            if problem is None:
+                yield document
+                continue
+            logger.warning(f"Skipping line {number} of {path}: {problem}")
+            if invalid_lines is not None:
+                invalid_lines.append(number)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    """Previously scored wells by id; empty when the file does not exist yet."""
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    results[record['_id']] = record
+    return results
+
+
+def load_watermark(path: str) -> Dict:
+    """Return the watermark written by the previous run, or an empty one."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_atomic(path: str, lines: Iterator[str]):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        f.writelines(lines)
+    os.replace(temp_path, path)
+
+
+def plan_rescore(documents: Iterator[Dict], results: Dict[str, Dict], watermark: Dict,
+                 model_version: Optional[str], full: bool = False) -> Tuple[List[Dict], Set[str], Dict]:
+    """
+    Decide which wells need scoring.
+
+    Returns the wells to score (id, coordinates and source timestamp), the ids
+    present in the export, and counts per reason ('new', 'changed' or 'stale')
+    plus the newest `updatedAt` seen. A well is skipped when its document is
+    not newer than the watermark, its score was made from the same document
+    timestamp, and the score came from `model_version`. `full` marks every
+    well stale.
+    """
+    high_watermark = watermark.get('maxUpdatedAt') or 0
+    pending, reasons = [], Counter()
+    seen = set()
+    newest = high_watermark
+
+    for document in documents:
+        well_id = str(_unwrap(document.get('_id')))
+        seen.add(well_id)
+        updated = timestamp_ms(document.get('updatedAt')) or timestamp_ms(document.get('createdAt')) or 0
+        newest = max(newest, updated)
+
+        previous = results.get(well_id)
+        if previous is None:
+            reason = 'new'
+        elif full or previous.get('modelVersion') != model_version:
+            reason = 'stale'
+        elif updated > high_watermark or previous.get('sourceUpdatedAt') != updated:
+            reason = 'changed'
+        else:
+            continue
+
+        location = document.get('location') or {}
+        pending.append({
+            '_id': well_id,
+            'latitude': _unwrap(location.get('latitude')),
+            'longitude': _unwrap(location.get('longitude')),
+            'sourceUpdatedAt': updated
+        })
+        reasons[reason] += 1
+
+    return pending, seen, {
+        'wells': len(seen),
+        'removed': sum(1 for well_id in results if well_id not in seen),
+        'maxUpdatedAt': newest,
+        'fullRescore': bool(seen) and len(pending) == len(seen),
+        **{reason: reasons[reason] for reason in ('new', 'changed', 'stale')}
+    }
+
+
+def score_wells(predictor: GroundwaterPredictor, wells: List[Dict], scored_at: str,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict]:
+    """Score wells with the vectorised levels-only path, `chunk_size` wells per model call."""
+    records = []
+    for start in range(0, len(wells), chunk_size):
+        for record in score_chunk(predictor, wells[start:start + chunk_size]):
+            record['modelVersion'] = predictor.model_version
+            record['scoredAt'] = scored_at
+            records.append(record)
+    return records
+
+
+def rescore_borewells(export_path: str, results_path: str, watermark_path: Optional[str] = None,
+                      model_path: Optional[str] = None, full: bool = False,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, allow_fallback: bool = False) -> Dict:
+    """
+    Bring `results_path` up to date with the borewell export at `export_path`.
+
+    Wells missing from the export are dropped from the results. The results
+    file is replaced atomically and the watermark (default: results path with
+    a .watermark.json suffix) is written last, so an interrupted run is simply
+    repeated. Export lines that cannot be parsed are skipped and counted as
+    'invalidLines'. With `allow_fallback` a missing model file gives heuristic
+    fallback levels recorded with a null model version, so they become stale
+    once a model is available. Returns a summary of what was scored.
+    """
+    watermark_path = watermark_path or f"{os.path.splitext(results_path)[0]}.watermark.json"
+    start_time = time.perf_counter()
+    predictor = GroundwaterPredictor(resolve_model_path(model_path), FEATURE_CACHE, allow_fallback)
+
+    results = load_results(results_path)
+    watermark = load_watermark(watermark_path)
+    invalid_lines: List[int] = []
+    pending, seen, counts = plan_rescore(read_export(export_path, invalid_lines), results, watermark,
+                                         predictor.model_version, full)
+    logger.info(f"{len(pending)} of {counts['wells']} wells need scoring "
+                f"(new {counts['new']}, changed {counts['changed']}, stale {counts['stale']})")
+
+    scored_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    records = score_wells(predictor, pending, scored_at, chunk_size)
+    for record in records:
+        results[record['_id']] = record
+
+    if records or counts['removed']:
+        _write_atomic(results_path, (json.dumps(record) + '\n' for well_id, record in results.items() if well_id in seen))
+
+    summary = {
+        **counts,
+        'scored': len(records),
+        'errors': sum(1 for record in records if 'error' in record),
+        'invalidLines': len(invalid_lines),
+        'modelVersion': predictor.model_version,
+        'seconds': round(time.perf_counter() - start_time, 3)
+    }
+    _write_atomic(watermark_path, [json.dumps({
+        'modelVersion': predictor.model_version,
+        'maxUpdatedAt': counts['maxUpdatedAt'],
+        'lastRunAt': scored_at,
+        'lastRun': summary
+    }, indent=2)])
+    logger.info(f"Borewell re-scoring complete: {json.dumps(summary)}")
+    return summary
@@ -0,0 +1,158 @@
+"""
+National groundwater prediction rasters.
+
+`predict_grid` evaluates the model on every cell of a regular latitude/longitude
+grid, in chunks, and writes the result as a compact float32 .npz raster that the
+map view can draw without calling the predictor once per pixel.
+"""
+import argparse
+import datetime
+import logging
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from groundwater_predictor import GroundwaterPredictor, FEATURE_CACHE, resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+# (west, south, east, north) in degrees
+INDIA_BBOX = (68.0, 6.0, 98.0, 37.0)
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def grid_coordinates(bbox: Tuple[float, float, float, float], resolution: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the cell-centre latitudes (north to south) and longitudes (west to east)
+    of a grid covering `bbox` with square cells of `resolution` degrees.
+    """
+    west, south, east, north = bbox
+    if east <= west or north <= south:
+        raise ValueError("bbox must be (west, south, east, north) with west < east and south < north")
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+
+    # Round before ceil so 30 / 0.05 does not become 601 cells through float error
+    n_cols = int(math.ceil(round((east - west) / resolution, 9)))
+    n_rows = int(math.ceil(round((north - south) / resolution, 9)))
+    longitudes = west + (np.arange(n_cols) + 0.5) * resolution
+    latitudes = north - (np.arange(n_rows) + 0.5) * resolution
+    return latitudes, longitudes
+
+
+def predict_grid(bbox: Tuple[float, float, float, float] = INDIA_BBOX, resolution: float = 0.05,
+                 output_path: Optional[str] = None, model_path: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, date: Optional[datetime.date] = None,
+                 allow_fallback: bool = False) -> Dict:
+    """
+    Predict water level and borewell suitability for every cell of a grid.
+
+    Cells are processed `chunk_size` at a time with vectorised features and one
+    model call per chunk, so memory stays bounded for national grids. Row 0 of
+    the raster is the northern edge. When `output_path` is given the raster is
+    written there as .npz (see `save_grid`). With `allow_fallback` a missing
+    model file fills the grid with heuristic fallback levels (modelVersion None).
+    """
+    predictor = GroundwaterPredictor(resolve_model_path(model_path), FEATURE_CACHE, allow_fallback)
+    latitudes, longitudes = grid_coordinates(bbox, resolution)
+    n_rows, n_cols = len(latitudes), len(longitudes)
+    total = n_rows * n_cols
+    as_of = date or datetime.date.today()
+
+    water_level = np.empty(total, dtype=np.float32)
+    suitable = np.empty(total, dtype=bool)
+
+    start_time = time.perf_counter()
+    for start in range(0, total, chunk_size):
+        cells = np.arange(start, min(start + chunk_size, total))
+        levels = predictor.predict_levels(latitudes[cells // n_cols], longitudes[cells % n_cols], as_of)
+        water_level[cells] = levels['currentWaterLevel']
+        suitable[cells] = levels['isSuitableForBorewell']
+        logger.info(f"Grid progress: {cells[-1] + 1}/{total} cells")
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Predicted {total} cells in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} cells/s)")
+
+    west, south, east, north = bbox
+    raster = {
+        'waterLevel': water_level.reshape(n_rows, n_cols),
+        'suitable': suitable.reshape(n_rows, n_cols),
+        'bbox': (west, south, west + n_cols * resolution, north),
+        'resolution': resolution,
+        # GDAL-style geotransform: x = t0 + col * t1, y = t3 + row * t5
+        'transform': (west, resolution, 0.0, north, 0.0, -resolution),
+        'crs': 'EPSG:4326',
+        'asOf': as_of.isoformat(),
+        'modelVersion': predictor.model_version
+    }
+
+    if output_path:
+        save_grid(raster, output_path)
+    return raster
+
+
+def save_grid(raster: Dict, output_path: str):
+    """Write a raster produced by `predict_grid` to a compressed .npz file."""
+    np.savez_compressed(
+        output_path,
+        water_level=raster['waterLevel'].astype(np.float32),
+        suitable=raster['suitable'].astype(np.uint8),
+        bbox=np.array(raster['bbox'], dtype=np.float64),
+        resolution=np.float64(raster['resolution']),
+        transform=np.array(raster['transform'], dtype=np.float64),
+        crs=np.array(raster['crs']),
+        as_of=np.array(raster['asOf']),
+        model_version=np.array(raster['modelVersion'] or '')
+    )
+    logger.info(f"Raster written to {output_path}")
+
+
+def load_grid(path: str) -> Dict:
+    """Read a raster written by `save_grid` back into the `predict_grid` layout."""
+    with np.load(path) as data:
+        return {
+            'waterLevel': data['water_level'],
+            'suitable': data['suitable'].astype(bool),
+            'bbox': tuple(data['bbox'].tolist()),
+            'resolution': float(data['resolution']),
+            'transform': tuple(data['transform'].tolist()),
+            'crs': str(data['crs']),
+            'asOf': str(data['as_of']),
+            'modelVersion': str(data['model_version']) or None
+        }
+
+
+def sample_grid(raster: Dict, latitude: float, longitude: float) -> Optional[Tuple[float, bool]]:
+    """Look up (water level, suitable) for the cell containing a coordinate, or None outside the grid."""
+    west, _, _, north = raster['bbox']
+    resolution = raster['resolution']
+    row = int((north - latitude) // resolution)
+    col = int((longitude - west) // resolution)
+    n_rows, n_cols = raster['waterLevel'].shape
+    if not (0 <= row < n_rows and 0 <= col < n_cols):
+        return None
+    return float(raster['waterLevel'][row, col]), bool(raster['suitable'][row, col])
+
+
+def main():
+    """Command line entry point."""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Generate a groundwater prediction raster')
+    parser.add_argument('output', help='Output .npz path')
+    parser.add_argument('--bbox', type=float, nargs=4, default=list(INDIA_BBOX),
+                        metavar=('WEST', 'SOUTH', 'EAST', 'NORTH'), help='Bounding box in degrees')
+    parser.add_argument('--resolution', type=float, default=0.05, help='Cell size in degrees')
+    parser.add_argument('--model-path', default=None, help='Path to the pickled model')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Cells per model call')
+    parser.add_argument('--allow-fallback', action='store_true',
+                        help='Fill the grid with heuristic fallback levels if the model file is missing')
+    args = parser.parse_args()
+
+    predict_grid(tuple(args.bbox), args.resolution, args.output, args.model_path, args.chunk_size,
+                 allow_fallback=args.allow_fallback)
+
+
+if __name__ == "__main__":
+    main()
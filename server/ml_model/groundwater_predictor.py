@@ -1,30 +1,1474 @@
 import pickle
 import numpy as np
 import os
+import sys
+import json
 import datetime
 import math
-import random
+import threading
+import time
+import operator
+import functools
+import hashlib
+import bisect
+import contextlib
+import copy
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the entry points (`main`), not on import
 logger = logging.getLogger(__name__)
 
+# Number of features the XGBoost model was trained on
+N_FEATURES = 72
+
+# Lookup tables for the cyclical temporal features. They are built with the
+# same `math` calls as the scalar path so batch rows match it bit for bit.
+_MONTH_SIN = np.array([math.sin(2 * math.pi * m / 12) for m in range(13)])
+_MONTH_COS = np.array([math.cos(2 * math.pi * m / 12) for m in range(13)])
+_DAY_SIN = np.array([math.sin(2 * math.pi * d / 365) for d in range(367)])
+_DAY_COS = np.array([math.cos(2 * math.pi * d / 365) for d in range(367)])
+_MONSOON_INTENSITY = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.3, 0.9, 1.0, 0.7, 0.0, 0.0, 0.0])
+_EPOCH_1994 = np.datetime64('1994-01-01', 'D')
+
+
+def _to_day_array(dates, n: int) -> np.ndarray:
+    """Normalise None, a single date or a sequence of dates to an (n,) datetime64[D] array."""
+    if dates is None:
+        dates = datetime.datetime.now()
+    days = np.asarray(dates, dtype='datetime64[D]').reshape(-1)
+    if days.shape[0] == 1 and n != 1:
+        days = np.repeat(days, n)
+    if days.shape[0] != n:
+        raise ValueError(f"Expected {n} dates, got {days.shape[0]}")
+    return days
+
+
+def parse_as_of(value) -> Optional[datetime.date]:
+    """Accept None, a date/datetime or an ISO 'YYYY-MM-DD' string as an as-of date."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+def _month_of(as_of: Optional[datetime.date]) -> int:
+    """Calendar month of an as-of date (the current month when None)."""
+    return (as_of or datetime.date.today()).month
+
+def _months_of(dates, n: int) -> np.ndarray:
+    """Calendar months (1-12) of `dates` in any form `_to_day_array` accepts."""
+    return _to_day_array(dates, n).astype('datetime64[M]').astype(np.int64) % 12 + 1
+
+def monthly_dates(start: datetime.date, months: int) -> np.ndarray:
+    """The 15th of `months` consecutive months beginning with `start`'s month, as datetime64[D]."""
+    first = np.datetime64(start, 'M') + np.arange(months)
+    return first.astype('datetime64[D]') + 14
+
+
+def _iso_week(days: np.ndarray, year: np.ndarray, day_of_year: np.ndarray) -> np.ndarray:
+    """Vectorised equivalent of `date.isocalendar()[1]`."""
+    def weeks_in_year(y):
+        jan1 = (y - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+        jan1_weekday = (jan1.astype(np.int64) + 3) % 7  # Monday = 0
+        leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+        return np.where((jan1_weekday == 3) | (leap & (jan1_weekday == 2)), 53, 52)
+
+    iso_weekday = (days.astype(np.int64) + 3) % 7 + 1
+    week = (day_of_year - iso_weekday + 10) // 7
+    return np.where(week < 1, weeks_in_year(year - 1),
+                    np.where(week > weeks_in_year(year), 1, week))
+
+
+def _temporal_feature_block(days: np.ndarray) -> np.ndarray:
+    """
+    Build the date-only features (model columns 3-30) for an array of days.
+    Returns an (N, 28) float array.
+    """
+    year = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    day_of_year = (days - days.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
+    week_of_year = _iso_week(days, year, day_of_year)
+    quarter = (month - 1) // 3 + 1
+
+    years_since_1994 = year - 1994
+    days_since_start = (days - _EPOCH_1994).astype(np.int64)
+    year_progress = np.where(year % 4 == 0, day_of_year / 366.0, day_of_year / 365.0)
+
+    is_monsoon = np.isin(month, [6, 7, 8, 9])
+    is_pre_monsoon = np.isin(month, [3, 4, 5])
+    decade = year // 10
+
+    return np.column_stack([
+        year,
+        month,
+        day_of_year,
+        week_of_year,
+        quarter,
+        years_since_1994,
+        days_since_start,
+        year_progress,
+        _MONTH_SIN[month],
+        _MONTH_COS[month],
+        _DAY_SIN[day_of_year],
+        _DAY_COS[day_of_year],
+        is_monsoon,
+        np.isin(month, [10, 11]),
+        is_pre_monsoon,
+        np.isin(month, [12, 1, 2]),
+        np.isin(month, [7, 8]),
+        month == 6,
+        month == 9,
+        _MONSOON_INTENSITY[month],
+        np.isin(month, [3, 6, 10, 12]),
+        np.isin(month, [4, 5, 7, 8]),
+        is_pre_monsoon,
+        np.isin(month, [7, 8, 9]),
+        decade,
+        year % 5,
+        (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0)),
+        np.where(year < 2000, 0, np.where(year < 2010, 1, 2)),
+    ]).astype(float)
+
+
+def _spatial_feature_block(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Build the location-only features (model columns 1-2 and 31-52).
+    Returns an (N, 24) float array whose first two columns are latitude and longitude.
+    """
+    lat = latitudes
+    lng = longitudes
+    lat_squared = lat * lat
+    lon_squared = lng * lng
+
+    elevation_proxy = np.abs(lat - 20) * 50 + np.abs(lng - 78) * 30
+    coastal_zone = (lng < 73) | (lng > 88) | (lat < 12)
+
+    return np.column_stack([
+        lat,
+        lng,
+        lat * lng,
+        lat_squared,
+        lon_squared,
+        np.sqrt(lat_squared + lon_squared),
+        lat > 24,
+        lat < 20,
+        lng < 76,
+        lng > 84,
+        (lat > 20) & (lat < 30) & (lng > 68) & (lng < 78),
+        coastal_zone,
+        (lat > 20) & (lng > 85),
+        (lat > 15) & (lat < 25) & (lng > 72) & (lng < 82),
+        (lat > 24) & (lat < 32) & (lng > 72) & (lng < 88),
+        (lat > 12) & (lat < 20) & (lng > 74) & (lng < 80),
+        lat < 24,
+        elevation_proxy > 300,
+        (elevation_proxy >= 100) & (elevation_proxy <= 300),
+        elevation_proxy < 100,
+        (lat > 8) & (lat < 24) & (lng > 72) & (lng < 78),
+        (lat > 24) & (lat < 32) & (lng > 75) & (lng < 88),
+        (lat > 12) & (lat < 20) & (lng > 74) & (lng < 82),
+        coastal_zone,
+    ]).astype(float)
+
+
+def _interaction_feature_block(temporal: np.ndarray, spatial: np.ndarray) -> np.ndarray:
+    """
+    Build the date x location interaction features (model columns 53-72)
+    from the blocks returned by `_temporal_feature_block` and `_spatial_feature_block`.
+    """
+    year = temporal[:, 0]
+    month = temporal[:, 1]
+    year_progress = temporal[:, 7]
+    is_monsoon = temporal[:, 12]
+    is_pre_monsoon = temporal[:, 14]
+    is_winter = temporal[:, 15]
+    is_peak_monsoon = temporal[:, 16]
+    monsoon_intensity = temporal[:, 19]
+    flood_prone_months = temporal[:, 23]
+    decade = temporal[:, 24]
+    climate_era = temporal[:, 27]
+    is_summer = ((month == 4) | (month == 5)).astype(float)
+
+    lat = spatial[:, 0]
+    lng = spatial[:, 1]
+    coordinate_distance = spatial[:, 5]
+    north_india = spatial[:, 6]
+    south_india = spatial[:, 7]
+    west_india = spatial[:, 8]
+    east_india = spatial[:, 9]
+    arid_zone = spatial[:, 10]
+    coastal_zone = spatial[:, 11]
+    humid_zone = spatial[:, 12]
+    alluvial_plains = spatial[:, 14]
+    hard_rock_terrain = spatial[:, 15]
+    high_elevation = spatial[:, 17]
+    low_elevation = spatial[:, 19]
+    western_ghats = spatial[:, 20]
+    elevation_proxy = np.abs(lat - 20) * 50 + np.abs(lng - 78) * 30
+
+    return np.column_stack([
+        is_monsoon * coastal_zone,
+        is_monsoon * arid_zone,
+        is_monsoon * western_ghats,
+        is_peak_monsoon * coastal_zone,
+        is_pre_monsoon * arid_zone,
+        is_summer * high_elevation,
+        is_winter * high_elevation,
+        is_monsoon * low_elevation,
+        (is_monsoon + is_winter) * elevation_proxy / 1000,
+        (year - 2000) * elevation_proxy / 10000,
+        north_india * is_winter,
+        south_india * is_summer,
+        west_india * is_monsoon,
+        east_india * flood_prone_months,
+        (north_india + south_india) * (is_monsoon + is_winter),
+        climate_era * monsoon_intensity,
+        (decade % 10) * coastal_zone,
+        (alluvial_plains + hard_rock_terrain) * (arid_zone + humid_zone),
+        (high_elevation + low_elevation) * year_progress,
+        coordinate_distance * monsoon_intensity,
+    ])
+
+
+def _interaction_feature_row(temporal: List[float], spatial: List[float]) -> List[float]:
+    """
+    Scalar counterpart of `_interaction_feature_block` for one row held as Python floats.
+    A single row is much cheaper to build this way than through NumPy.
+    """
+    year, month = temporal[0], temporal[1]
+    year_progress = temporal[7]
+    is_monsoon, is_pre_monsoon, is_winter, is_peak_monsoon = temporal[12], temporal[14], temporal[15], temporal[16]
+    monsoon_intensity = temporal[19]
+    flood_prone_months = temporal[23]
+    decade = temporal[24]
+    climate_era = temporal[27]
+    is_summer = 1 if month in (4, 5) else 0
+
+    lat, lng = spatial[0], spatial[1]
+    coordinate_distance = spatial[5]
+    north_india, south_india, west_india, east_india = spatial[6], spatial[7], spatial[8], spatial[9]
+    arid_zone, coastal_zone, humid_zone = spatial[10], spatial[11], spatial[12]
+    alluvial_plains, hard_rock_terrain = spatial[14], spatial[15]
+    high_elevation, low_elevation = spatial[17], spatial[19]
+    western_ghats = spatial[20]
+    elevation_proxy = abs(lat - 20) * 50 + abs(lng - 78) * 30
+
+    return [
+        is_monsoon * coastal_zone,
+        is_monsoon * arid_zone,
+        is_monsoon * western_ghats,
+        is_peak_monsoon * coastal_zone,
+        is_pre_monsoon * arid_zone,
+        is_summer * high_elevation,
+        is_winter * high_elevation,
+        is_monsoon * low_elevation,
+        (is_monsoon + is_winter) * elevation_proxy / 1000,
+        (year - 2000) * elevation_proxy / 10000,
+        north_india * is_winter,
+        south_india * is_summer,
+        west_india * is_monsoon,
+        east_india * flood_prone_months,
+        (north_india + south_india) * (is_monsoon + is_winter),
+        climate_era * monsoon_intensity,
+        (decade % 10) * coastal_zone,
+        (alluvial_plains + hard_rock_terrain) * (arid_zone + humid_zone),
+        (high_elevation + low_elevation) * year_progress,
+        coordinate_distance * monsoon_intensity,
+    ]
+
+
+def _assemble_features(temporal: np.ndarray, spatial: np.ndarray, interactions: np.ndarray) -> np.ndarray:
+    """Stitch the three feature blocks together in the column order the model expects."""
+    return np.hstack([spatial[:, :2], temporal, spatial[:, 2:], interactions])
+
+
+# =================================================================
+# REGION & CLIMATE CLASSIFICATION RULES
+# =================================================================
+# Each rule is (name, boxes, any_of, all_of, none_of). A box is a tuple of
+# (axis, op, value) conditions that must all hold. A coordinate matches a rule
+# when it lies in any of its boxes or has any `any_of` flag set (a rule with
+# neither always matches), has every `all_of` flag set and no `none_of` flag
+# set. Rules may only refer to rules defined above them.
+
+def _between(lo: float, hi: float, axis: str) -> Tuple:
+    """Inclusive range condition on one axis."""
+    return ((axis, '>=', lo), (axis, '<=', hi))
+
+def _near(lat: float, lng: float, radius: float = 0.5) -> Tuple:
+    """Square neighbourhood around a point."""
+    return (('lat', 'near', (lat, radius)), ('lng', 'near', (lng, radius)))
+
+MAJOR_CITIES = [
+    (28.6, 77.2),    # Delhi
+    (19.1, 72.9),    # Mumbai
+    (13.1, 80.3),    # Chennai
+    (12.9, 77.6),    # Bangalore
+    (22.6, 88.4),    # Kolkata
+    (17.4, 78.5),    # Hyderabad
+    (23.0, 72.6),    # Ahmedabad
+    (26.9, 75.8),    # Jaipur
+]
+
+REGION_RULES = [
+    # Land use and development
+    ('major_city', [_near(lat, lng) for lat, lng in MAJOR_CITIES], (), (), ()),
+    ('urban_area', [(('lat', '>', 20), ('lng', '>', 75), ('lng', '<', 85))], ('major_city',), (), ()),  # Urban corridor
+    ('rural_developed', [_between(15, 30, 'lat') + _between(70, 88, 'lng')], (), (), ()),
+    ('agricultural_area', [_between(15, 30, 'lat') + _between(72, 88, 'lng')], (), (), ('major_city',)),
+    ('forest_area', [_between(20, 25, 'lat') + _between(78, 85, 'lng'),     # Central forests
+                     _between(8, 24, 'lat') + _between(72, 78, 'lng')], (), (), ()),  # Western Ghats
+    
+    # Geology and hydrology
+    ('alluvial_plain', [_between(24, 32, 'lat') + _between(75, 88, 'lng'),  # Gangetic plains
+                        (('lat', '<', 15),) + _between(75, 85, 'lng')], (), (), ()),  # Southern coastal plains
+    ('coastal_area', [(('lng', '<', 73),), (('lng', '>', 88),), (('lat', '<', 12),)], (), (), ()),
+    ('hard_rock_terrain', [_between(12, 20, 'lat') + _between(74, 82, 'lng')], (), (), ()),
+    ('arid_region', [_between(20, 30, 'lat') + _between(68, 78, 'lng')], (), (), ()),
+    ('semi_arid_region', [_between(15, 20, 'lat') + _between(74, 80, 'lng'),   # Deccan semi-arid
+                          _between(20, 25, 'lat') + _between(78, 82, 'lng')], (), (), ()),  # Central semi-arid
+    ('transitional_zone', [_between(18, 24, 'lat') + _between(76, 82, 'lng'),  # Central transition
+                           _between(22, 26, 'lat') + _between(70, 76, 'lng')], (), (), ()),  # Western transition
+    ('flood_prone', [_between(22, 28, 'lat') + _between(85, 92, 'lng')], (), (), ()),
+    
+    # Administrative regions and programmes
+    ('outside_india', [(('lat', '<', 6),), (('lat', '>', 37),), (('lng', '<', 66),), (('lng', '>', 98),)], (), (), ()),
+    ('rajasthan_region', [_between(23, 30, 'lat') + _between(69, 78, 'lng')], (), (), ()),
+    ('gujarat_region', [_between(20, 24.5, 'lat') + _between(68, 74.5, 'lng')], (), (), ()),
+    ('maharashtra_drought_prone', [_between(17, 21, 'lat') + _between(74, 80, 'lng')], (), (), ()),
+    ('high_recharge_structures', [], ('rajasthan_region', 'gujarat_region', 'maharashtra_drought_prone'), (), ()),
+    ('low_variance_conditions', [], (), ('alluvial_plain',), ('flood_prone', 'arid_region')),
+    ('recharge_structures', [], ('arid_region', 'urban_area'), (), ()),
+    ('groundwater_management', [(('lat', '>', 23), ('lng', '>', 70), ('lng', '<', 80))], ('urban_area',), (), ()),  # Developed states
+    ('good_natural_recharge', [(('lat', '>', 20), ('lng', '>', 85))], ('forest_area',), (), ()),  # High rainfall regions
+    
+    # Training data coverage
+    ('training_extent', [_between(6, 37, 'lat') + _between(68, 97, 'lng')], (), (), ()),
+    ('training_core', [_between(15, 30, 'lat') + _between(72, 88, 'lng')], (), (), ()),
+    
+    # Physiographic regions
+    ('gangetic_plains', [_between(24, 32, 'lat') + _between(75, 88, 'lng')], (), (), ()),
+    ('deccan_plateau_region', [_between(12, 22, 'lat') + _between(74, 84, 'lng')], (), (), ()),
+    ('coastal_plains', [(('lng', '<', 73), ('lat', '>', 8)),    # West coast
+                        (('lng', '>', 88), ('lat', '>', 12)),   # East coast
+                        (('lat', '<', 12),)], (), (), ()),      # Southern tip
+    ('western_ghats_region', [_between(8, 24, 'lat') + _between(72, 78, 'lng')], (), (), ()),
+    ('thar_desert_region', [_between(24, 30, 'lat') + _between(69, 76, 'lng')], (), (), ()),
+    ('northeast_hills', [(('lat', '>', 23), ('lng', '>', 88))], (), (), ()),
+    ('central_highlands', [_between(20, 26, 'lat') + _between(76, 84, 'lng')], (), (), ()),
+    
+    # Climate zones
+    ('arid_climate', [], ('thar_desert_region',), (), ()),
+    ('semi_arid_climate', [_between(15, 20, 'lat') + _between(74, 80, 'lng'),   # Deccan semi-arid
+                           _between(20, 24, 'lat') + _between(78, 82, 'lng')], (), (), ()),  # Central semi-arid
+    ('tropical_wet', [(('lat', '<', 15), ('lng', '>', 75))], ('western_ghats_region', 'northeast_hills'), (), ()),  # Southern wet regions
+    ('tropical_wet_dry', [_between(15, 25, 'lat') + _between(75, 88, 'lng')], (), (), ('western_ghats_region',)),
+    ('subtropical_humid', [], ('gangetic_plains',), (), ()),
+    # Northeast hills above 25N reduces to lat > 25 and lng > 88
+    ('mountain_climate', [(('lat', '>', 30),), (('lat', '>', 25), ('lng', '>', 88))], (), (), ()),
+    
+    # Coarse bands used for the human-readable location characteristics
+    ('tropical_latitudes', [_between(6, 23, 'lat')], (), (), ()),
+    ('subtropical_latitudes', [(('lat', '>', 30),)], (), (), ()),
+    # Kept as originally written: it compares latitude against 73, so it holds for all of India
+    ('characteristic_coastal_zone', [(('lat', '<', 73),), (('lng', '>', 88),)], (), (), ()),
+]
+
+REGION_FLAGS = {name: 1 << bit for bit, (name, _, _, _, _) in enumerate(REGION_RULES)}
+
+# First matching flag wins; the last entry is the default
+REGION_TYPES = [
+    ('thar_desert_region', "Thar Desert"),      # Most specific, checked first
+    ('western_ghats_region', "Western Ghats"),
+    ('northeast_hills', "Northeast Hills"),
+    ('gangetic_plains', "Gangetic Plains"),
+    ('deccan_plateau_region', "Deccan Plateau"),
+    ('coastal_plains', "Coastal Plains"),
+    ('central_highlands', "Central Highlands"),
+    (None, "Mixed Terrain"),
+]
+
+CLIMATE_ZONES = [
+    ('arid_climate', "Arid"),
+    ('semi_arid_climate', "Semi-Arid"),
+    ('tropical_wet', "Tropical Wet"),
+    ('tropical_wet_dry', "Tropical Wet-Dry"),
+    ('subtropical_humid', "Subtropical Humid"),
+    ('mountain_climate', "Mountain"),
+    (None, "Temperate"),
+]
+
+_RULE_OPS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'near': lambda value, arg: abs(value - arg[0]) < arg[1],
+}
+
+
+def _evaluate_region_rules(lat, lng, always):
+    """
+    Evaluate REGION_RULES for scalars or NumPy arrays.
+    `always` is the all-true value of the right kind (True or a boolean array).
+    """
+    values = {'lat': lat, 'lng': lng}
+    flags = {}
+    for name, boxes, any_of, all_of, none_of in REGION_RULES:
+        if boxes or any_of:
+            matched = always & False
+            for box in boxes:
+                inside = always
+                for axis, op, value in box:
+                    inside = inside & _RULE_OPS[op](values[axis], value)
+                matched = matched | inside
+            for flag in any_of:
+                matched = matched | flags[flag]
+        else:
+            matched = always
+        for flag in all_of:
+            matched = matched & flags[flag]
+        for flag in none_of:
+            matched = matched & (flags[flag] ^ always)  # XOR with all-true negates
+        flags[name] = matched
+    return flags
+
+
+@functools.lru_cache(maxsize=4096)
+def region_mask(latitude: float, longitude: float) -> int:
+    """Classify one coordinate into a bitmask of REGION_FLAGS (memoised)."""
+    flags = _evaluate_region_rules(latitude, longitude, True)
+    return sum(REGION_FLAGS[name] for name, matched in flags.items() if matched)
+
+
+def classify_regions(latitudes, longitudes) -> np.ndarray:
+    """Classify many coordinates in one pass. Returns a uint64 bitmask per coordinate."""
+    lat = np.asarray(latitudes, dtype=float).reshape(-1)
+    lng = np.asarray(longitudes, dtype=float).reshape(-1)
+    flags = _evaluate_region_rules(lat, lng, np.ones(lat.shape, dtype=bool))
+    masks = np.zeros(lat.shape, dtype=np.uint64)
+    for name, matched in flags.items():
+        masks |= matched.astype(np.uint64) << np.uint64(REGION_FLAGS[name].bit_length() - 1)
+    return masks
+
+
+def has_region_flag(masks, name: str):
+    """Test one flag on a scalar mask or an array of masks."""
+    if isinstance(masks, np.ndarray):
+        return (masks & np.uint64(REGION_FLAGS[name])) != 0
+    return bool(masks & REGION_FLAGS[name])
+
+
+def _first_matching(mask: int, table: List) -> str:
+    for flag, label in table:
+        if flag is None or mask & REGION_FLAGS[flag]:
+            return label
+
+def region_type_of(mask: int) -> str:
+    """Region type label for a scalar mask."""
+    return _first_matching(mask, REGION_TYPES)
+
+def climate_zone_of(mask: int) -> str:
+    """Climate zone label for a scalar mask."""
+    return _first_matching(mask, CLIMATE_ZONES)
+
+def _first_matching_indices(masks: np.ndarray, table: List) -> np.ndarray:
+    conditions = [has_region_flag(masks, flag) for flag, _ in table[:-1]]
+    return np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+
+def region_type_indices(masks: np.ndarray) -> np.ndarray:
+    """Index into REGION_TYPES for each mask."""
+    return _first_matching_indices(masks, REGION_TYPES)
+
+def climate_zone_indices(masks: np.ndarray) -> np.ndarray:
+    """Index into CLIMATE_ZONES for each mask."""
+    return _first_matching_indices(masks, CLIMATE_ZONES)
+
+
+# =================================================================
+# SEASONAL PATTERN TABLES
+# =================================================================
+# Monthly multipliers (January first) of the current level. The seasonal
+# level for a month is current / (region multiplier * climate adjustment);
+# both factors are combined once into SEASONAL_MULTIPLIERS[region, climate].
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+_DEFAULT_SEASONAL_BASE = [0.95, 0.92, 0.88, 0.85, 0.80, 0.75, 0.70, 0.75, 0.82, 0.88, 0.92, 0.95]
+REGION_SEASONAL_BASE = {
+    # Strong monsoon influence, winter stability
+    "Thar Desert": [1.02, 1.0, 0.95, 0.85, 0.70, 0.65, 0.60, 0.65, 0.75, 0.85, 0.95, 1.0],
+    # Strong monsoon influence, winter stability
+    "Gangetic Plains": [0.95, 0.92, 0.90, 0.88, 0.85, 0.82, 0.75, 0.78, 0.85, 0.92, 0.98, 1.0],
+    # Moderate monsoon, high summer stress
+    "Deccan Plateau": [0.98, 0.95, 0.88, 0.82, 0.75, 0.70, 0.65, 0.70, 0.80, 0.90, 0.95, 1.0],
+    # Monsoon + retreating monsoon, less extreme variation
+    "Coastal Plains": [0.95, 0.92, 0.88, 0.85, 0.80, 0.75, 0.70, 0.75, 0.82, 0.88, 0.92, 0.95],
+    # Heavy monsoon, stable winter
+    "Western Ghats": [0.98, 0.95, 0.90, 0.85, 0.80, 0.70, 0.60, 0.65, 0.75, 0.85, 0.92, 0.95],
+    # Pre-monsoon rain, heavy monsoon
+    "Northeast Hills": [0.92, 0.88, 0.85, 0.80, 0.75, 0.65, 0.55, 0.60, 0.70, 0.80, 0.88, 0.90],
+}
+
+_DEFAULT_CLIMATE_ADJUSTMENT = [0.98, 0.95, 0.90, 0.85, 0.80, 0.75, 0.70, 0.75, 0.82, 0.88, 0.92, 0.95]
+CLIMATE_ADJUSTMENTS = {
+    # More extreme variations
+    "Arid": [1.02, 1.0, 0.95, 0.88, 0.80, 0.75, 0.70, 0.75, 0.85, 0.92, 0.98, 1.05],
+    # Moderate variations
+    "Semi-Arid": [1.0, 0.98, 0.92, 0.88, 0.82, 0.78, 0.75, 0.78, 0.85, 0.90, 0.95, 1.0],
+    # Less variation, strong monsoon
+    "Tropical Wet": [0.98, 0.95, 0.92, 0.88, 0.85, 0.75, 0.65, 0.70, 0.80, 0.88, 0.92, 0.95],
+    # Moderate variation, good winter recharge
+    "Subtropical Humid": [1.0, 0.98, 0.92, 0.88, 0.82, 0.78, 0.72, 0.75, 0.82, 0.88, 0.95, 1.0],
+}
+
+_MONTHLY_DESCRIPTIONS = [
+    "Post-winter stability, good for drilling",
+    "Winter end, stable conditions",
+    "Pre-summer, water levels start declining",
+    "Summer onset, increasing demand",
+    "Peak summer, maximum stress",
+    "Pre-monsoon, lowest levels",
+    "Early monsoon, recharge begins",
+    "Monsoon peak, active recharge",
+    "Late monsoon, continued recharge",
+    "Post-monsoon, levels stabilizing",
+    "Winter approach, good recovery",
+    "Winter, stable high levels"
+]
+
+# Region-specific context appended to the description of some months
+_REGIONAL_MONTH_CONTEXT = {
+    "Thar Desert": ((5, 6), " (Extreme stress in desert region)"),
+    "Gangetic Plains": ((7, 8, 9), " (Strong monsoon recharge)"),
+    "Western Ghats": ((6, 7, 8), " (Heavy monsoon impact)"),
+    "Coastal Plains": ((10, 11), " (Retreating monsoon benefit)"),
+}
+
+def _seasonal_status(multiplier: float) -> str:
+    if multiplier < 0.75:
+        return "Critical Low (Summer Stress)"
+    elif multiplier < 0.85:
+        return "Low (Pre/Post Monsoon)"
+    elif multiplier < 0.95:
+        return "Moderate"
+    return "Good (Winter/Post-Monsoon)"
+
+def _monthly_description(month: int, region_type: str) -> str:
+    months, context = _REGIONAL_MONTH_CONTEXT.get(region_type, ((), ""))
+    description = _MONTHLY_DESCRIPTIONS[month - 1]
+    return sys.intern(description + context) if month in months else description
+
+REGION_TYPE_INDEX = {label: i for i, (_, label) in enumerate(REGION_TYPES)}
+CLIMATE_ZONE_INDEX = {label: i for i, (_, label) in enumerate(CLIMATE_ZONES)}
+
+# (region, climate, month) multipliers, combined exactly as the per-month products were
+SEASONAL_MULTIPLIERS = (
+    np.array([REGION_SEASONAL_BASE.get(label, _DEFAULT_SEASONAL_BASE) for _, label in REGION_TYPES])[:, None, :] *
+    np.array([CLIMATE_ADJUSTMENTS.get(label, _DEFAULT_CLIMATE_ADJUSTMENT) for _, label in CLIMATE_ZONES])[None, :, :]
+)
+
+# Per (region, climate): the 12 month entries without the level, sharing interned strings
+SEASONAL_MONTH_TEMPLATES = [
+    [
+        [
+            (MONTH_NAMES[m], m + 1, round(multiplier * 100, 1), _seasonal_status(multiplier),
+             _monthly_description(m + 1, region_label))
+            for m, multiplier in enumerate(SEASONAL_MULTIPLIERS[r, c].tolist())
+        ]
+        for c in range(len(CLIMATE_ZONES))
+    ]
+    for r, (_, region_label) in enumerate(REGION_TYPES)
+]
+
+def seasonal_levels(current_levels, region_indices, climate_indices) -> np.ndarray:
+    """(N, 12) monthly levels for N locations in one broadcast."""
+    current = np.asarray(current_levels, dtype=float).reshape(-1, 1)
+    return current / SEASONAL_MULTIPLIERS[region_indices, climate_indices]
+
+
+# Major training regions (approximate centers)
+TRAINING_REGIONS = [
+    (28.6, 77.2),   # Delhi NCR
+    (19.1, 72.9),   # Mumbai region
+    (13.1, 80.3),   # Chennai region
+    (12.9, 77.6),   # Bangalore region
+    (22.6, 88.4),   # Kolkata region
+    (23.2, 77.4),   # Central India
+    (26.0, 73.0),   # Rajasthan
+    (21.1, 79.1),   # Nagpur region
+]
+
+EARTH_RADIUS_KM = 6371
+
+class TrainingPointIndex:
+    """
+    Haversine nearest-neighbour index over training/observation coordinates.
+    Built once and shared; answers nearest-distance and k-nearest queries for
+    single points or whole batches. Small point sets (such as the default
+    TRAINING_REGIONS) are searched by brute force, which beats a tree at that
+    size; larger sets go into a scikit-learn BallTree.
+    """
+    
+    BRUTE_FORCE_MAX_POINTS = 64
+    
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(self.points) == 0:
+            raise ValueError("TrainingPointIndex needs at least one point")
+        self._point_list = [tuple(point) for point in self.points.tolist()]
+        self._tree = None
+        if len(self.points) > self.BRUTE_FORCE_MAX_POINTS:
+            from sklearn.neighbors import BallTree
+            self._tree = BallTree(np.radians(self.points), metric='haversine')
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'TrainingPointIndex':
+        """
+        Build an index from a .npy array of (lat, lng) rows or a CSV file with
+        latitude/longitude columns (lat/lng/lon are also accepted).
+        """
+        if path.endswith('.npy'):
+            return cls(np.load(path))
+        
+        import csv
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+            lat_column = columns.get('latitude') or columns.get('lat')
+            lng_column = columns.get('longitude') or columns.get('lng') or columns.get('lon')
+            if not lat_column or not lng_column:
+                raise ValueError(f"{path} needs latitude and longitude columns")
+            points = [(float(row[lat_column]), float(row[lng_column])) for row in reader]
+        return cls(points)
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    def nearest_distance_km(self, latitude: float, longitude: float) -> float:
+        """Distance (km) from one coordinate to the nearest point."""
+        if self._tree is not None:
+            distances, _ = self._tree.query(np.radians([[latitude, longitude]]), k=1)
+            return float(distances[0, 0]) * EARTH_RADIUS_KM
+        
+        min_distance = float('inf')
+        for point_lat, point_lng in self._point_list:
+            dlat = math.radians(latitude - point_lat)
+            dlng = math.radians(longitude - point_lng)
+            a = (math.sin(dlat/2)**2 + 
+                 math.cos(math.radians(point_lat)) * math.cos(math.radians(latitude)) * 
+                 math.sin(dlng/2)**2)
+            min_distance = min(min_distance, EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a)))
+        return min_distance
+    
+    def nearest_distance(self, latitudes, longitudes) -> np.ndarray:
+        """Distance (km) from each coordinate to its nearest point."""
+        distances, _ = self.query(latitudes, longitudes, k=1)
+        return distances[:, 0]
+    
+    def query(self, latitudes, longitudes, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (distances in km, point indices), each of shape (N, k), for the
+        k nearest points to every coordinate, nearest first.
+        """
+        lat = np.asarray(latitudes, dtype=float).reshape(-1)
+        lng = np.asarray(longitudes, dtype=float).reshape(-1)
+        k = min(k, len(self.points))
+        
+        if self._tree is not None:
+            distances, indices = self._tree.query(np.radians(np.column_stack([lat, lng])), k=k)
+            return distances * EARTH_RADIUS_KM, indices
+        
+        dlat = np.radians(lat[:, None] - self.points[:, 0])
+        dlng = np.radians(lng[:, None] - self.points[:, 1])
+        a = (np.sin(dlat / 2) ** 2 +
+             np.cos(np.radians(self.points[:, 0])) * np.cos(np.radians(lat))[:, None] *
+             np.sin(dlng / 2) ** 2)
+        all_distances = EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+        indices = np.argsort(all_distances, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(all_distances, indices, axis=1), indices
+
+# Replaced by set_training_points() when a real observation set is available
+TRAINING_INDEX = TrainingPointIndex(TRAINING_REGIONS)
+
+def set_training_points(path: Optional[str] = None) -> TrainingPointIndex:
+    """Rebuild the shared training index from a file, or from TRAINING_REGIONS when path is None."""
+    global TRAINING_INDEX
+    index = TrainingPointIndex.from_file(path) if path else TrainingPointIndex(TRAINING_REGIONS)
+    TRAINING_INDEX = index
+    logger.info(f"Training index built with {len(index)} points")
+    return index
+
+def _min_distance_to_training_regions_batch(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Vectorised haversine distance (km) from each point to the nearest training point."""
+    return TRAINING_INDEX.nearest_distance(latitudes, longitudes)
+
+def set_model_threads(model, threads: int):
+    """
+    Limit the threads one `predict` call of `model` may use: `nthread` for
+    XGBoost, `n_jobs` for scikit-learn ensembles. Compiled ensembles always
+    run on the calling thread.
+    """
+    if hasattr(model, 'get_booster'):
+        model.set_params(n_jobs=threads)
+        model.get_booster().set_param({'nthread': threads})
+    elif type(model).__name__ == 'Booster' and hasattr(model, 'set_param'):
+        model.set_param({'nthread': threads})
+    elif hasattr(model, 'n_jobs'):
+        model.n_jobs = threads
+
+def configure_threads(intra_op_threads: Optional[int]) -> Dict:
+    """
+    Set the intra-op thread count for serving: the model's own threads (see
+    `set_model_threads`) and the OpenMP/BLAS pools of NumPy and XGBoost. The
+    native pools are resized with threadpoolctl when it is installed; the
+    OMP_NUM_THREADS-style variables are also set so that child processes
+    inherit the limit (they only take effect in a process that has not yet
+    imported NumPy). Returns what was applied.
+    """
+    MODEL_REGISTRY.set_intra_op_threads(intra_op_threads)
+    applied = {'intraOpThreads': intra_op_threads, 'nativePools': []}
+    if not intra_op_threads:
+        return applied
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(intra_op_threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        logger.warning("threadpoolctl is not installed; BLAS/OpenMP threads follow OMP_NUM_THREADS at startup")
+        return applied
+    threadpool_limits(intra_op_threads)
+    from threadpoolctl import threadpool_info
+    applied['nativePools'] = [
+        {'api': pool['user_api'], 'library': pool['internal_api'], 'threads': pool['num_threads']}
+        for pool in threadpool_info()
+    ]
+    return applied
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-1 of a file's contents, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """
+    Process-wide cache of unpickled models.
+    Entries are keyed by the resolved model path and validated against the file's
+    mtime and size, so each artifact is loaded once, shared across predictors and
+    threads, and reloaded automatically when the file on disk changes. The version
+    tag is a hash of the file's contents, hashed once per load, so touching,
+    copying or redeploying an unchanged model keeps its version.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._entries: Dict[str, Dict] = {}
+        self.intra_op_threads: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.total_load_seconds = 0.0
+    
+    def get(self, model_path: str):
+        """Return the model stored at `model_path`, loading it only if needed."""
+        return self.load(model_path)[0]
+    
+    def load(self, model_path: str) -> Tuple[object, str]:
+        """
+        Return (model, version) for `model_path`, loading it only if needed.
+        Both come from the same registry entry, so a concurrent reload cannot
+        pair a model with another file's version.
+        """
+        resolved = os.path.realpath(model_path)
+        stat = os.stat(resolved)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        
+        with self._lock:
+            entry = self._entries.get(resolved)
+            if entry is not None and entry['signature'] == signature:
+                self.hits += 1
+                return entry['model'], entry['version']
+            load_lock = self._load_locks.setdefault(resolved, threading.Lock())
+        
+        # Only one thread loads a given path; the others wait and reuse its result
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(resolved)
+                if entry is not None and entry['signature'] == signature:
+                    self.hits += 1
+                    return entry['model'], entry['version']
+            
+            start = time.perf_counter()
+            if resolved.endswith('.npz'):
+                # Compiled tree ensemble: plain arrays, no XGBoost/scikit-learn import
+                from tree_compiler import CompiledTreeEnsemble
+                model = CompiledTreeEnsemble.load(resolved)
+            else:
+                with open(resolved, 'rb') as f:
+                    model = pickle.load(f)
+            if self.intra_op_threads:
+                set_model_threads(model, self.intra_op_threads)
+            load_seconds = time.perf_counter() - start
+            
+            version = file_digest(resolved)[:12]
+            with self._lock:
+                if entry is not None:
+                    self.reloads += 1
+                self.misses += 1
+                self.total_load_seconds += load_seconds
+                self._entries[resolved] = {
+                    'model': model,
+                    'signature': signature,
+                    'version': version,
+                    'loadSeconds': load_seconds,
+                    'loadedAt': time.time()
+                }
+            logger.info(f"Model loaded from {resolved} in {load_seconds * 1000:.1f} ms (version {version})")
+            return model, version
+    
+    def set_intra_op_threads(self, threads: Optional[int]):
+        """Limit the threads each model call may use, for loaded and future models (None keeps library defaults)."""
+        with self._lock:
+            self.intra_op_threads = threads
+            models = [entry['model'] for entry in self._entries.values()]
+        if threads:
+            for model in models:
+                set_model_threads(model, threads)
+    
+    def version(self, model_path: str) -> Optional[str]:
+        """Return the version tag of the cached model at `model_path`, if loaded."""
+        entry = self._entries.get(os.path.realpath(model_path))
+        return entry['version'] if entry else None
+    
+    def clear(self):
+        """Drop all cached models."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Return hit/miss counters and per-model load times."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'intraOpThreads': self.intra_op_threads,
+                'totalLoadSeconds': round(self.total_load_seconds, 6),
+                'models': {
+                    path: {
+                        'version': entry['version'],
+                        'loadSeconds': round(entry['loadSeconds'], 6),
+                        'loadedAt': entry['loadedAt']
+                    }
+                    for path, entry in self._entries.items()
+                }
+            }
+
+# Shared by every GroundwaterPredictor in this process
+MODEL_REGISTRY = ModelRegistry()
+
+# Approximate memory held by one cached row of n floats (list, floats and dict slot)
+_ROW_BYTES = {n: sys.getsizeof([0.0] * n) + n * sys.getsizeof(0.0) + 100 for n in (24, 28)}
+
+class FeatureCache:
+    """
+    Layered cache for the model features.
+    The date-only block is computed once per calendar day and the location-only
+    block once per coordinate cell (LRU-evicted), so a request only has to compute
+    the interaction columns. With `precision=None` cells are exact coordinates and
+    rows match `prepare_features`; with a precision, coordinates are snapped to
+    that many decimal places before the location block is built.
+    """
+    
+    def __init__(self, max_cells: int = 50000, precision: Optional[int] = None, max_days: int = 366):
+        self.max_cells = max_cells
+        self.precision = precision
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._temporal: OrderedDict = OrderedDict()
+        self._spatial: OrderedDict = OrderedDict()
+        self.temporal_hits = 0
+        self.temporal_misses = 0
+        self.spatial_hits = 0
+        self.spatial_misses = 0
+        self.spatial_evictions = 0
+    
+    def _cell(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        if self.precision is None:
+            return (float(latitude), float(longitude))
+        return (round(float(latitude), self.precision), round(float(longitude), self.precision))
+    
+    def temporal_row(self, day: datetime.date) -> List[float]:
+        """Date-only feature row (28 values) for one calendar day."""
+        with self._lock:
+            row = self._temporal.get(day)
+            if row is not None:
+                self.temporal_hits += 1
+                self._temporal.move_to_end(day)
+                return row
+        
+        row = _temporal_feature_block(np.array([day], dtype='datetime64[D]'))[0].tolist()
+        with self._lock:
+            self.temporal_misses += 1
+            self._temporal[day] = row
+            if len(self._temporal) > self.max_days:
+                self._temporal.popitem(last=False)
+        return row
+    
+    def spatial_row(self, latitude: float, longitude: float) -> List[float]:
+        """Location-only feature row (24 values) for the cell containing a coordinate."""
+        cell = self._cell(latitude, longitude)
+        with self._lock:
+            row = self._spatial.get(cell)
+            if row is not None:
+                self.spatial_hits += 1
+                self._spatial.move_to_end(cell)
+                return row
+        
+        row = _spatial_feature_block(np.array([cell[0]]), np.array([cell[1]]))[0].tolist()
+        with self._lock:
+            self.spatial_misses += 1
+            self._spatial[cell] = row
+            while len(self._spatial) > self.max_cells:
+                self._spatial.popitem(last=False)
+                self.spatial_evictions += 1
+        return row
+    
+    def features(self, latitude: float, longitude: float, date=None) -> np.ndarray:
+        """Return the (1, 72) feature row, computing only the interaction columns."""
+        if date is None:
+            day = datetime.date.today()
+        elif isinstance(date, datetime.datetime):
+            day = date.date()
+        else:
+            day = date
+        temporal = self.temporal_row(day)
+        spatial = self.spatial_row(latitude, longitude)
+        row = spatial[:2] + temporal + spatial[2:] + _interaction_feature_row(temporal, spatial)
+        return np.array(row).reshape(1, -1)
+    
+    def temporal_block(self, days: np.ndarray) -> np.ndarray:
+        """Date-only block for an array of days, built from one cached row per distinct day."""
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        rows = np.array([self.temporal_row(day.item()) for day in unique_days])
+        return rows[inverse.reshape(-1)]
+    
+    def clear(self):
+        """Drop all cached blocks."""
+        with self._lock:
+            self._temporal.clear()
+            self._spatial.clear()
+    
+    def stats(self) -> Dict:
+        """Return hit rates and memory use for both layers."""
+        def hit_rate(hits, misses):
+            return round(hits / (hits + misses), 4) if hits + misses else 0.0
+        
+        with self._lock:
+            return {
+                'temporal': {
+                    'entries': len(self._temporal),
+                    'hits': self.temporal_hits,
+                    'misses': self.temporal_misses,
+                    'hitRate': hit_rate(self.temporal_hits, self.temporal_misses),
+                    'approxBytes': len(self._temporal) * _ROW_BYTES[28]
+                },
+                'spatial': {
+                    'entries': len(self._spatial),
+                    'maxEntries': self.max_cells,
+                    'precision': self.precision,
+                    'hits': self.spatial_hits,
+                    'misses': self.spatial_misses,
+                    'evictions': self.spatial_evictions,
+                    'hitRate': hit_rate(self.spatial_hits, self.spatial_misses),
+                    'approxBytes': len(self._spatial) * _ROW_BYTES[24]
+                }
+            }
+
+# Exact-coordinate cache shared by predict_groundwater and the worker
+FEATURE_CACHE = FeatureCache()
+
+# Fields present in every prediction response
+CORE_FIELDS = ('currentWaterLevel', 'futureWaterLevel', 'isSuitableForBorewell', 'location')
+# Sections built only when requested, in response order
+OPTIONAL_FIELDS = (
+    'yearlyPredictions', 'suitabilityNote', 'seasonalAnalysis', 'drillingTimeline',
+    'bestDrillingTime', 'confidence', 'confidenceBreakdown', 'confidenceExplanation'
+)
+_CONFIDENCE_FIELDS = frozenset(('confidence', 'confidenceBreakdown', 'confidenceExplanation'))
+DETAIL_LEVELS = {
+    'minimal': (),
+    'summary': ('yearlyPredictions', 'suitabilityNote', 'confidence'),
+    'full': OPTIONAL_FIELDS,
+}
+
+def resolve_fields(fields=None, detail: Optional[str] = None) -> Optional[frozenset]:
+    """
+    Return the optional sections to build for a request, or None for the full
+    response. `fields` is a list (or comma-separated string) of response keys and
+    `detail` one of DETAIL_LEVELS; when both are given their sections are combined.
+    Core fields are always returned and may be listed without effect.
+    """
+    if fields is None and detail is None:
+        return None
+    if detail is not None and detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of {', '.join(DETAIL_LEVELS)}")
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    
+    selected = set(DETAIL_LEVELS[detail]) if detail is not None else set()
+    for field in fields or ():
+        if field in OPTIONAL_FIELDS:
+            selected.add(field)
+        elif field not in CORE_FIELDS:
+            raise ValueError(f"Unknown field '{field}'")
+    return None if len(selected) == len(OPTIONAL_FIELDS) else frozenset(selected)
+
+def _select_fields(result: Dict, sections: Optional[frozenset]) -> Dict:
+    """Drop optional sections that were not requested (used for prebuilt results)."""
+    if sections is None:
+        return result
+    return {key: value for key, value in result.items() if key not in OPTIONAL_FIELDS or key in sections}
+
+class ResultCache:
+    """
+    LRU cache of complete `predict_water_level` results.
+    Keys are the coordinate snapped to `precision` decimal places, the model
+    version and a date bucket ('day' or 'month'). On a miss the prediction is
+    made at the snapped coordinate, so every request in a cell gets the same
+    answer; the requested location is restored on the way out. Results are
+    stored as JSON, which makes each hit an independent copy and lets the cache
+    be persisted to `persist_path` between worker restarts.
+    """
+    
+    def __init__(self, max_entries: int = 10000, precision: Optional[int] = 3, bucket: str = 'day',
+                 persist_path: Optional[str] = None):
+        if bucket not in ('day', 'month'):
+            raise ValueError("bucket must be 'day' or 'month'")
+        self.max_entries = max_entries
+        self.precision = precision
+        self.bucket = bucket
+        self.persist_path = persist_path
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if persist_path and os.path.exists(persist_path):
+            self.load()
+    
+    def key(self, latitude: float, longitude: float, model_version: Optional[str], date=None,
+            sections: Optional[frozenset] = None) -> Tuple:
+        """Cache key for a coordinate and set of response sections on a given day (today by default)."""
+        day = date or datetime.date.today()
+        bucket = day.strftime('%Y-%m-%d' if self.bucket == 'day' else '%Y-%m')
+        if self.precision is not None:
+            latitude, longitude = round(float(latitude), self.precision), round(float(longitude), self.precision)
+        fields = '*' if sections is None else ','.join(sorted(sections))
+        return (float(latitude), float(longitude), model_version or '', bucket, fields)
+    
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """Return a copy of the cached result for `key`, or None."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return json.loads(payload)
+    
+    def put(self, key: Tuple, result: Dict):
+        """Store a result, evicting the least recently used entries past `max_entries`."""
+        payload = json.dumps(result)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def predict(self, predictor: 'GroundwaterPredictor', latitude: float, longitude: float,
+                sections: Optional[frozenset] = None, as_of: Optional[datetime.date] = None,
+                coalescer: Optional['PredictionCoalescer'] = None) -> Tuple[Dict, bool]:
+        """
+        Return (result, cache hit) for a coordinate, predicting only on a miss.
+        Misses go through `coalescer` when one is given.
+        """
+        key = self.key(latitude, longitude, predictor.model_version, as_of, sections)
+        result = self.get(key)
+        hit = result is not None
+        if not hit:
+            if coalescer is not None:
+                result = coalescer.predict(predictor, key[0], key[1], sections, as_of)
+            else:
+                result = predictor.predict_water_level(key[0], key[1], sections=sections, as_of=as_of)
+            # Fallbacks describe a failure, not the location, so they are not kept
+            if 'fallback_reason' not in result:
+                self.put(key, result)
+        result['location'] = {'latitude': latitude, 'longitude': longitude}
+        return result, hit
+    
+    def load(self):
+        """Read entries saved by `save` from `persist_path`."""
+        try:
+            with open(self.persist_path, 'r') as f:
+                saved = json.load(f)
+            with self._lock:
+                for key, payload in saved['entries']:
+                    self._entries[tuple(key)] = payload
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Could not load result cache from {self.persist_path}: {str(e)}")
+    
+    def save(self):
+        """Write all entries to `persist_path` (oldest first) if persistence is enabled."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            entries = [[list(key), payload] for key, payload in self._entries.items()]
+        temp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'entries': entries}, f)
+        os.replace(temp_path, self.persist_path)
+    
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'precision': self.precision,
+                'bucket': self.bucket,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Upper limit for `GroundwaterPredictor.forecast` horizons
+MAX_FORECAST_YEARS = 20
+
+class PredictionCoalescer:
+    """
+    Micro-batches concurrent single-point predictions.
+    Callers block in `predict` while requests collect for up to `window_ms`
+    (or until `max_batch` are waiting); a background thread then scores each
+    group sharing a model, response sections and date with one
+    `predict_water_levels` call and hands every caller its result. A request
+    for a coordinate that is already waiting or being scored joins that
+    computation instead of adding a row. Batch results are identical to
+    `predict_water_level`'s, so coalescing never changes an answer.
+    """
+    
+    def __init__(self, window_ms: float = 2.0, max_batch: int = 64):
+        if window_ms < 0 or max_batch < 1:
+            raise ValueError("window_ms must be >= 0 and max_batch >= 1")
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[Tuple, float]] = []  # (key, arrival time) of rows still to score
+        self._waiting: Dict[Tuple, Tuple] = {}  # key -> (predictor, futures) until the row is scored
+        self._thread = None
+        self.requests = 0
+        self.merged = 0
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+    
+    def submit(self, predictor: 'GroundwaterPredictor', latitude: float, longitude: float,
+               sections: Optional[frozenset] = None, as_of: Optional[datetime.date] = None) -> Future:
+        """Queue one prediction and return a Future for its result."""
+        key = (predictor.model_path, predictor.model_version, sections, as_of, float(latitude), float(longitude))
+        future = Future()
+        with self._condition:
+            self.requests += 1
+            waiting = self._waiting.get(key)
+            if waiting is not None:
+                waiting[1].append(future)
+                self.merged += 1
+                return future
+            self._waiting[key] = (predictor, [future])
+            self._queue.append((key, time.monotonic()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prediction-coalescer', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+    
+    def predict(self, predictor: 'GroundwaterPredictor', latitude: float, longitude: float,
+                sections: Optional[frozenset] = None, as_of: Optional[datetime.date] = None) -> Dict:
+        """Return what `predictor.predict_water_level` would, scored together with concurrent requests."""
+        return self.submit(predictor, latitude, longitude, sections, as_of).result()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                # The oldest waiting request decides when the batch closes
+                deadline = self._queue[0][1] + self.window_ms / 1000
+                while len(self._queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                keys = [key for key, _ in self._queue[:self.max_batch]]
+                del self._queue[:self.max_batch]
+                groups: Dict[Tuple, List[Tuple]] = {}
+                for key in keys:
+                    groups.setdefault(key[:4], []).append(key)
+                predictors = {group: self._waiting[group_keys[0]][0] for group, group_keys in groups.items()}
+                self.batches += 1
+                self.rows += len(keys)
+                self.largest_batch = max(self.largest_batch, len(keys))
+            
+            for group, group_keys in groups.items():
+                self._score(predictors[group], group_keys)
+    
+    def _score(self, predictor: 'GroundwaterPredictor', keys: List[Tuple]):
+        _, _, sections, as_of, latitude, longitude = keys[0]
+        try:
+            if len(keys) == 1:
+                # A lone request takes the scalar path, which is faster for one row
+                results = [predictor.predict_water_level(latitude, longitude, sections=sections, as_of=as_of)]
+            else:
+                results = predictor.predict_water_levels([key[4] for key in keys], [key[5] for key in keys],
+                                                         sections=sections, as_of=as_of)
+            error = None
+        except Exception as e:
+            results, error = [None] * len(keys), e
+        
+        # Merged requests may have joined while the batch was scored, so waiters are collected last
+        with self._condition:
+            waiters = [self._waiting.pop(key)[1] for key in keys]
+        for futures, result in zip(waiters, results):
+            for i, future in enumerate(futures):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    # Every caller gets its own copy, since callers fill in their own location
+                    future.set_result(result if i == 0 else copy.deepcopy(result))
+    
+    def stats(self) -> Dict:
+        """Return request, merge and batch counters."""
+        with self._condition:
+            return {
+                'windowMs': self.window_ms,
+                'maxBatch': self.max_batch,
+                'requests': self.requests,
+                'merged': self.merged,
+                'batches': self.batches,
+                'meanBatch': round(self.rows / self.batches, 2) if self.batches else 0.0,
+                'largestBatch': self.largest_batch,
+                'queued': len(self._queue)
+            }
+
+# Result cache used by predict_groundwater; the worker may enable persistence
+RESULT_CACHE = ResultCache()
+RESULT_CACHE_SAVE_SECONDS = 300
+
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Stage that each optional response section is timed under
+_SECTION_STAGES = {
+    'yearlyPredictions': 'advisory',
+    'suitabilityNote': 'advisory',
+    'seasonalAnalysis': 'seasonalAnalysis',
+    'drillingTimeline': 'drillingTimeline',
+    'bestDrillingTime': 'drillingTimeline',
+    'confidence': 'confidence',
+    'confidenceBreakdown': 'confidence',
+    'confidenceExplanation': 'confidence'
+}
+
+class _StageClock:
+    """Accumulates wall time per stage; each `lap` charges the time since the previous one."""
+    __slots__ = ('stages', '_start', '_last')
+    
+    def __init__(self):
+        self.stages = {}
+        self._start = self._last = time.perf_counter()
+    
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+    
+    def finish(self) -> Dict[str, float]:
+        """Return the stage durations in seconds plus their `total`."""
+        self.stages['total'] = self._last - self._start
+        return self.stages
+
+class StageMetrics:
+    """
+    In-process latency histograms for the stages of `predict_water_level`.
+    Timings are only collected when `enabled` is set or a caller asks for a
+    `_timings` block; `prometheus` renders the histograms in the Prometheus
+    text exposition format.
+    """
+    
+    def __init__(self, buckets=STAGE_BUCKETS, enabled: bool = False):
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict] = {}
+    
+    def observe(self, stages: Dict[str, float]):
+        """Record one prediction's stage durations (seconds)."""
+        with self._lock:
+            for stage, seconds in stages.items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = {
+                        'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'max': 0.0
+                    }
+                # Prometheus buckets are inclusive upper bounds (le)
+                histogram['counts'][bisect.bisect_left(self.buckets, seconds)] += 1
+                histogram['sum'] += seconds
+                histogram['max'] = max(histogram['max'], seconds)
+    
+    def clear(self):
+        """Drop all recorded timings."""
+        with self._lock:
+            self._histograms.clear()
+    
+    def stats(self) -> Dict:
+        """Return count, mean and max (ms) per stage."""
+        with self._lock:
+            summary = {}
+            for stage, histogram in self._histograms.items():
+                count = sum(histogram['counts'])
+                summary[stage] = {
+                    'count': count,
+                    'meanMs': round(histogram['sum'] * 1000 / count, 3) if count else 0.0,
+                    'maxMs': round(histogram['max'] * 1000, 3)
+                }
+            return summary
+    
+    def prometheus(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """Render the histograms as `groundwater_prediction_stage_seconds`; `labels` are added to every series."""
+        name = 'groundwater_prediction_stage_seconds'
+        extra = ''.join(f'{key}="{value}",' for key, value in (labels or {}).items())
+        lines = [
+            f'# HELP {name} Time spent in each stage of predict_water_level.',
+            f'# TYPE {name} histogram'
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram['counts']):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{extra}stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{extra}stage="{stage}"}} {histogram["sum"]!r}')
+                lines.append(f'{name}_count{{{extra}stage="{stage}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+# Stage histograms fed by predict_water_level; the worker enables collection with --stage-metrics
+STAGE_METRICS = StageMetrics()
+
+# SplitMix64 constants, used to derive fallback jitter from coordinates without shared RNG state
+_HASH_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_HASH_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_HASH_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+def coordinate_hash(latitudes, longitudes) -> np.ndarray:
+    """
+    Uniform [0, 1) values from a stateless hash of coordinates rounded to
+    0.001 degrees, so the same location always gets the same value on any
+    thread and in any batch.
+    """
+    lat = np.round(np.asarray(latitudes, dtype=float).reshape(-1) * 1000).astype(np.int64).view(np.uint64)
+    lng = np.round(np.asarray(longitudes, dtype=float).reshape(-1) * 1000).astype(np.int64).view(np.uint64)
+    x = lat * _HASH_GOLDEN + lng
+    x = (x ^ (x >> np.uint64(30))) * _HASH_MIX_1
+    x = (x ^ (x >> np.uint64(27))) * _HASH_MIX_2
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(float) / float(1 << 53)
+
+def fallback_levels(latitudes, longitudes) -> Dict[str, np.ndarray]:
+    """
+    Heuristic levels used when the model is missing or fails, for a whole
+    batch: current and future level (mbgl), borewell suitability and a
+    confidence with +/- 5% jitter from `coordinate_hash`.
+    """
+    lat = np.asarray(latitudes, dtype=float).reshape(-1)
+    lng = np.asarray(longitudes, dtype=float).reshape(-1)
+    abs_lat = np.abs(lat)
+    current = np.clip(15 + abs_lat / 3, 5, 50)
+    
+    # Tropical/subtropical latitudes and moderate levels are more predictable
+    confidence = 0.5 + np.select([(abs_lat >= 10) & (abs_lat <= 30), abs_lat <= 10], [0.15, 0.1], 0.0)
+    confidence = confidence + np.select([(current >= 10) & (current <= 30), (current >= 5) & (current <= 40)],
+                                        [0.1, 0.05], 0.0)
+    confidence = np.clip(confidence + (coordinate_hash(lat, lng) - 0.5) * 0.1, 0.4, 0.8)
+    return {
+        'currentWaterLevel': current,
+        'futureWaterLevel': current * 1.1,  # Water table deepens over time
+        'isSuitableForBorewell': (current >= 10) & (current <= 40),
+        'confidence': confidence
+    }
+
 class GroundwaterPredictor:
-    def __init__(self, model_path: str = 'groundwater_model.pkl'):
-        """Initialize the groundwater prediction model."""
+    """
+    Groundwater level predictions for coordinates.
+    
+    Thread safety: a predictor may be shared by any number of threads. Its
+    attributes are set in `__init__` and never changed afterwards, and every
+    prediction keeps its intermediate state in local variables. The shared
+    process-wide objects it uses (MODEL_REGISTRY, FEATURE_CACHE, RESULT_CACHE,
+    STAGE_METRICS, COALESCER, REQUEST_PROFILER) lock internally, and the loaded
+    model is only read: compiled ensembles and scikit-learn trees predict
+    without mutating themselves, and XGBoost prediction is thread-safe.
+    Configuration calls (`set_training_points`, `configure_threads`,
+    `enable_request_coalescing`, `enable_request_profiling`) replace shared
+    state and belong at startup, before requests are served. A reloaded model
+    file is picked up by predictors created afterwards.
+    """
+    
+    def __init__(self, model_path: str = 'groundwater_model.pkl', feature_cache: Optional[FeatureCache] = None,
+                 allow_missing: bool = False):
+        """
+        Initialize the groundwater prediction model.
+        When `feature_cache` is given, features are assembled from its cached blocks.
+        With `allow_missing` a missing model file is not an error; every prediction
+        then uses the heuristic fallback (see `fallback_levels`).
+        """
         self.model = None
+        self.feature_cache = feature_cache
+        self.model_version = None
         self.model_path = model_path
+        if allow_missing and not os.path.exists(model_path):
+            logger.warning(f"Model file not found at {model_path}; using fallback predictions")
+            return
         self.load_model()
     
     def load_model(self):
-        """Load the pickle model."""
+        """Load the pickle model through the process-wide model registry."""
         try:
             if os.path.exists(self.model_path):
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                logger.info(f"Model loaded successfully from {self.model_path}")
+                self.model, self.model_version = MODEL_REGISTRY.load(self.model_path)
             else:
                 logger.error(f"Model file not found at {self.model_path}")
                 raise FileNotFoundError(f"Model file not found at {self.model_path}")
@@ -32,16 +1476,21 @@ class GroundwaterPredictor:
             logger.error(f"Error loading model: {str(e)}")
             raise
     
-    def prepare_features(self, latitude: float, longitude: float) -> np.ndarray:
+    def prepare_features(self, latitude: float, longitude: float, as_of: Optional[datetime.date] = None) -> np.ndarray:
         """
         Prepare features for prediction based on latitude and longitude.
         Updated to generate the exact 72 features that the XGBoost model expects.
+        Temporal features describe `as_of` (today by default).
         """
-        import datetime
-        import math
+        as_of = parse_as_of(as_of)
+        if self.feature_cache is not None:
+            return self.feature_cache.features(latitude, longitude, as_of)
         
-        # Get current date for temporal features
-        current_date = datetime.datetime.now()
+        # Get the as-of date for temporal features
+        if as_of is None:
+            current_date = datetime.datetime.now()
+        else:
+            current_date = datetime.datetime.combine(as_of, datetime.time())
         year = current_date.year
         month = current_date.month
         day_of_year = current_date.timetuple().tm_yday
@@ -224,89 +1673,314 @@ class GroundwaterPredictor:
         
         return np.array(features).reshape(1, -1)
     
-    def predict_water_level(self, latitude: float, longitude: float) -> Dict:
+    def prepare_features_batch(self, latitudes, longitudes, dates=None) -> np.ndarray:
+        """
+        Vectorised version of `prepare_features` for many coordinates at once.
+        `dates` may be None (now), a single date or one date per coordinate.
+        Returns an (N, 72) matrix whose rows match `prepare_features` exactly.
+        """
+        lat = np.asarray(latitudes, dtype=float).reshape(-1)
+        lng = np.asarray(longitudes, dtype=float).reshape(-1)
+        if lat.shape != lng.shape:
+            raise ValueError("latitudes and longitudes must have the same length")
+
+        days = _to_day_array(dates, lat.shape[0])
+        if self.feature_cache is not None:
+            temporal = self.feature_cache.temporal_block(days)
+        else:
+            temporal = _temporal_feature_block(days)
+        spatial = _spatial_feature_block(lat, lng)
+        return _assemble_features(temporal, spatial, _interaction_feature_block(temporal, spatial))
+    
+    def predict_water_level(self, latitude: float, longitude: float, fields=None, detail: Optional[str] = None,
+                            sections: Optional[frozenset] = None, timings: bool = False,
+                            as_of: Optional[datetime.date] = None) -> Dict:
         """
         Predict groundwater level and related metrics.
+        `fields`/`detail` (see `resolve_fields`) limit the optional sections that are
+        built; `sections` passes an already resolved set. With `timings` the result
+        gets a `_timings` block of per-stage milliseconds; stage durations are also
+        recorded in `STAGE_METRICS` whenever it is enabled. `as_of` sets the date
+        the prediction describes (today by default): the model's temporal features
+        as well as the seasonal confidence and drilling advice.
         """
+        if sections is None:
+            sections = resolve_fields(fields, detail)
+        as_of = parse_as_of(as_of)
+        clock = _StageClock() if timings or STAGE_METRICS.enabled else None
         try:
             if self.model is None:
                 raise ValueError("Model not loaded")
             
             # Prepare features
-            features = self.prepare_features(latitude, longitude)
+            features = self.prepare_features(latitude, longitude, as_of)
+            if clock is not None:
+                clock.lap('features')
             
             # Make prediction
             if hasattr(self.model, 'predict'):
                 # If it's a scikit-learn model or similar
                 prediction = self.model.predict(features)[0]
                 
-                # Calculate more accurate confidence based on model type and prediction quality
-                confidence = self._calculate_confidence(features, prediction, latitude, longitude)
+                # Confidence comes from the confidence engine, based on prediction quality
+                confidence = None
                 
             else:
                 # Fallback for other model types
                 prediction = float(self.model(features))
                 confidence = 0.75  # Default confidence for non-sklearn models
+            if clock is not None:
+                clock.lap('model')
             
-            # Ensure prediction is reasonable (between 0 and 100 meters)
-            current_water_level = max(0, min(100, float(prediction)))
-            
-            # Generate future prediction (simplified)
-            future_water_level = self._predict_future_level(current_water_level, latitude, longitude)
+            components = None
+            if sections is None or sections & _CONFIDENCE_FIELDS:
+                components = self._compute_confidence_components(features, prediction, latitude, longitude, as_of)
+                if clock is not None:
+                    clock.lap('confidence')
+            result = self._build_prediction_result(features, prediction, latitude, longitude, components, confidence,
+                                                   sections=sections, clock=clock, as_of=as_of)
             
-            # Determine suitability for borewell
-            is_suitable = self._assess_borewell_suitability(
-                current_water_level, future_water_level, latitude, longitude
-            )
+            if clock is not None:
+                stages = clock.finish()
+                if STAGE_METRICS.enabled:
+                    STAGE_METRICS.observe(stages)
+                if timings:
+                    result['_timings'] = {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+            return result
             
-            # Generate suitability advisory note
-            suitability_note = self._generate_suitability_note(current_water_level, future_water_level, is_suitable)
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                current_water_level, future_water_level, is_suitable
-            )
-            
-            # Generate seasonal analysis and drilling recommendations
-            seasonal_analysis = self._generate_seasonal_analysis(current_water_level, latitude, longitude)
-            drilling_timeline = self._generate_drilling_timeline(current_water_level, future_water_level, latitude, longitude)
-            yearly_predictions = self._generate_yearly_predictions(current_water_level)
-            
-            return {
-                'currentWaterLevel': round(current_water_level, 2),
-                'futureWaterLevel': round(future_water_level, 2),
-                'isSuitableForBorewell': is_suitable,
-                'location': {
-                    'latitude': latitude,
-                    'longitude': longitude
-                },
-                'yearlyPredictions': yearly_predictions,
-                'suitabilityNote': suitability_note,
-                'seasonalAnalysis': seasonal_analysis,
-                'drillingTimeline': drilling_timeline,
-                'bestDrillingTime': self._get_best_drilling_time(latitude, longitude),
-                'confidence': round(confidence, 3),  # Keep for internal use but de-emphasize
-                'confidenceBreakdown': self._get_confidence_breakdown(features, prediction, latitude, longitude),
-                'confidenceExplanation': self._get_confidence_explanation(features, prediction, latitude, longitude)
-            }
+        except Exception as e:
+            return _select_fields(self._handle_prediction_error(e, latitude, longitude, as_of), sections)
+    
+    def predict_water_levels(self, latitudes, longitudes, fields=None, detail: Optional[str] = None,
+                             sections: Optional[frozenset] = None, as_of=None) -> List[Dict]:
+        """
+        Predict groundwater levels for many coordinates with a single model call.
+        Returns one result per coordinate in the same schema as `predict_water_level`.
+        `as_of` is one date for all coordinates or one per coordinate (today by default).
+        """
+        if sections is None:
+            sections = resolve_fields(fields, detail)
+        lat = np.asarray(latitudes, dtype=float).reshape(-1)
+        lng = np.asarray(longitudes, dtype=float).reshape(-1)
+        days = _to_day_array(as_of, lat.shape[0])
+        
+        try:
+            if self.model is None:
+                raise ValueError("Model not loaded")
             
+            features = self.prepare_features_batch(lat, lng, days)
+            has_predict = hasattr(self.model, 'predict')
+            if has_predict:
+                predictions = np.asarray(self.model.predict(features), dtype=float).reshape(-1)
+            else:
+                predictions = np.asarray(self.model(features), dtype=float).reshape(-1)
         except Exception as e:
-            logger.error(f"Prediction error: {str(e)}")
-            logger.error(f"Model loaded: {self.model is not None}")
-            logger.error(f"Model type: {type(self.model) if self.model else 'None'}")
+            return [_select_fields(result, sections) for result in self._handle_prediction_errors(e, lat, lng, days)]
+        
+        # Confidence components and seasonal levels for the batch in vectorised passes, when requested
+        masks = classify_regions(lat, lng)
+        component_lists = None
+        if sections is None or sections & _CONFIDENCE_FIELDS:
+            batch_components = self._compute_confidence_components_batch(features, predictions, lat, lng, masks, days)
+            component_lists = {key: values.tolist() for key, values in batch_components.items()}
+        seasonal_analyses = None
+        if sections is None or 'seasonalAnalysis' in sections:
+            seasonal_analyses = self._generate_seasonal_analyses(np.clip(predictions, 0, 100), lat, lng, masks)
+        
+        prediction_list = predictions.tolist()
+        day_list = days.tolist()
+        results = []
+        for i, (latitude, longitude) in enumerate(zip(lat.tolist(), lng.tolist())):
+            try:
+                components = None
+                if component_lists is not None:
+                    components = {key: values[i] for key, values in component_lists.items()}
+                confidence = None if has_predict else 0.75
+                results.append(self._build_prediction_result(
+                    features[i:i + 1], prediction_list[i], latitude, longitude, components, confidence,
+                    seasonal_analyses[i] if seasonal_analyses is not None else None, sections, as_of=day_list[i]
+                ))
+            except Exception as e:
+                results.append(_select_fields(self._handle_prediction_error(e, latitude, longitude, day_list[i]),
+                                              sections))
+        
+        return results
+    
+    def predict_levels(self, latitudes, longitudes, dates=None) -> Dict[str, np.ndarray]:
+        """
+        Core vectorised prediction without the per-point advisory sections.
+        Returns arrays of current and future water level (mbgl) and borewell suitability.
+        Used for bulk work such as rasters, where only the numbers are needed.
+        If the model is missing or fails, the whole batch gets `fallback_levels`.
+        """
+        lat = np.asarray(latitudes, dtype=float).reshape(-1)
+        lng = np.asarray(longitudes, dtype=float).reshape(-1)
+        try:
+            if self.model is None:
+                raise ValueError("Model not loaded")
             
-            # Return fallback prediction with reason
-            fallback_result = self._get_fallback_prediction(latitude, longitude)
-            fallback_result['fallback_reason'] = f"Model prediction failed: {str(e)}"
-            return fallback_result
+            features = self.prepare_features_batch(lat, lng, dates)
+            if hasattr(self.model, 'predict'):
+                predictions = np.asarray(self.model.predict(features), dtype=float).reshape(-1)
+            else:
+                predictions = np.asarray(self.model(features), dtype=float).reshape(-1)
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}; using fallback levels for {len(lat)} points")
+            levels = fallback_levels(lat, lng)
+            del levels['confidence']
+            return levels
+        
+        current = np.clip(predictions, 0, 100)
+        future = self._predict_future_levels(current, lat, lng)
+        return {
+            'currentWaterLevel': current,
+            'futureWaterLevel': future,
+            'isSuitableForBorewell': self._assess_borewell_suitability_batch(current, future, lat)
+        }
     
-    def _calculate_confidence(self, features: np.ndarray, prediction: float, latitude: float, longitude: float) -> float:
+    def forecast(self, latitude: float, longitude: float, years: int = 5, as_of=None, dates=None) -> Dict:
+        """
+        Model forecast for one location across many dates: the 15th of every month
+        for `years` years starting with the month of `as_of` (today by default), or
+        the explicit `dates`. Every date is scored in one batched model call, so the
+        monthly and yearly levels are model outputs rather than fixed multipliers.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded")
+        if not 1 <= years <= MAX_FORECAST_YEARS:
+            raise ValueError(f"years must be between 1 and {MAX_FORECAST_YEARS}")
+        
+        start = parse_as_of(as_of) or datetime.date.today()
+        if dates is None:
+            days = monthly_dates(start, years * 12)
+        else:
+            days = np.asarray(dates, dtype='datetime64[D]').reshape(-1)
+        n = days.shape[0]
+        features = self.prepare_features_batch(np.full(n, float(latitude)), np.full(n, float(longitude)), days)
+        if hasattr(self.model, 'predict'):
+            predictions = np.asarray(self.model.predict(features), dtype=float).reshape(-1)
+        else:
+            predictions = np.asarray(self.model(features), dtype=float).reshape(-1)
+        levels = np.clip(predictions, 0, 100)
+        
+        result = {
+            'location': {'latitude': latitude, 'longitude': longitude},
+            'asOf': start.isoformat(),
+            'modelVersion': self.model_version,
+            'monthly': [
+                {'date': day, 'waterLevel': round(level, 2)}
+                for day, level in zip(days.astype(str).tolist(), levels.tolist())
+            ]
+        }
+        if dates is None:
+            by_year = levels.reshape(years, 12)
+            result['yearly'] = [
+                {
+                    'year': f"Year {i + 1}",
+                    'meanLevel': round(float(row.mean()), 2),
+                    'minLevel': round(float(row.min()), 2),
+                    'maxLevel': round(float(row.max()), 2)
+                }
+                for i, row in enumerate(by_year)
+            ]
+        return result
+    
+    def _build_prediction_result(self, features: np.ndarray, prediction: float, latitude: float, longitude: float,
+                                 components: Optional[Dict], confidence: Optional[float] = None,
+                                 seasonal_analysis: Optional[Dict] = None,
+                                 sections: Optional[frozenset] = None, clock: Optional[_StageClock] = None,
+                                 as_of: Optional[datetime.date] = None) -> Dict:
+        """
+        Turn a raw model prediction into the response for one location.
+        `components` comes from the confidence engine (only needed for the confidence
+        sections); `confidence` overrides its final score. A precomputed
+        `seasonal_analysis` (from the batch path) is used as is. Optional sections
+        are generated lazily, only when listed in `sections` (None builds all).
+        A `clock` is charged with the time spent on each section. Drilling advice
+        counts months from `as_of` (today by default).
+        """
+        # Ensure prediction is reasonable (between 0 and 100 meters)
+        current_water_level = max(0, min(100, float(prediction)))
+        
+        # Generate future prediction (simplified)
+        future_water_level = self._predict_future_level(current_water_level, latitude, longitude)
+        
+        # Determine suitability for borewell
+        is_suitable = self._assess_borewell_suitability(
+            current_water_level, future_water_level, latitude, longitude
+        )
+        
+        result = {
+            'currentWaterLevel': round(current_water_level, 2),
+            'futureWaterLevel': round(future_water_level, 2),
+            'isSuitableForBorewell': is_suitable,
+            'location': {
+                'latitude': latitude,
+                'longitude': longitude
+            }
+        }
+        
+        builders = {
+            'yearlyPredictions': lambda: self._generate_yearly_predictions(current_water_level),
+            # Suitability advisory note
+            'suitabilityNote': lambda: self._generate_suitability_note(current_water_level, future_water_level, is_suitable),
+            # Seasonal analysis and drilling recommendations
+            'seasonalAnalysis': lambda: seasonal_analysis if seasonal_analysis is not None
+                                else self._generate_seasonal_analysis(current_water_level, latitude, longitude),
+            'drillingTimeline': lambda: self._generate_drilling_timeline(current_water_level, future_water_level, latitude, longitude,
+                                                                         as_of),
+            'bestDrillingTime': lambda: self._get_best_drilling_time(latitude, longitude, as_of),
+            # Keep for internal use but de-emphasize
+            'confidence': lambda: round(confidence if confidence is not None else components['final'], 3),
+            'confidenceBreakdown': lambda: self._get_confidence_breakdown(features, prediction, latitude, longitude, components,
+                                                                          as_of),
+            'confidenceExplanation': lambda: self._get_confidence_explanation(features, prediction, latitude, longitude,
+                                                                              components, as_of)
+        }
+        if clock is not None:
+            clock.lap('levels')
+        for field in OPTIONAL_FIELDS:
+            if sections is None or field in sections:
+                result[field] = builders[field]()
+                if clock is not None:
+                    clock.lap(_SECTION_STAGES[field])
+        
+        return result
+    
+    def _handle_prediction_error(self, error: Exception, latitude: float, longitude: float,
+                                 as_of: Optional[datetime.date] = None) -> Dict:
+        """Log a failed prediction and return the fallback result with its reason."""
+        return self._handle_prediction_errors(error, [latitude], [longitude], as_of)[0]
+    
+    def _handle_prediction_errors(self, error: Exception, latitudes, longitudes, as_of=None) -> List[Dict]:
+        """Log a failed batch prediction once and return fallback results with their reason."""
+        logger.error(f"Prediction error: {str(error)}")
+        logger.error(f"Model loaded: {self.model is not None}")
+        logger.error(f"Model type: {type(self.model) if self.model else 'None'}")
+        
+        # Return fallback predictions with reason
+        fallback_results = self._get_fallback_predictions(latitudes, longitudes, as_of)
+        for fallback_result in fallback_results:
+            fallback_result['fallback_reason'] = f"Model prediction failed: {str(error)}"
+        return fallback_results
+    
+    def _calculate_confidence(self, features: np.ndarray, prediction: float, latitude: float, longitude: float,
+                              as_of: Optional[datetime.date] = None) -> float:
         """
         Calculate prediction confidence based on comprehensive factors:
         1. Data Quality & Density
         2. Model Certainty & Predictive Strength  
         3. Environmental & Contextual Factors
         """
+        return self._compute_confidence_components(features, prediction, latitude, longitude, as_of)['final']
+    
+    def _compute_confidence_components(self, features: np.ndarray, prediction: float, latitude: float, longitude: float,
+                                       as_of: Optional[datetime.date] = None) -> Dict:
+        """
+        Compute every confidence component once.
+        The score, breakdown and explanation are all views of the returned dict.
+        Seasonal stability is scored for the month of `as_of` (today by default).
+        """
         # Enhanced base confidence - reduced for locations outside India
         if self._is_outside_india(latitude, longitude):
             base_confidence = 0.40  # Reduced confidence for out-of-bounds locations
@@ -318,15 +1992,15 @@ class GroundwaterPredictor:
         # =================================================================
         
         # 1.1 Spatial Data Density (simulated based on location characteristics)
-        spatial_density_score = self._calculate_spatial_density(latitude, longitude)
+        spatial_density = self._calculate_spatial_density(latitude, longitude)
         
         # 1.2 Temporal Frequency (simulated based on region development)
-        temporal_frequency_score = self._calculate_temporal_frequency(latitude, longitude)
+        temporal_frequency = self._calculate_temporal_frequency(latitude, longitude)
         
         # 1.3 Data Recentness (current prediction is "recent")
-        recentness_score = 0.05  # Assume current prediction is recent
+        recentness = 0.05  # Assume current prediction is recent
         
-        data_quality_score = spatial_density_score + temporal_frequency_score + recentness_score
+        data_quality_total = spatial_density + temporal_frequency + recentness
         
         # =================================================================
         # 2. MODEL CERTAINTY & PREDICTIVE STRENGTH (Max +0.15)
@@ -344,7 +2018,7 @@ class GroundwaterPredictor:
         # Additional penalty for locations >300km from nearest training point
         distance_penalty = self._calculate_distance_penalty(latitude, longitude)
         
-        model_certainty_score = prediction_certainty + feature_quality + training_similarity + distance_penalty
+        model_certainty_total = prediction_certainty + feature_quality + training_similarity + distance_penalty
         
         # =================================================================
         # 3. ENVIRONMENTAL & CONTEXTUAL FACTORS (Max +0.15)
@@ -354,7 +2028,7 @@ class GroundwaterPredictor:
         aquifer_confidence = self._calculate_enhanced_aquifer_confidence(latitude, longitude)
         
         # 3.2 Seasonal Stability (with arid zone penalties)
-        seasonal_confidence = self._calculate_enhanced_seasonal_confidence(latitude, longitude)
+        seasonal_confidence = self._calculate_enhanced_seasonal_confidence(latitude, longitude, as_of)
         
         # 3.3 Land Use & Human Impact
         landuse_confidence = self._calculate_landuse_confidence(latitude, longitude)
@@ -362,7 +2036,7 @@ class GroundwaterPredictor:
         # 3.4 Hydrogeological Context
         hydrogeo_confidence = self._calculate_hydrogeological_confidence(latitude, longitude)
         
-        environmental_score = aquifer_confidence + seasonal_confidence + landuse_confidence + hydrogeo_confidence
+        environmental_raw = aquifer_confidence + seasonal_confidence + landuse_confidence + hydrogeo_confidence
         
         # Cap environmental total at 10% unless high recharge structures or low variance detected
         environmental_cap = 0.10  # Base cap
@@ -373,86 +2047,158 @@ class GroundwaterPredictor:
         elif self._has_low_variance_conditions(latitude, longitude):
             environmental_cap = 0.11  # Allow up to 11% for low variance conditions
             
-        environmental_score = min(environmental_score, environmental_cap)
+        environmental_total = min(environmental_raw, environmental_cap)
         
         # =================================================================
         # FINAL CONFIDENCE CALCULATION
         # =================================================================
         
-        final_confidence = base_confidence + data_quality_score + model_certainty_score + environmental_score
-        
-        # Ensure confidence is within reasonable bounds (40% - 95%)
-        final_confidence = max(0.40, min(0.95, final_confidence))
+        total = base_confidence + data_quality_total + model_certainty_total + environmental_total
         
-        return final_confidence
+        return {
+            'prediction': prediction,
+            'base': base_confidence,
+            'spatial_density': spatial_density,
+            'temporal_frequency': temporal_frequency,
+            'recentness': recentness,
+            'data_quality_total': data_quality_total,
+            'prediction_certainty': prediction_certainty,
+            'feature_quality': feature_quality,
+            'training_similarity': training_similarity,
+            'distance_penalty': distance_penalty,
+            'model_certainty_total': model_certainty_total,
+            'aquifer': aquifer_confidence,
+            'seasonal': seasonal_confidence,
+            'landuse': landuse_confidence,
+            'hydrogeological': hydrogeo_confidence,
+            'environmental_raw': environmental_raw,
+            'environmental_cap': environmental_cap,
+            'environmental_total': environmental_total,
+            'total': total,
+            # Ensure confidence is within reasonable bounds (40% - 95%)
+            'final': max(0.40, min(0.95, total))
+        }
     
-    def _get_confidence_breakdown(self, features: np.ndarray, prediction: float, latitude: float, longitude: float) -> Dict:
+    def _compute_confidence_components_batch(self, features: np.ndarray, predictions: np.ndarray,
+                                             latitudes: np.ndarray, longitudes: np.ndarray,
+                                             masks: Optional[np.ndarray] = None, as_of=None) -> Dict[str, np.ndarray]:
         """
-        Provide detailed breakdown of confidence calculation for transparency.
+        Vectorised `_compute_confidence_components` for N rows.
+        Returns the same keys, each holding an (N,) array.
+        `as_of` is one date for all rows or one per row (today by default).
         """
-        # Enhanced base confidence calculation
-        if self._is_outside_india(latitude, longitude):
-            base_confidence = 0.40
-        else:
-            base_confidence = 0.60
-        
-        # Calculate individual components
-        spatial_density = self._calculate_spatial_density(latitude, longitude)
-        temporal_frequency = self._calculate_temporal_frequency(latitude, longitude)
-        recentness = 0.05
+        lat = np.asarray(latitudes, dtype=float).reshape(-1)
+        lng = np.asarray(longitudes, dtype=float).reshape(-1)
+        prediction = np.asarray(predictions, dtype=float).reshape(-1)
+        if masks is None:
+            masks = classify_regions(lat, lng)
+        flag = lambda name: has_region_flag(masks, name)
+        zero = np.zeros(lat.shape)
+        
+        outside = flag('outside_india')
+        major_city = flag('major_city')
+        urban = flag('urban_area')
+        base_confidence = np.where(outside, 0.40, 0.60)
+        
+        # 1. Data quality
+        spatial_density = np.select([major_city, urban, flag('rural_developed')], [0.08, 0.06, 0.04], 0.02)
+        temporal_frequency = np.select([major_city, urban], [0.05, 0.04], 0.02)
+        recentness = np.full(lat.shape, 0.05)
         data_quality_total = spatial_density + temporal_frequency + recentness
         
-        prediction_certainty = self._calculate_prediction_certainty(prediction)
-        feature_quality = self._calculate_feature_quality(features)
-        training_similarity = self._calculate_training_similarity(latitude, longitude, prediction)
-        distance_penalty = self._calculate_distance_penalty(latitude, longitude)
+        # 2. Model certainty (scores are accumulated step by step like the scalar path)
+        prediction_certainty = np.select(
+            [(prediction >= 5) & (prediction <= 30), (prediction >= 3) & (prediction <= 50), (prediction >= 1) & (prediction <= 80)],
+            [0.06, 0.04, 0.02], -0.02)
+        valid = ~(np.isnan(features).any(axis=1) | np.isinf(features).any(axis=1))
+        bounded = valid & np.all(np.abs(features) < 1000, axis=1)
+        feature_quality = zero + np.where(valid, 0.03, 0.0) + np.where(bounded, 0.02, 0.0)
+        in_extent = flag('training_extent')
+        training_similarity = zero + np.where(in_extent, 0.04, 0.0) + np.where(in_extent & flag('training_core'), 0.02, 0.0)
+        min_distance = _min_distance_to_training_regions_batch(lat, lng)
+        distance_penalty = np.where(outside, -0.05, np.select(
+            [min_distance > 300, min_distance > 200, min_distance > 100], [-0.05, -0.03, -0.01], 0.0))
         model_certainty_total = prediction_certainty + feature_quality + training_similarity + distance_penalty
         
-        aquifer_confidence = self._calculate_enhanced_aquifer_confidence(latitude, longitude)
-        seasonal_confidence = self._calculate_enhanced_seasonal_confidence(latitude, longitude)
-        landuse_confidence = self._calculate_landuse_confidence(latitude, longitude)
-        hydrogeo_confidence = self._calculate_hydrogeological_confidence(latitude, longitude)
-        
-        # Calculate environmental total with capping
-        environmental_raw = aquifer_confidence + seasonal_confidence + landuse_confidence + hydrogeo_confidence
-        environmental_cap = 0.10  # Base cap
+        # 3. Environmental factors
+        aquifer = np.select(
+            [flag('alluvial_plain'), flag('coastal_area') | flag('transitional_zone'), flag('hard_rock_terrain')],
+            [0.05, 0.03, 0.015], 0.01)
+        month_scores = np.array([self._seasonal_base_score(month) for month in range(13)])
+        seasonal = zero + month_scores[_months_of(as_of, lat.shape[0])]
+        seasonal = seasonal - np.where(flag('arid_region'), 0.03, np.where(flag('semi_arid_region'), 0.02, 0.0))
+        seasonal = seasonal - np.where(flag('rajasthan_region'), 0.01, 0.0)
+        seasonal = seasonal - np.where(flag('flood_prone'), 0.01, 0.0)
+        seasonal = np.maximum(-0.05, seasonal)
+        landuse = np.select([major_city, flag('agricultural_area'), flag('forest_area')], [0.01, 0.02, 0.04], 0.03)
+        hydrogeological = (zero + np.where(flag('recharge_structures'), 0.02, 0.0)
+                           + np.where(flag('groundwater_management'), 0.02, 0.0)
+                           + np.where(flag('good_natural_recharge'), 0.01, 0.0))
+        environmental_raw = aquifer + seasonal + landuse + hydrogeological
+        environmental_cap = np.select([flag('high_recharge_structures'), flag('low_variance_conditions')], [0.12, 0.11], 0.10)
+        environmental_total = np.minimum(environmental_raw, environmental_cap)
+        
+        total = base_confidence + data_quality_total + model_certainty_total + environmental_total
         
-        if self._has_high_recharge_structures(latitude, longitude):
-            environmental_cap = 0.12
-        elif self._has_low_variance_conditions(latitude, longitude):
-            environmental_cap = 0.11
-            
-        environmental_total = min(environmental_raw, environmental_cap)
+        return {
+            'prediction': prediction,
+            'base': base_confidence,
+            'spatial_density': spatial_density,
+            'temporal_frequency': temporal_frequency,
+            'recentness': recentness,
+            'data_quality_total': data_quality_total,
+            'prediction_certainty': prediction_certainty,
+            'feature_quality': feature_quality,
+            'training_similarity': training_similarity,
+            'distance_penalty': distance_penalty,
+            'model_certainty_total': model_certainty_total,
+            'aquifer': aquifer,
+            'seasonal': seasonal,
+            'landuse': landuse,
+            'hydrogeological': hydrogeological,
+            'environmental_raw': environmental_raw,
+            'environmental_cap': environmental_cap,
+            'environmental_total': environmental_total,
+            'total': total,
+            'final': np.maximum(0.40, np.minimum(0.95, total))
+        }
+    
+    def _get_confidence_breakdown(self, features: np.ndarray, prediction: float, latitude: float, longitude: float,
+                                  components: Optional[Dict] = None, as_of: Optional[datetime.date] = None) -> Dict:
+        """
+        Provide detailed breakdown of confidence calculation for transparency.
+        """
+        c = components or self._compute_confidence_components(features, prediction, latitude, longitude, as_of)
         
         # Determine location characteristics
         location_type = self._get_location_characteristics(latitude, longitude)
         
         return {
-            'baseConfidence': round(base_confidence * 100, 1),
+            'baseConfidence': round(c['base'] * 100, 1),
             'dataQuality': {
-                'spatialDensity': round(spatial_density * 100, 1),
-                'temporalFrequency': round(temporal_frequency * 100, 1),
-                'dataRecentness': round(recentness * 100, 1),
-                'total': round(data_quality_total * 100, 1)
+                'spatialDensity': round(c['spatial_density'] * 100, 1),
+                'temporalFrequency': round(c['temporal_frequency'] * 100, 1),
+                'dataRecentness': round(c['recentness'] * 100, 1),
+                'total': round(c['data_quality_total'] * 100, 1)
             },
             'modelCertainty': {
-                'predictionReasonableness': round(prediction_certainty * 100, 1),
-                'featureQuality': round(feature_quality * 100, 1),
-                'trainingSimilarity': round(training_similarity * 100, 1),
-                'distancePenalty': round(distance_penalty * 100, 1),
-                'total': round(model_certainty_total * 100, 1)
+                'predictionReasonableness': round(c['prediction_certainty'] * 100, 1),
+                'featureQuality': round(c['feature_quality'] * 100, 1),
+                'trainingSimilarity': round(c['training_similarity'] * 100, 1),
+                'distancePenalty': round(c['distance_penalty'] * 100, 1),
+                'total': round(c['model_certainty_total'] * 100, 1)
             },
             'environmentalFactors': {
-                'aquiferType': round(aquifer_confidence * 100, 1),
-                'seasonalStability': round(seasonal_confidence * 100, 1),
-                'landUseImpact': round(landuse_confidence * 100, 1),
-                'hydrogeological': round(hydrogeo_confidence * 100, 1),
-                'rawTotal': round(environmental_raw * 100, 1),
-                'appliedCap': round(environmental_cap * 100, 1),
-                'total': round(environmental_total * 100, 1)
+                'aquiferType': round(c['aquifer'] * 100, 1),
+                'seasonalStability': round(c['seasonal'] * 100, 1),
+                'landUseImpact': round(c['landuse'] * 100, 1),
+                'hydrogeological': round(c['hydrogeological'] * 100, 1),
+                'rawTotal': round(c['environmental_raw'] * 100, 1),
+                'appliedCap': round(c['environmental_cap'] * 100, 1),
+                'total': round(c['environmental_total'] * 100, 1)
             },
             'locationCharacteristics': location_type,
-            'finalConfidence': round(min(95.0, max(40.0, (base_confidence + data_quality_total + model_certainty_total + environmental_total) * 100)), 1)
+            'finalConfidence': round(min(95.0, max(40.0, c['total'] * 100)), 1)
         }
     
     def _get_location_characteristics(self, latitude: float, longitude: float) -> Dict:
@@ -465,42 +2211,43 @@ class GroundwaterPredictor:
             'dataAvailability': 'Limited'
         }
         
+        mask = region_mask(latitude, longitude)
+        
         # Determine region
-        if self._is_major_city(latitude, longitude):
+        if has_region_flag(mask, 'major_city'):
             characteristics['region'] = 'Major City'
             characteristics['urbanization'] = 'Highly Urban'
             characteristics['dataAvailability'] = 'Excellent'
-        elif 24 <= latitude <= 32 and 75 <= longitude <= 88:
+        elif has_region_flag(mask, 'gangetic_plains'):
             characteristics['region'] = 'Gangetic Plains'
             characteristics['aquiferType'] = 'Alluvial'
-        elif 12 <= latitude <= 20 and 74 <= longitude <= 82:
+        elif has_region_flag(mask, 'hard_rock_terrain'):
             characteristics['region'] = 'Deccan Plateau'
             characteristics['aquiferType'] = 'Hard Rock'
-        elif 20 <= latitude <= 30 and 68 <= longitude <= 78:
+        elif has_region_flag(mask, 'arid_region'):
             characteristics['region'] = 'Arid Zone'
             characteristics['climateZone'] = 'Arid'
-        elif latitude < 73 or longitude > 88:
+        elif has_region_flag(mask, 'characteristic_coastal_zone'):
             characteristics['region'] = 'Coastal Zone'
             characteristics['aquiferType'] = 'Coastal Alluvium'
         
         # Climate zone
-        if 6 <= latitude <= 23:
+        if has_region_flag(mask, 'tropical_latitudes'):
             characteristics['climateZone'] = 'Tropical'
-        elif latitude > 30:
+        elif has_region_flag(mask, 'subtropical_latitudes'):
             characteristics['climateZone'] = 'Subtropical'
             
         return characteristics
     
-    def _get_confidence_explanation(self, features: np.ndarray, prediction: float, latitude: float, longitude: float) -> Dict:
+    def _get_confidence_explanation(self, features: np.ndarray, prediction: float, latitude: float, longitude: float,
+                                    components: Optional[Dict] = None, as_of: Optional[datetime.date] = None) -> Dict:
         """
         Provide human-readable explanations for confidence components.
         """
-        # Calculate individual components for explanations
-        spatial_density = self._calculate_spatial_density(latitude, longitude)
-        temporal_frequency = self._calculate_temporal_frequency(latitude, longitude)
-        distance_penalty = self._calculate_distance_penalty(latitude, longitude)
-        aquifer_confidence = self._calculate_enhanced_aquifer_confidence(latitude, longitude)
-        seasonal_confidence = self._calculate_enhanced_seasonal_confidence(latitude, longitude)
+        c = components or self._compute_confidence_components(features, prediction, latitude, longitude, as_of)
+        spatial_density = c['spatial_density']
+        distance_penalty = c['distance_penalty']
+        seasonal_confidence = c['seasonal']
         
         # Data Quality explanation
         if spatial_density >= 0.06:
@@ -621,13 +2368,14 @@ class GroundwaterPredictor:
     def _calculate_training_similarity(self, latitude: float, longitude: float, prediction: float) -> float:
         """Calculate confidence based on similarity to training data."""
         similarity_score = 0.0
+        mask = region_mask(latitude, longitude)
         
         # Indian locations are within training distribution
-        if 6 <= latitude <= 37 and 68 <= longitude <= 97:
+        if has_region_flag(mask, 'training_extent'):
             similarity_score += 0.04
             
             # Core training regions
-            if 15 <= latitude <= 30 and 72 <= longitude <= 88:
+            if has_region_flag(mask, 'training_core'):
                 similarity_score += 0.02
                 
         return similarity_score
@@ -672,24 +2420,26 @@ class GroundwaterPredictor:
             
         return aquifer_score
     
-    def _calculate_enhanced_seasonal_confidence(self, latitude: float, longitude: float) -> float:
-        """Enhanced seasonal confidence with arid zone penalties."""
-        import datetime
-        current_month = datetime.datetime.now().month
-        seasonal_score = 0.0
-        
+    def _seasonal_base_score(self, month: int) -> float:
+        """Seasonal stability score for a calendar month."""
         # Post-monsoon period (most stable)
-        if current_month in [10, 11, 12]:
-            seasonal_score = 0.04
+        if month in [10, 11, 12]:
+            return 0.04
         # Winter (stable)
-        elif current_month in [1, 2]:
-            seasonal_score = 0.03
+        elif month in [1, 2]:
+            return 0.03
         # Pre-monsoon (less stable)
-        elif current_month in [3, 4, 5]:
-            seasonal_score = 0.02
+        elif month in [3, 4, 5]:
+            return 0.02
         # Monsoon (least stable)
-        elif current_month in [6, 7, 8, 9]:
-            seasonal_score = 0.01
+        elif month in [6, 7, 8, 9]:
+            return 0.01
+        return 0.0
+    
+    def _calculate_enhanced_seasonal_confidence(self, latitude: float, longitude: float,
+                                                as_of: Optional[datetime.date] = None) -> float:
+        """Enhanced seasonal confidence with arid zone penalties."""
+        seasonal_score = self._seasonal_base_score(_month_of(as_of))
             
         # Apply penalties for arid/semi-arid zones with high seasonal variability
         if self._is_arid_region(latitude, longitude):
@@ -726,10 +2476,10 @@ class GroundwaterPredictor:
             
         return aquifer_score
     
-    def _calculate_seasonal_confidence(self, latitude: float, longitude: float) -> float:
+    def _calculate_seasonal_confidence(self, latitude: float, longitude: float,
+                                       as_of: Optional[datetime.date] = None) -> float:
         """Calculate confidence based on seasonal stability."""
-        import datetime
-        current_month = datetime.datetime.now().month
+        current_month = _month_of(as_of)
         seasonal_score = 0.0
         
         # Post-monsoon period (most stable)
@@ -789,125 +2539,67 @@ class GroundwaterPredictor:
     # Helper methods for regional classification
     def _is_major_city(self, lat: float, lng: float) -> bool:
         """Check if location is a major city."""
-        major_cities = [
-            (28.6, 77.2),    # Delhi
-            (19.1, 72.9),    # Mumbai  
-            (13.1, 80.3),    # Chennai
-            (12.9, 77.6),    # Bangalore
-            (22.6, 88.4),    # Kolkata
-            (17.4, 78.5),    # Hyderabad
-            (23.0, 72.6),    # Ahmedabad
-            (26.9, 75.8),    # Jaipur
-        ]
-        
-        for city_lat, city_lng in major_cities:
-            if abs(lat - city_lat) < 0.5 and abs(lng - city_lng) < 0.5:
-                return True
-        return False
+        return has_region_flag(region_mask(lat, lng), 'major_city')
     
     def _is_urban_area(self, lat: float, lng: float) -> bool:
         """Check if location is urban area."""
-        # Simplified: areas near major cities or state capitals
-        return (self._is_major_city(lat, lng) or 
-                (lat > 20 and lng > 75 and lng < 85))  # Urban corridor
+        return has_region_flag(region_mask(lat, lng), 'urban_area')
     
     def _is_rural_developed(self, lat: float, lng: float) -> bool:
         """Check if location is developed rural area."""
-        # Areas with moderate development
-        return (15 <= lat <= 30 and 70 <= lng <= 88)
+        return has_region_flag(region_mask(lat, lng), 'rural_developed')
     
     def _is_alluvial_plain(self, lat: float, lng: float) -> bool:
         """Check if location is in alluvial plains."""
-        # Gangetic plains and coastal plains
-        return ((24 <= lat <= 32 and 75 <= lng <= 88) or  # Gangetic plains
-                (lat < 15 and 75 <= lng <= 85))  # Southern coastal plains
+        return has_region_flag(region_mask(lat, lng), 'alluvial_plain')
     
     def _is_coastal_area(self, lat: float, lng: float) -> bool:
         """Check if location is coastal."""
-        return (lng < 73 or lng > 88 or lat < 12)
+        return has_region_flag(region_mask(lat, lng), 'coastal_area')
     
     def _is_hard_rock_terrain(self, lat: float, lng: float) -> bool:
         """Check if location is in hard rock terrain."""
-        # Deccan plateau and peninsular shield
-        return (12 <= lat <= 20 and 74 <= lng <= 82)
+        return has_region_flag(region_mask(lat, lng), 'hard_rock_terrain')
     
     def _is_arid_region(self, lat: float, lng: float) -> bool:
         """Check if location is in arid region."""
-        # Rajasthan and parts of Gujarat
-        return (20 <= lat <= 30 and 68 <= lng <= 78)
+        return has_region_flag(region_mask(lat, lng), 'arid_region')
     
     def _is_semi_arid_region(self, lat: float, lng: float) -> bool:
         """Check if location is in semi-arid region."""
-        # Parts of Maharashtra, Karnataka, Andhra Pradesh
-        return ((15 <= lat <= 20 and 74 <= lng <= 80) or  # Deccan semi-arid
-                (20 <= lat <= 25 and 78 <= lng <= 82))     # Central semi-arid
+        return has_region_flag(region_mask(lat, lng), 'semi_arid_region')
     
     def _is_transitional_zone(self, lat: float, lng: float) -> bool:
         """Check if location is in transitional geological zone."""
-        # Areas between major geological formations
-        return ((18 <= lat <= 24 and 76 <= lng <= 82) or  # Central transition
-                (22 <= lat <= 26 and 70 <= lng <= 76))     # Western transition
+        return has_region_flag(region_mask(lat, lng), 'transitional_zone')
     
     def _is_outside_india(self, lat: float, lng: float) -> bool:
         """Check if location is outside India's geographical bounds."""
-        return lat < 6 or lat > 37 or lng < 66 or lng > 98
+        return has_region_flag(region_mask(lat, lng), 'outside_india')
     
     def _calculate_min_distance_to_training_regions(self, lat: float, lng: float) -> float:
-        """Calculate minimum distance to major training data regions (in km)."""
-        import math
-        
-        # Major training regions (approximate centers)
-        training_regions = [
-            (28.6, 77.2),   # Delhi NCR
-            (19.1, 72.9),   # Mumbai region
-            (13.1, 80.3),   # Chennai region
-            (12.9, 77.6),   # Bangalore region
-            (22.6, 88.4),   # Kolkata region
-            (23.2, 77.4),   # Central India
-            (26.0, 73.0),   # Rajasthan
-            (21.1, 79.1),   # Nagpur region
-        ]
-        
-        min_distance = float('inf')
-        
-        for region_lat, region_lng in training_regions:
-            # Haversine distance calculation (simplified)
-            dlat = math.radians(lat - region_lat)
-            dlng = math.radians(lng - region_lng)
-            a = (math.sin(dlat/2)**2 + 
-                 math.cos(math.radians(region_lat)) * math.cos(math.radians(lat)) * 
-                 math.sin(dlng/2)**2)
-            distance = 6371 * 2 * math.asin(math.sqrt(a))  # Earth radius = 6371 km
-            min_distance = min(min_distance, distance)
-            
-        return min_distance
+        """Calculate minimum distance to the nearest training data point (in km)."""
+        return TRAINING_INDEX.nearest_distance_km(lat, lng)
     
     def _is_rajasthan_region(self, lat: float, lng: float) -> bool:
         """Check if location is specifically in Rajasthan (high seasonal variability)."""
-        # Rajasthan boundaries (approximate)
-        return (23 <= lat <= 30 and 69 <= lng <= 78)
+        return has_region_flag(region_mask(lat, lng), 'rajasthan_region')
     
     def _has_high_recharge_structures(self, lat: float, lng: float) -> bool:
         """Check if area has high density of artificial recharge structures."""
-        # Areas with intensive water conservation projects
-        return (self._is_rajasthan_region(lat, lng) or  # Rajasthan has many check dams
-                self._is_gujarat_region(lat, lng) or     # Gujarat has extensive recharge programs
-                self._is_maharashtra_drought_prone(lat, lng))  # Maharashtra watershed programs
+        return has_region_flag(region_mask(lat, lng), 'high_recharge_structures')
     
     def _has_low_variance_conditions(self, lat: float, lng: float) -> bool:
         """Check if area has naturally low groundwater variability."""
-        # Stable geological and climatic conditions
-        return (self._is_alluvial_plain(lat, lng) and  # Stable alluvial aquifers
-                not self._is_flood_prone(lat, lng) and  # Not flood-prone
-                not self._is_arid_region(lat, lng))     # Not in arid zone
+        return has_region_flag(region_mask(lat, lng), 'low_variance_conditions')
     
     def _is_gujarat_region(self, lat: float, lng: float) -> bool:
         """Check if location is in Gujarat."""
-        return (20 <= lat <= 24.5 and 68 <= lng <= 74.5)
+        return has_region_flag(region_mask(lat, lng), 'gujarat_region')
     
     def _is_maharashtra_drought_prone(self, lat: float, lng: float) -> bool:
         """Check if location is in drought-prone Maharashtra regions."""
-        return (17 <= lat <= 21 and 74 <= lng <= 80)
+        return has_region_flag(region_mask(lat, lng), 'maharashtra_drought_prone')
     
     def _generate_suitability_note(self, current_level: float, future_level: float, is_suitable: bool) -> str:
         """
@@ -939,37 +2631,27 @@ class GroundwaterPredictor:
     
     def _is_flood_prone(self, lat: float, lng: float) -> bool:
         """Check if location is flood-prone."""
-        # Gangetic plains and eastern India
-        return (22 <= lat <= 28 and 85 <= lng <= 92)
+        return has_region_flag(region_mask(lat, lng), 'flood_prone')
     
     def _is_agricultural_area(self, lat: float, lng: float) -> bool:
         """Check if location is primarily agricultural."""
-        # Most of rural India
-        return (15 <= lat <= 30 and 72 <= lng <= 88 and 
-                not self._is_major_city(lat, lng))
+        return has_region_flag(region_mask(lat, lng), 'agricultural_area')
     
     def _is_forest_area(self, lat: float, lng: float) -> bool:
         """Check if location is forested."""
-        # Central India forests, Western Ghats
-        return ((20 <= lat <= 25 and 78 <= lng <= 85) or  # Central forests
-                (8 <= lat <= 24 and 72 <= lng <= 78))     # Western Ghats
+        return has_region_flag(region_mask(lat, lng), 'forest_area')
     
     def _has_recharge_structures(self, lat: float, lng: float) -> bool:
         """Check if area likely has artificial recharge structures."""
-        # More likely in water-stressed regions
-        return self._is_arid_region(lat, lng) or self._is_urban_area(lat, lng)
+        return has_region_flag(region_mask(lat, lng), 'recharge_structures')
     
     def _has_groundwater_management(self, lat: float, lng: float) -> bool:
         """Check if area has active groundwater management."""
-        # More likely in developed states and urban areas
-        return (self._is_urban_area(lat, lng) or 
-                (lat > 23 and lng > 70 and lng < 80))  # Developed states
+        return has_region_flag(region_mask(lat, lng), 'groundwater_management')
     
     def _has_good_natural_recharge(self, lat: float, lng: float) -> bool:
         """Check if area has good natural recharge conditions."""
-        # Higher rainfall areas and permeable geology
-        return (self._is_forest_area(lat, lng) or 
-                (lat > 20 and lng > 85))  # High rainfall regions
+        return has_region_flag(region_mask(lat, lng), 'good_natural_recharge')
     
     def _predict_future_level(self, current_level: float, latitude: float, longitude: float) -> float:
         """
@@ -992,6 +2674,22 @@ class GroundwaterPredictor:
         future_level = current_level * seasonal_factor * trend_factor
         return min(100, future_level)  # Cap at 100m depth
     
+    def _predict_future_levels(self, current: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray,
+                               masks: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorised `_predict_future_level`."""
+        if masks is None:
+            masks = classify_regions(latitudes, longitudes)
+        seasonal_factor = np.where(np.abs(latitudes) > 30, 1.1, 1.05)
+        trend_factor = np.select(
+            [has_region_flag(masks, 'arid_region'), has_region_flag(masks, 'alluvial_plain'),
+             has_region_flag(masks, 'high_recharge_structures')],
+            [1.05, 1.02, 1.01], 1.03)
+        return np.minimum(100, current * seasonal_factor * trend_factor)
+    
+    def _assess_borewell_suitability_batch(self, current: np.ndarray, future: np.ndarray, latitudes: np.ndarray) -> np.ndarray:
+        """Vectorised `_assess_borewell_suitability`."""
+        return (current >= 3) & (current <= 80) & (future <= 100) & (np.abs(latitudes) <= 60)
+    
     def _assess_borewell_suitability(self, current: float, future: float, lat: float, lng: float) -> bool:
         """
         Assess if location is suitable for borewell drilling.
@@ -1064,22 +2762,56 @@ class GroundwaterPredictor:
         """
         Generate detailed seasonal water level analysis based on Indian regional patterns.
         """
-        region_type = self._get_region_type(latitude, longitude)
-        climate_zone = self._get_climate_zone(latitude, longitude)
-        
-        # Define seasonal patterns based on region and climate
-        seasonal_patterns = self._get_regional_seasonal_patterns(region_type, climate_zone, current_level)
+        mask = region_mask(latitude, longitude)
+        return self._seasonal_analysis(current_level, REGION_TYPE_INDEX[region_type_of(mask)],
+                                       CLIMATE_ZONE_INDEX[climate_zone_of(mask)])
+    
+    def _generate_seasonal_analyses(self, current_levels, latitudes, longitudes, masks=None) -> List[Dict]:
+        """Seasonal analysis for many locations; all monthly levels come from one broadcast."""
+        if masks is None:
+            masks = classify_regions(latitudes, longitudes)
+        regions = region_type_indices(masks)
+        climates = climate_zone_indices(masks)
+        levels = seasonal_levels(current_levels, regions, climates).tolist()
+        return [
+            self._seasonal_analysis(None, region, climate, monthly)
+            for region, climate, monthly in zip(regions.tolist(), climates.tolist(), levels)
+        ]
+    
+    def _seasonal_analysis(self, current_level: Optional[float], region: int, climate: int,
+                           monthly_levels: Optional[List[float]] = None) -> Dict:
+        """Assemble the seasonalAnalysis section from table indices."""
+        region_type = REGION_TYPES[region][1]
+        climate_zone = CLIMATE_ZONES[climate][1]
+        if monthly_levels is None:
+            monthly_levels = seasonal_levels([current_level], region, climate)[0].tolist()
         
         return {
             'regionType': region_type,
             'climateZone': climate_zone,
-            'seasonalPatterns': seasonal_patterns,
+            'seasonalPatterns': self._seasonal_patterns(region, climate, monthly_levels),
             'criticalMonths': self._get_critical_months(region_type, climate_zone),
             'rechargePeriod': self._get_recharge_period(region_type, climate_zone),
             'stressedPeriod': self._get_stressed_period(region_type, climate_zone)
         }
     
-    def _generate_drilling_timeline(self, current_level: float, future_level: float, latitude: float, longitude: float) -> Dict:
+    def _seasonal_patterns(self, region: int, climate: int, monthly_levels: List[float]) -> List[Dict]:
+        """Month-wise pattern entries from the precomputed template and 12 levels."""
+        return [
+            {
+                'month': month_name,
+                'monthNumber': month_number,
+                'waterLevel': round(level, 2),
+                'relativeLevel': relative_level,
+                'status': status,
+                'description': description
+            }
+            for (month_name, month_number, relative_level, status, description), level
+            in zip(SEASONAL_MONTH_TEMPLATES[region][climate], monthly_levels)
+        ]
+    
+    def _generate_drilling_timeline(self, current_level: float, future_level: float, latitude: float, longitude: float,
+                                    as_of: Optional[datetime.date] = None) -> Dict:
         """
         Generate drilling timeline recommendations based on seasonal patterns and water levels.
         """
@@ -1094,7 +2826,7 @@ class GroundwaterPredictor:
         avoid_months = self._get_avoid_drilling_months(region_type, climate_zone)
         
         # Generate timeline with specific recommendations
-        timeline = self._create_drilling_timeline(urgency, optimal_months, avoid_months, current_level)
+        timeline = self._create_drilling_timeline(urgency, optimal_months, avoid_months, current_level, as_of)
         
         return {
             'urgency': urgency,
@@ -1104,13 +2836,13 @@ class GroundwaterPredictor:
             'reasoning': self._get_drilling_reasoning(region_type, climate_zone, urgency)
         }
     
-    def _get_best_drilling_time(self, latitude: float, longitude: float) -> Dict:
+    def _get_best_drilling_time(self, latitude: float, longitude: float, as_of: Optional[datetime.date] = None) -> Dict:
         """
-        Get the single best time to start drilling based on region and current date.
+        Get the single best time to start drilling based on region and the as-of date (today by default).
         """
         region_type = self._get_region_type(latitude, longitude)
         climate_zone = self._get_climate_zone(latitude, longitude)
-        current_month = datetime.datetime.now().month
+        current_month = _month_of(as_of)
         
         optimal_months = self._get_optimal_drilling_months(region_type, climate_zone)
         
@@ -1148,152 +2880,27 @@ class GroundwaterPredictor:
     
     def _get_region_type(self, latitude: float, longitude: float) -> str:
         """Classify region type based on geographical and geological characteristics."""
-        # Check Thar Desert first (most specific)
-        if self._is_thar_desert_region(latitude, longitude):
-            return "Thar Desert"
-        elif self._is_western_ghats_region(latitude, longitude):
-            return "Western Ghats"
-        elif self._is_northeast_hills(latitude, longitude):
-            return "Northeast Hills"
-        elif self._is_gangetic_plains(latitude, longitude):
-            return "Gangetic Plains"
-        elif self._is_deccan_plateau_region(latitude, longitude):
-            return "Deccan Plateau"
-        elif self._is_coastal_plains(latitude, longitude):
-            return "Coastal Plains"
-        elif self._is_central_highlands(latitude, longitude):
-            return "Central Highlands"
-        else:
-            return "Mixed Terrain"
+        return region_type_of(region_mask(latitude, longitude))
     
     def _get_climate_zone(self, latitude: float, longitude: float) -> str:
         """Classify climate zone based on Indian climate patterns."""
-        if self._is_arid_climate(latitude, longitude):
-            return "Arid"
-        elif self._is_semi_arid_climate(latitude, longitude):
-            return "Semi-Arid"
-        elif self._is_tropical_wet(latitude, longitude):
-            return "Tropical Wet"
-        elif self._is_tropical_wet_dry(latitude, longitude):
-            return "Tropical Wet-Dry"
-        elif self._is_subtropical_humid(latitude, longitude):
-            return "Subtropical Humid"
-        elif self._is_mountain_climate(latitude, longitude):
-            return "Mountain"
-        else:
-            return "Temperate"
+        return climate_zone_of(region_mask(latitude, longitude))
     
     def _get_regional_seasonal_patterns(self, region_type: str, climate_zone: str, current_level: float) -> List[Dict]:
         """Generate month-wise water level patterns for specific region and climate."""
-        patterns = []
-        
-        # Base seasonal multipliers for different regions
-        if region_type == "Thar Desert":
-            # Strong monsoon influence, winter stability
-            base_pattern = [1.02, 1.0, 0.95, 0.85, 0.70, 0.65, 0.60, 0.65, 0.75, 0.85, 0.95, 1.0]
-        elif region_type == "Gangetic Plains":
-            # Strong monsoon influence, winter stability  
-            base_pattern = [0.95, 0.92, 0.90, 0.88, 0.85, 0.82, 0.75, 0.78, 0.85, 0.92, 0.98, 1.0]
-        elif region_type == "Deccan Plateau":
-            # Moderate monsoon, high summer stress
-            base_pattern = [0.98, 0.95, 0.88, 0.82, 0.75, 0.70, 0.65, 0.70, 0.80, 0.90, 0.95, 1.0]
-        elif region_type == "Coastal Plains":
-            # Monsoon + retreating monsoon, less extreme variation
-            base_pattern = [0.95, 0.92, 0.88, 0.85, 0.80, 0.75, 0.70, 0.75, 0.82, 0.88, 0.92, 0.95]
-        elif region_type == "Thar Desert":
-            # Extreme variation, minimal monsoon benefit
-            base_pattern = [1.05, 1.0, 0.92, 0.82, 0.70, 0.65, 0.60, 0.65, 0.75, 0.85, 0.95, 1.02]
-        elif region_type == "Western Ghats":
-            # Heavy monsoon, stable winter
-            base_pattern = [0.98, 0.95, 0.90, 0.85, 0.80, 0.70, 0.60, 0.65, 0.75, 0.85, 0.92, 0.95]
-        elif region_type == "Northeast Hills":
-            # Pre-monsoon rain, heavy monsoon
-            base_pattern = [0.92, 0.88, 0.85, 0.80, 0.75, 0.65, 0.55, 0.60, 0.70, 0.80, 0.88, 0.90]
-        else:
-            # Mixed terrain - moderate pattern
-            base_pattern = [0.95, 0.92, 0.88, 0.85, 0.80, 0.75, 0.70, 0.75, 0.82, 0.88, 0.92, 0.95]
-        
-        # Adjust for climate zone
-        climate_adjustments = self._get_climate_adjustments(climate_zone)
-        
-        month_names = [
-            "January", "February", "March", "April", "May", "June",
-            "July", "August", "September", "October", "November", "December"
-        ]
-        
-        for i, (month_name, multiplier) in enumerate(zip(month_names, base_pattern)):
-            adjusted_multiplier = multiplier * climate_adjustments[i]
-            predicted_level = current_level / adjusted_multiplier  # Convert to actual mbgl
-            
-            # Determine status
-            if adjusted_multiplier < 0.75:
-                status = "Critical Low (Summer Stress)"
-            elif adjusted_multiplier < 0.85:
-                status = "Low (Pre/Post Monsoon)"
-            elif adjusted_multiplier < 0.95:
-                status = "Moderate"
-            else:
-                status = "Good (Winter/Post-Monsoon)"
-            
-            patterns.append({
-                'month': month_name,
-                'monthNumber': i + 1,
-                'waterLevel': round(predicted_level, 2),
-                'relativeLevel': round(adjusted_multiplier * 100, 1),
-                'status': status,
-                'description': self._get_monthly_description(i + 1, region_type, climate_zone)
-            })
-        
-        return patterns
+        region = REGION_TYPE_INDEX.get(region_type, REGION_TYPE_INDEX["Mixed Terrain"])
+        climate = CLIMATE_ZONE_INDEX.get(climate_zone, CLIMATE_ZONE_INDEX["Temperate"])
+        return self._seasonal_patterns(region, climate, seasonal_levels([current_level], region, climate)[0].tolist())
     
     def _get_climate_adjustments(self, climate_zone: str) -> List[float]:
         """Get climate-specific adjustments to seasonal patterns."""
-        if climate_zone == "Arid":
-            # More extreme variations
-            return [1.02, 1.0, 0.95, 0.88, 0.80, 0.75, 0.70, 0.75, 0.85, 0.92, 0.98, 1.05]
-        elif climate_zone == "Semi-Arid":
-            # Moderate variations
-            return [1.0, 0.98, 0.92, 0.88, 0.82, 0.78, 0.75, 0.78, 0.85, 0.90, 0.95, 1.0]
-        elif climate_zone == "Tropical Wet":
-            # Less variation, strong monsoon
-            return [0.98, 0.95, 0.92, 0.88, 0.85, 0.75, 0.65, 0.70, 0.80, 0.88, 0.92, 0.95]
-        elif climate_zone == "Subtropical Humid":
-            # Moderate variation, good winter recharge
-            return [1.0, 0.98, 0.92, 0.88, 0.82, 0.78, 0.72, 0.75, 0.82, 0.88, 0.95, 1.0]
-        else:
-            # Default temperate pattern
-            return [0.98, 0.95, 0.90, 0.85, 0.80, 0.75, 0.70, 0.75, 0.82, 0.88, 0.92, 0.95]
+        return list(CLIMATE_ADJUSTMENTS.get(climate_zone, _DEFAULT_CLIMATE_ADJUSTMENT))
     
     def _get_monthly_description(self, month: int, region_type: str, climate_zone: str) -> str:
         """Get descriptive text for each month's water level status."""
-        descriptions = {
-            1: "Post-winter stability, good for drilling",
-            2: "Winter end, stable conditions",
-            3: "Pre-summer, water levels start declining",
-            4: "Summer onset, increasing demand",
-            5: "Peak summer, maximum stress",
-            6: "Pre-monsoon, lowest levels",
-            7: "Early monsoon, recharge begins",
-            8: "Monsoon peak, active recharge",
-            9: "Late monsoon, continued recharge",
-            10: "Post-monsoon, levels stabilizing",
-            11: "Winter approach, good recovery",
-            12: "Winter, stable high levels"
-        }
-        
-        base_desc = descriptions.get(month, "Unknown month")
-        
-        # Add region-specific context
-        if region_type == "Thar Desert" and month in [5, 6]:
-            base_desc += " (Extreme stress in desert region)"
-        elif region_type == "Gangetic Plains" and month in [7, 8, 9]:
-            base_desc += " (Strong monsoon recharge)"
-        elif region_type == "Western Ghats" and month in [6, 7, 8]:
-            base_desc += " (Heavy monsoon impact)"
-        elif region_type == "Coastal Plains" and month in [10, 11]:
-            base_desc += " (Retreating monsoon benefit)"
-        
-        return base_desc
+        if not 1 <= month <= 12:
+            return "Unknown month"
+        return _monthly_description(month, region_type)
     
     def _get_critical_months(self, region_type: str, climate_zone: str) -> List[str]:
         """Get months when water levels are critically low."""
@@ -1372,10 +2979,11 @@ class GroundwaterPredictor:
         else:
             return [6, 7, 8, 9]  # General monsoon avoidance
     
-    def _create_drilling_timeline(self, urgency: str, optimal_months: List[int], avoid_months: List[int], current_level: float) -> List[Dict]:
-        """Create detailed drilling timeline with recommendations."""
+    def _create_drilling_timeline(self, urgency: str, optimal_months: List[int], avoid_months: List[int], current_level: float,
+                                  as_of: Optional[datetime.date] = None) -> List[Dict]:
+        """Create detailed drilling timeline with recommendations, starting from the month of `as_of`."""
         timeline = []
-        current_month = datetime.datetime.now().month
+        current_month = _month_of(as_of)
         
         month_names = {
             1: 'January', 2: 'February', 3: 'March', 4: 'April',
@@ -1453,149 +3061,176 @@ class GroundwaterPredictor:
     # Regional classification helper methods
     def _is_gangetic_plains(self, lat: float, lng: float) -> bool:
         """Check if location is in Gangetic Plains."""
-        return 24 <= lat <= 32 and 75 <= lng <= 88
+        return has_region_flag(region_mask(lat, lng), 'gangetic_plains')
     
     def _is_deccan_plateau_region(self, lat: float, lng: float) -> bool:
         """Check if location is in Deccan Plateau."""
-        return 12 <= lat <= 22 and 74 <= lng <= 84
+        return has_region_flag(region_mask(lat, lng), 'deccan_plateau_region')
     
     def _is_coastal_plains(self, lat: float, lng: float) -> bool:
         """Check if location is in coastal plains."""
-        return ((lng < 73 and lat > 8) or  # West coast
-                (lng > 88 and lat > 12) or  # East coast
-                (lat < 12))  # Southern tip
+        return has_region_flag(region_mask(lat, lng), 'coastal_plains')
     
     def _is_western_ghats_region(self, lat: float, lng: float) -> bool:
         """Check if location is in Western Ghats."""
-        return 8 <= lat <= 24 and 72 <= lng <= 78
+        return has_region_flag(region_mask(lat, lng), 'western_ghats_region')
     
     def _is_thar_desert_region(self, lat: float, lng: float) -> bool:
         """Check if location is in Thar Desert."""
-        return 24 <= lat <= 30 and 69 <= lng <= 76
+        return has_region_flag(region_mask(lat, lng), 'thar_desert_region')
     
     def _is_northeast_hills(self, lat: float, lng: float) -> bool:
         """Check if location is in Northeast Hills."""
-        return lat > 23 and lng > 88
+        return has_region_flag(region_mask(lat, lng), 'northeast_hills')
     
     def _is_central_highlands(self, lat: float, lng: float) -> bool:
         """Check if location is in Central Highlands."""
-        return 20 <= lat <= 26 and 76 <= lng <= 84
+        return has_region_flag(region_mask(lat, lng), 'central_highlands')
     
     # Climate classification helper methods
     def _is_arid_climate(self, lat: float, lng: float) -> bool:
         """Check if location has arid climate."""
-        return self._is_thar_desert_region(lat, lng)
+        return has_region_flag(region_mask(lat, lng), 'arid_climate')
     
     def _is_semi_arid_climate(self, lat: float, lng: float) -> bool:
         """Check if location has semi-arid climate."""
-        return ((15 <= lat <= 20 and 74 <= lng <= 80) or  # Deccan semi-arid
-                (20 <= lat <= 24 and 78 <= lng <= 82))     # Central semi-arid
+        return has_region_flag(region_mask(lat, lng), 'semi_arid_climate')
     
     def _is_tropical_wet(self, lat: float, lng: float) -> bool:
         """Check if location has tropical wet climate."""
-        return (self._is_western_ghats_region(lat, lng) or
-                self._is_northeast_hills(lat, lng) or
-                (lat < 15 and lng > 75))  # Southern wet regions
+        return has_region_flag(region_mask(lat, lng), 'tropical_wet')
     
     def _is_tropical_wet_dry(self, lat: float, lng: float) -> bool:
         """Check if location has tropical wet-dry climate."""
-        return 15 <= lat <= 25 and 75 <= lng <= 88 and not self._is_western_ghats_region(lat, lng)
+        return has_region_flag(region_mask(lat, lng), 'tropical_wet_dry')
     
     def _is_subtropical_humid(self, lat: float, lng: float) -> bool:
         """Check if location has subtropical humid climate."""
-        return self._is_gangetic_plains(lat, lng)
+        return has_region_flag(region_mask(lat, lng), 'subtropical_humid')
     
     def _is_mountain_climate(self, lat: float, lng: float) -> bool:
         """Check if location has mountain climate."""
-        return lat > 30 or (self._is_northeast_hills(lat, lng) and lat > 25)
+        return has_region_flag(region_mask(lat, lng), 'mountain_climate')
     
-    def _get_fallback_prediction(self, latitude: float, longitude: float) -> Dict:
+    def _get_fallback_prediction(self, latitude: float, longitude: float, as_of: Optional[datetime.date] = None) -> Dict:
         """Return a fallback prediction when model fails."""
-        # Simple heuristic-based prediction
-        base_level = 15 + abs(latitude) / 3  # Basic estimate
-        current_water_level = max(5, min(50, base_level))
-        future_water_level = current_water_level * 1.1  # Water table deepens over time
-        
-        # Calculate dynamic confidence based on location factors
-        # Higher confidence for regions with more typical values
-        location_confidence = 0.5  # Base confidence for fallback
-        
-        # Adjust confidence based on latitude (tropical regions more predictable)
-        if 10 <= abs(latitude) <= 30:  # Tropical/subtropical zones
-            location_confidence += 0.15
-        elif abs(latitude) <= 10:  # Equatorial zones
-            location_confidence += 0.1
-        
-        # Adjust confidence based on water level (moderate levels more predictable)
-        if 10 <= current_water_level <= 30:
-            location_confidence += 0.1
-        elif 5 <= current_water_level <= 40:
-            location_confidence += 0.05
-        
-        # Add some randomness to make it more realistic (+/- 5%)
-        import random
-        random.seed(int(latitude * 1000 + longitude * 1000))  # Deterministic based on location
-        confidence_variance = (random.random() - 0.5) * 0.1  # +/- 5%
-        final_confidence = max(0.4, min(0.8, location_confidence + confidence_variance))
-        
-        return {
-            'currentWaterLevel': round(current_water_level, 2),
-            'futureWaterLevel': round(future_water_level, 2),
-            'isSuitableForBorewell': 10 <= current_water_level <= 40,
-            'confidence': round(final_confidence, 3),
-            'location': {
-                'latitude': latitude,
-                'longitude': longitude
-            },
-            'yearlyPredictions': [
-                {'year': 'Year 1', 'predictedLevel': round(current_water_level * 1.02, 2)},
-                {'year': 'Year 2', 'predictedLevel': round(current_water_level * 1.05, 2)},
-                {'year': 'Year 3', 'predictedLevel': round(current_water_level * 1.08, 2)},
-                {'year': 'Year 4', 'predictedLevel': round(current_water_level * 1.12, 2)},
-                {'year': 'Year 5', 'predictedLevel': round(current_water_level * 1.16, 2)},
-            ],
-            'seasonalAnalysis': {
-                'regionType': 'Estimated Region',
-                'climateZone': 'Estimated Climate',
-                'seasonalPatterns': [],
-                'criticalMonths': ['May', 'June'],
-                'rechargePeriod': {'months': ['July', 'August', 'September'], 'description': 'Estimated monsoon recharge'},
-                'stressedPeriod': {'months': ['April', 'May', 'June'], 'description': 'Estimated summer stress'}
-            },
-            'drillingTimeline': {
-                'urgency': 'Moderate',
-                'optimalMonths': [11, 12, 1, 2, 3],
-                'avoidMonths': [6, 7, 8, 9],
-                'reasoning': 'Fallback recommendation - general Indian climate pattern'
-            },
-            'bestDrillingTime': {
-                'month': 11,
-                'monthName': 'November',
-                'monthsFromNow': (11 - datetime.datetime.now().month) % 12,
-                'recommendation': 'Post-monsoon stability (fallback estimate)'
-            },
-            'suitabilityNote': 'Fallback prediction - consider detailed site assessment'
-        }
+        return self._get_fallback_predictions([latitude], [longitude], as_of)[0]
+    
+    def _get_fallback_predictions(self, latitudes, longitudes, as_of=None) -> List[Dict]:
+        """
+        Return fallback predictions for a batch of coordinates (see `fallback_levels`).
+        `as_of` is one date for all coordinates or one per coordinate (today by default).
+        """
+        levels = {key: values.tolist() for key, values in fallback_levels(latitudes, longitudes).items()}
+        months_from_now = ((11 - _months_of(as_of, len(levels['currentWaterLevel']))) % 12).tolist()
+        results = []
+        for i, (latitude, longitude) in enumerate(zip(np.asarray(latitudes, dtype=float).reshape(-1).tolist(),
+                                                      np.asarray(longitudes, dtype=float).reshape(-1).tolist())):
+            current_water_level = levels['currentWaterLevel'][i]
+            results.append({
+                'currentWaterLevel': round(current_water_level, 2),
+                'futureWaterLevel': round(levels['futureWaterLevel'][i], 2),
+                'isSuitableForBorewell': levels['isSuitableForBorewell'][i],
+                'confidence': round(levels['confidence'][i], 3),
+                'location': {
+                    'latitude': latitude,
+                    'longitude': longitude
+                },
+                'yearlyPredictions': [
+                    {'year': 'Year 1', 'predictedLevel': round(current_water_level * 1.02, 2)},
+                    {'year': 'Year 2', 'predictedLevel': round(current_water_level * 1.05, 2)},
+                    {'year': 'Year 3', 'predictedLevel': round(current_water_level * 1.08, 2)},
+                    {'year': 'Year 4', 'predictedLevel': round(current_water_level * 1.12, 2)},
+                    {'year': 'Year 5', 'predictedLevel': round(current_water_level * 1.16, 2)},
+                ],
+                'seasonalAnalysis': {
+                    'regionType': 'Estimated Region',
+                    'climateZone': 'Estimated Climate',
+                    'seasonalPatterns': [],
+                    'criticalMonths': ['May', 'June'],
+                    'rechargePeriod': {'months': ['July', 'August', 'September'], 'description': 'Estimated monsoon recharge'},
+                    'stressedPeriod': {'months': ['April', 'May', 'June'], 'description': 'Estimated summer stress'}
+                },
+                'drillingTimeline': {
+                    'urgency': 'Moderate',
+                    'optimalMonths': [11, 12, 1, 2, 3],
+                    'avoidMonths': [6, 7, 8, 9],
+                    'reasoning': 'Fallback recommendation - general Indian climate pattern'
+                },
+                'bestDrillingTime': {
+                    'month': 11,
+                    'monthName': 'November',
+                    'monthsFromNow': months_from_now[i],
+                    'recommendation': 'Post-monsoon stability (fallback estimate)'
+                },
+                'suitabilityNote': 'Fallback prediction - consider detailed site assessment'
+            })
+        return results
+
+def resolve_model_path(model_path: Optional[str] = None) -> str:
+    """Return the model path to use, falling back to the default locations."""
+    if model_path is None:
+        # Default path to the groundwater XGBoost model file
+        model_path = r"C:\Users\Soujatya\Desktop\Bhujal-New\groundwater_xgboost_model.pkl"
+        # Verify the path exists
+        if not os.path.exists(model_path):
+            # Fallback to relative path
+            model_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'groundwater_xgboost_model.pkl')
+            model_path = os.path.abspath(model_path)
+    return model_path
+
+# Sampled request profiler; None unless `enable_request_profiling` was called
+REQUEST_PROFILER = None
+
+def enable_request_profiling(directory: str, sample_rate: float = 0.01, keep: int = 50):
+    """Profile a fraction of prediction requests into `directory` (see request_profiler)."""
+    global REQUEST_PROFILER
+    from request_profiler import RequestProfiler
+    REQUEST_PROFILER = RequestProfiler(directory, sample_rate, keep)
+    return REQUEST_PROFILER
+
+def _profile_sample(kind: str, **tags):
+    """Return a profiling context for this request when it is sampled, else None."""
+    return REQUEST_PROFILER.sample(kind, **tags) if REQUEST_PROFILER is not None else None
+
+# Micro-batcher for single-point predictions; None unless `enable_request_coalescing` was called
+COALESCER = None
+
+def enable_request_coalescing(window_ms: float = 2.0, max_batch: int = 64) -> PredictionCoalescer:
+    """Score concurrent `predict_groundwater` cache misses together (see `PredictionCoalescer`)."""
+    global COALESCER
+    COALESCER = PredictionCoalescer(window_ms, max_batch)
+    return COALESCER
 
 # Function to be called from Node.js
-def predict_groundwater(latitude: float, longitude: float, model_path: str = None) -> Dict:
+def predict_groundwater(latitude: float, longitude: float, model_path: str = None, fields=None,
+                        detail: Optional[str] = None, timings: bool = False, as_of=None) -> Dict:
     """
     Main function to predict groundwater level.
     This function will be called from the Node.js backend.
+    `fields`/`detail` select the optional response sections (see `resolve_fields`);
+    `as_of` (date or ISO string) sets the prediction date.
+    With `timings` the result cache is bypassed and `data` carries a `_timings` block.
+    Requests sampled by `REQUEST_PROFILER` are profiled and also bypass the cache.
+    Cache misses are micro-batched by `COALESCER` when it is enabled.
     """
     try:
-        if model_path is None:
-            # Default path to the groundwater XGBoost model file
-            model_path = r"C:\Users\Soujatya\Desktop\Bhujal-New\groundwater_xgboost_model.pkl"
-            # Verify the path exists
-            if not os.path.exists(model_path):
-                # Fallback to relative path
-                model_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'groundwater_xgboost_model.pkl')
-                model_path = os.path.abspath(model_path)
-        
-        predictor = GroundwaterPredictor(model_path)
-        result = predictor.predict_water_level(latitude, longitude)
-        return {'success': True, 'data': result}
+        sections = resolve_fields(fields, detail)
+        as_of = parse_as_of(as_of)
+        predictor = GroundwaterPredictor(resolve_model_path(model_path), FEATURE_CACHE)
+        sample = _profile_sample('predict', latitude=latitude, longitude=longitude, fields=fields, detail=detail,
+                                 asOf=as_of)
+        if sample is not None:
+            with sample:
+                result = predictor.predict_water_level(latitude, longitude, sections=sections, timings=True,
+                                                       as_of=as_of)
+                sample.tags['timings'] = result['_timings'] if timings else result.pop('_timings')
+            return {'success': True, 'data': result, 'cache': {'hit': False, **RESULT_CACHE.stats()}}
+        if timings:
+            result = predictor.predict_water_level(latitude, longitude, sections=sections, timings=True, as_of=as_of)
+            return {'success': True, 'data': result, 'cache': {'hit': False, **RESULT_CACHE.stats()}}
+        result, hit = RESULT_CACHE.predict(predictor, latitude, longitude, sections, as_of, COALESCER)
+        return {'success': True, 'data': result, 'cache': {'hit': hit, **RESULT_CACHE.stats()}}
     
     except Exception as e:
         logger.error(f"Prediction failed: {str(e)}")
@@ -1605,7 +3240,290 @@ def predict_groundwater(latitude: float, longitude: float, model_path: str = Non
             'message': 'Failed to predict groundwater level'
         }
 
-if __name__ == "__main__":
+def predict_groundwater_batch(coords, model_path: str = None, fields=None, detail: Optional[str] = None,
+                              as_of=None) -> Dict:
+    """
+    Predict groundwater levels for a list of (latitude, longitude) pairs.
+    Features for all points are built at once and the model is called a single time;
+    `data` holds one result per point in the same schema as `predict_groundwater`.
+    """
+    try:
+        points = np.asarray(coords, dtype=float).reshape(-1, 2)
+        predictor = GroundwaterPredictor(resolve_model_path(model_path), FEATURE_CACHE)
+        sample = _profile_sample('batch', points=len(points), fields=fields, detail=detail)
+        with sample or contextlib.nullcontext():
+            results = predictor.predict_water_levels(points[:, 0], points[:, 1], fields, detail,
+                                                     as_of=parse_as_of(as_of))
+            if sample is not None and len(points):
+                # (west, south, east, north) of the batch
+                sample.tags['bbox'] = [float(points[:, 1].min()), float(points[:, 0].min()),
+                                       float(points[:, 1].max()), float(points[:, 0].max())]
+        return {'success': True, 'data': results}
+    
+    except Exception as e:
+        logger.error(f"Batch prediction failed: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e),
+            'message': 'Failed to predict groundwater levels'
+        }
+
+def predict_groundwater_forecast(latitude: float, longitude: float, model_path: str = None, years: int = 5,
+                                 as_of=None) -> Dict:
+    """
+    Monthly model forecast for one location over `years` years from `as_of`
+    (see `GroundwaterPredictor.forecast`).
+    """
+    try:
+        predictor = GroundwaterPredictor(resolve_model_path(model_path), FEATURE_CACHE)
+        sample = _profile_sample('forecast', latitude=latitude, longitude=longitude, years=years, asOf=as_of)
+        with sample or contextlib.nullcontext():
+            result = predictor.forecast(latitude, longitude, years, as_of)
+        return {'success': True, 'data': result}
+    
+    except Exception as e:
+        logger.error(f"Forecast failed: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e),
+            'message': 'Failed to forecast groundwater levels'
+        }
+
+DEFAULT_TILE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tile_cache')
+DEFAULT_TILE_CACHE_MB = 512
+
+@functools.lru_cache(maxsize=4)
+def _get_tile_renderer(model_path: str, cache_dir: str, cache_mb: int):
+    """Create the tile renderer for a worker once and reuse it between requests."""
+    from map_tiles import TileCache, TileRenderer
+    predictor = GroundwaterPredictor(model_path, FEATURE_CACHE)
+    return TileRenderer(predictor, TileCache(cache_dir, cache_mb * 1024 * 1024))
+
+def render_tiles(tiles: List[Dict], model_path: str = None, cache_dir: str = DEFAULT_TILE_CACHE_DIR,
+                 cache_mb: int = DEFAULT_TILE_CACHE_MB) -> Dict:
+    """
+    Return base64 PNGs for a list of {"layer", "z", "x", "y"} map tiles.
+    Cached tiles are read from disk; all missing tiles share one model call.
+    """
+    import base64
+    renderer = _get_tile_renderer(resolve_model_path(model_path), cache_dir, cache_mb)
+    requests = [(str(t['layer']), int(t['z']), int(t['x']), int(t['y'])) for t in tiles]
+    sample = _profile_sample('tiles', tiles=len(requests))
+    with sample or contextlib.nullcontext():
+        results = renderer.get_tiles(requests)
+        if sample is not None:
+            sample.tags['tileKeys'] = [f"{layer}/{z}/{x}/{y}" for layer, z, x, y in requests]
+    return {
+        'success': True,
+        'tiles': [
+            {
+                'layer': layer, 'z': z, 'x': x, 'y': y,
+                'png': base64.b64encode(result['png']).decode('ascii'),
+                'cached': result['cached']
+            }
+            for (layer, z, x, y), result in zip(requests, results)
+        ],
+        'cache': renderer.cache.stats()
+    }
+
+def _handle_worker_request(request: Dict, model_path: str, tile_options: Optional[Dict] = None) -> Dict:
+    """
+    Answer a single worker request. `coordinates` selects a batch prediction,
+    `forecast` a monthly forecast, `tiles` a map tile render and `metrics` the
+    stage histograms in Prometheus text format.
+    """
+    request_id = request.get('id')
+    try:
+        options = request.get('options') or {}
+        fields, detail = options.get('fields'), options.get('detail')
+        if 'metrics' in request:
+            result = {
+                'success': True,
+                'metrics': STAGE_METRICS.prometheus(request.get('labels')),
+                'stages': STAGE_METRICS.stats()
+            }
+            if COALESCER is not None:
+                result['coalescer'] = COALESCER.stats()
+        elif 'tiles' in request:
+            result = render_tiles(request['tiles'], model_path, **(tile_options or {}))
+        elif 'coordinates' in request:
+            result = predict_groundwater_batch(request['coordinates'], model_path, fields, detail, options.get('asOf'))
+        else:
+            latitude = float(request['latitude'] if 'latitude' in request else request['lat'])
+            longitude = float(request['longitude'] if 'longitude' in request else request['lng'])
+            if 'forecast' in request:
+                years = int((request['forecast'] or {}).get('years', 5))
+                result = predict_groundwater_forecast(latitude, longitude, model_path, years, options.get('asOf'))
+            else:
+                result = predict_groundwater(latitude, longitude, model_path, fields, detail,
+                                             bool(options.get('timings')), options.get('asOf'))
+    except (KeyError, TypeError, ValueError) as e:
+        result = {
+            'success': False,
+            'error': f"Invalid request: {str(e)}",
+            'message': 'Failed to predict groundwater level'
+        }
+    
+    return {'id': request_id, **result}
+
+def _is_point_request(request: Dict) -> bool:
+    """True for a plain single-point prediction, the only request kind the coalescer batches."""
+    if any(key in request for key in ('metrics', 'tiles', 'coordinates', 'forecast')):
+        return False
+    return not (request.get('options') or {}).get('timings')
+
+def run_worker(model_path: str = None, input_stream=None, output_stream=None, tile_options: Optional[Dict] = None,
+               threads: int = 1):
+    """
+    Serve predictions over newline-delimited JSON until the input stream closes.
+    Each request line looks like {"id": 1, "latitude": 26.9, "longitude": 75.8, "options": {}}
+    (options may hold `fields`, `detail`, `timings` and `asOf`) and is answered by one line holding the `predict_groundwater` result plus the same id.
+    The model stays loaded between requests, so only the first one pays for unpickling.
+    `tile_options` (cache_dir, cache_mb) configures the on-disk map tile cache.
+    A persistent `RESULT_CACHE` is saved periodically and when the input closes.
+    With `threads` > 1 every request is handled on a pool of that many threads
+    (see the thread-safety notes on `GroundwaterPredictor`); otherwise, with
+    `COALESCER` enabled, only single-point predictions are. Pooled requests may
+    be answered out of order.
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    model_path = resolve_model_path(model_path)
+    
+    # Load the model before announcing readiness so the first request is warm
+    try:
+        MODEL_REGISTRY.get(model_path)
+    except Exception as e:
+        logger.error(f"Worker could not preload model: {str(e)}")
+    
+    send_lock = threading.Lock()
+    
+    def send(message: Dict):
+        line = json.dumps(message) + '\n'
+        with send_lock:
+            output_stream.write(line)
+            output_stream.flush()
+    
+    def handle(request: Dict):
+        send(_handle_worker_request(request, model_path, tile_options))
+    
+    executor = None
+    if threads > 1:
+        executor = ThreadPoolExecutor(threads, thread_name_prefix='prediction')
+    elif COALESCER is not None:
+        # Enough threads for a full batch to be waiting on the coalescer at once
+        executor = ThreadPoolExecutor(COALESCER.max_batch, thread_name_prefix='prediction')
+    
+    send({'id': None, 'ready': True, 'modelVersion': MODEL_REGISTRY.version(model_path)})
+    
+    last_saved = time.monotonic()
+    for line in input_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            send({'id': None, 'success': False, 'error': f"Invalid JSON request: {str(e)}"})
+            continue
+        if executor is not None and (threads > 1 or _is_point_request(request)):
+            executor.submit(handle, request)
+        else:
+            handle(request)
+        
+        if time.monotonic() - last_saved > RESULT_CACHE_SAVE_SECONDS:
+            RESULT_CACHE.save()
+            last_saved = time.monotonic()
+    
+    if executor is not None:
+        executor.shutdown(wait=True)
+    RESULT_CACHE.save()
+
+def compile_model_file(model_path: Optional[str], output_path: str, parity_rows: int = 5000,
+                       tolerance: float = 1e-4) -> int:
+    """
+    Compile the pickled model at `model_path` into a NumPy tree ensemble,
+    check it against the original on features of random Indian locations and
+    write it to `output_path` only if the largest difference is within
+    `tolerance`. Returns a process exit code.
+    """
+    from tree_compiler import compile_model, check_parity
+    
+    model_path = resolve_model_path(model_path)
+    model = MODEL_REGISTRY.get(model_path)
+    compiled = compile_model(model)
+    
+    rng = np.random.default_rng(0)
+    latitudes = rng.uniform(6, 37, parity_rows)
+    longitudes = rng.uniform(68, 97, parity_rows)
+    dates = np.datetime64('2000-01-01') + rng.integers(0, 365 * 30, parity_rows)
+    features = GroundwaterPredictor.__new__(GroundwaterPredictor)
+    features.feature_cache = None
+    parity = check_parity(model, compiled, features.prepare_features_batch(latitudes, longitudes, dates))
+    logger.info(f"Compiled {compiled.n_trees} trees ({compiled.n_nodes} nodes, depth {compiled.max_depth}); "
+                f"parity: {json.dumps(parity)}")
+    
+    if parity['maxAbsDiff'] > tolerance:
+        logger.error(f"Compiled model differs from the original by {parity['maxAbsDiff']} (> {tolerance}); not written")
+        return 1
+    compiled.save(output_path)
+    logger.info(f"Compiled model written to {output_path}")
+    return 0
+
+# Run in a fresh interpreter by `measure_cold_start`; argv[1] is the model path
+_COLD_START_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import groundwater_predictor
+imported = time.perf_counter()
+groundwater_predictor.MODEL_REGISTRY.get(sys.argv[1])
+loaded = time.perf_counter()
+first = groundwater_predictor.predict_groundwater(26.9124, 75.7873, sys.argv[1])
+predicted = time.perf_counter()
+groundwater_predictor.predict_groundwater(19.0760, 72.8777, sys.argv[1])
+warm = time.perf_counter()
+print(json.dumps({
+    'importMs': (imported - start) * 1000,
+    'modelLoadMs': (loaded - imported) * 1000,
+    'firstPredictionMs': (predicted - loaded) * 1000,
+    'warmPredictionMs': (warm - predicted) * 1000,
+    'success': first['success'],
+    'heavyModules': sorted(m for m in ('sklearn', 'xgboost', 'scipy', 'pandas') if m in sys.modules)
+}))
+"""
+
+def measure_cold_start(model_path: str = None, runs: int = 5) -> Dict:
+    """
+    Measure cold-start latency the way a freshly spawned prediction process
+    sees it. Each run starts a new interpreter that imports this module, loads
+    the model and makes two predictions. Reports the median of each stage in
+    milliseconds, including the whole process lifetime (interpreter startup
+    and exit).
+    """
+    import subprocess
+    
+    model_path = resolve_model_path(model_path)
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', _COLD_START_PROBE, model_path], cwd=module_dir,
+                                   capture_output=True, text=True, check=True)
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        sample['processMs'] = (time.perf_counter() - start) * 1000
+        samples.append(sample)
+    
+    report = {'modelPath': model_path, 'runs': runs}
+    for key in ('importMs', 'modelLoadMs', 'firstPredictionMs', 'warmPredictionMs', 'processMs'):
+        report[key] = round(float(np.median([sample[key] for sample in samples])), 1)
+    report['success'] = all(sample['success'] for sample in samples)
+    report['heavyModules'] = samples[-1]['heavyModules']
+    return report
+
+def _run_demo():
+    """Run the predictor against a fixed list of sample locations."""
     # Test the predictor with multiple locations including some that should trigger suitability notes
     test_locations = [
         (28.6139, 77.2090, "Delhi (Major City)"),
@@ -1687,3 +3605,107 @@ if __name__ == "__main__":
         
     print(f"\n{'='*50}")
     print("Testing Complete!")
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point."""
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Bhujal groundwater level predictor')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    subparsers.add_parser('demo', help='Run predictions for a fixed list of sample locations')
+    
+    worker_parser = subparsers.add_parser('worker', help='Serve predictions as newline-delimited JSON over stdin/stdout')
+    worker_parser.add_argument('--model-path', default=None, help='Path to the pickled model')
+    worker_parser.add_argument('--tile-cache-dir', default=DEFAULT_TILE_CACHE_DIR, help='Directory for cached map tiles')
+    worker_parser.add_argument('--tile-cache-mb', type=int, default=DEFAULT_TILE_CACHE_MB, help='Map tile cache size limit in MB')
+    worker_parser.add_argument('--training-points', default=None,
+                               help='CSV or .npy file of training/observation coordinates for distance lookups')
+    worker_parser.add_argument('--result-cache-file', default=None, help='Persist cached prediction results to this JSON file')
+    worker_parser.add_argument('--result-cache-entries', type=int, default=RESULT_CACHE.max_entries,
+                               help='Maximum number of cached prediction results')
+    worker_parser.add_argument('--stage-metrics', action='store_true',
+                               help='Record per-stage latency histograms for every prediction')
+    worker_parser.add_argument('--threads', type=int, default=1,
+                               help='Serve requests concurrently from this many threads in one process')
+    worker_parser.add_argument('--intra-op-threads', type=int, default=None,
+                               help='Threads per model call and BLAS/OpenMP pool (default: 1 with --threads > 1)')
+    worker_parser.add_argument('--coalesce-window-ms', type=float, default=0,
+                               help='Batch concurrent single-point predictions arriving within this window (0 = off)')
+    worker_parser.add_argument('--coalesce-max-batch', type=int, default=64, help='Largest coalesced batch')
+    worker_parser.add_argument('--profile-dir', default=None, help='Write cProfile dumps of sampled requests here')
+    worker_parser.add_argument('--profile-sample-rate', type=float, default=0.01,
+                               help='Fraction of requests to profile when --profile-dir is set')
+    worker_parser.add_argument('--profile-keep', type=int, default=50, help='Number of newest profiles to keep')
+    
+    score_parser = subparsers.add_parser('score', help='Score a CSV or JSONL file of coordinates in streaming chunks')
+    score_parser.add_argument('input', help='Input .csv or .jsonl file with latitude/longitude columns')
+    score_parser.add_argument('output', help='Output .csv or .jsonl file')
+    score_parser.add_argument('--model-path', default=None, help='Path to the pickled model')
+    score_parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per model call')
+    score_parser.add_argument('--fields', default=None, help='Comma-separated response sections to include')
+    score_parser.add_argument('--detail', default=None, choices=list(DETAIL_LEVELS), help='Response detail level')
+    score_parser.add_argument('--input-format', default=None, choices=['csv', 'jsonl'], help='Override input format')
+    score_parser.add_argument('--output-format', default=None, choices=['csv', 'jsonl'], help='Override output format')
+    score_parser.add_argument('--workers', type=int, default=1, help='Scoring processes (0 = one per CPU core)')
+    score_parser.add_argument('--allow-fallback', action='store_true',
+                              help='Write heuristic fallback levels if the model file is missing')
+    
+    compile_parser = subparsers.add_parser('compile', help='Flatten the pickled tree ensemble into a NumPy .npz model')
+    compile_parser.add_argument('output', help='Output .npz path')
+    compile_parser.add_argument('--model-path', default=None, help='Path to the pickled model')
+    compile_parser.add_argument('--parity-rows', type=int, default=5000, help='Random Indian locations used for the parity check')
+    compile_parser.add_argument('--tolerance', type=float, default=1e-4, help='Largest allowed prediction difference (m)')
+    
+    rescore_parser = subparsers.add_parser('rescore', help='Score borewells that are new or changed since the last run')
+    rescore_parser.add_argument('export', help='JSONL export of Borewell documents (mongoexport)')
+    rescore_parser.add_argument('results', help='JSONL file of per-well predictions, updated in place')
+    rescore_parser.add_argument('--watermark', default=None, help='Watermark file (default: <results>.watermark.json)')
+    rescore_parser.add_argument('--model-path', default=None, help='Path to the pickled or compiled (.npz) model')
+    rescore_parser.add_argument('--chunk-size', type=int, default=10000, help='Wells per model call')
+    rescore_parser.add_argument('--full', action='store_true', help='Re-score every well')
+    rescore_parser.add_argument('--allow-fallback', action='store_true',
+                                help='Score with heuristic fallback levels if the model file is missing')
+    
+    cold_start_parser = subparsers.add_parser('coldstart', help='Report import and first-prediction latency of a fresh process')
+    cold_start_parser.add_argument('--model-path', default=None, help='Path to the pickled or compiled (.npz) model')
+    cold_start_parser.add_argument('--runs', type=int, default=5, help='Fresh processes to time (median is reported)')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'coldstart':
+        print(json.dumps(measure_cold_start(args.model_path, args.runs), indent=2))
+    elif args.command == 'compile':
+        sys.exit(compile_model_file(args.model_path, args.output, args.parity_rows, args.tolerance))
+    elif args.command == 'score':
+        from batch_scoring import score_file
+        score_file(args.input, args.output, args.model_path, args.chunk_size, args.fields, args.detail,
+                   args.input_format, args.output_format, args.workers, args.allow_fallback)
+    elif args.command == 'rescore':
+        from borewell_rescoring import rescore_borewells
+        print(json.dumps(rescore_borewells(args.export, args.results, args.watermark, args.model_path, args.full,
+                                           args.chunk_size, args.allow_fallback), indent=2))
+    elif args.command == 'worker':
+        if args.training_points:
+            set_training_points(args.training_points)
+        RESULT_CACHE.max_entries = args.result_cache_entries
+        STAGE_METRICS.enabled = args.stage_metrics
+        intra_op_threads = args.intra_op_threads or (1 if args.threads > 1 else None)
+        if intra_op_threads:
+            logger.info(f"Thread configuration: {json.dumps(configure_threads(intra_op_threads))}")
+        if args.coalesce_window_ms > 0:
+            enable_request_coalescing(args.coalesce_window_ms, args.coalesce_max_batch)
+        if args.profile_dir:
+            enable_request_profiling(args.profile_dir, args.profile_sample_rate, args.profile_keep)
+        if args.result_cache_file:
+            RESULT_CACHE.persist_path = args.result_cache_file
+            if os.path.exists(args.result_cache_file):
+                RESULT_CACHE.load()
+        tile_options = {'cache_dir': args.tile_cache_dir, 'cache_mb': args.tile_cache_mb}
+        run_worker(args.model_path, tile_options=tile_options, threads=args.threads)
+    else:
+        _run_demo()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+XYZ map tiles for the groundwater map view.
+
+`TileRenderer` renders water-level and borewell-suitability tiles in the Web
+Mercator z/x/y scheme used by Leaflet. Tiles are served from an on-disk LRU
+cache first; every missing tile in a request is rendered together with a single
+vectorised model call, so panning the map costs one prediction batch rather
+than one model call per pixel.
+"""
+import datetime
+import logging
+import math
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from groundwater_predictor import GroundwaterPredictor, classify_regions, has_region_flag
+
+logger = logging.getLogger(__name__)
+
+LAYERS = ('water', 'suitability')
+
+TILE_SIZE = 256
+DEFAULT_SAMPLES = 64  # Model evaluations per tile edge; upsampled to TILE_SIZE
+MAX_ZOOM = 12
+
+# Tiles entirely outside this (west, south, east, north) box are transparent
+COVERAGE_BBOX = (66.0, 6.0, 98.0, 37.0)
+
+# Depth (mbgl) colour ramp: shallow blue to deep red
+WATER_STOPS = np.array([0.0, 10.0, 20.0, 40.0, 80.0])
+WATER_COLOURS = np.array([
+    [43, 131, 186],
+    [171, 221, 164],
+    [255, 255, 191],
+    [253, 174, 97],
+    [215, 25, 28],
+])
+SUITABLE_COLOUR = (26, 150, 65)
+UNSUITABLE_COLOUR = (215, 25, 28)
+OVERLAY_ALPHA = 170
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a Web Mercator tile in degrees."""
+    n = 2 ** z
+
+    def lat_at(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360.0 - 180.0, lat_at(y + 1), (x + 1) / n * 360.0 - 180.0, lat_at(y))
+
+
+def tile_sample_coordinates(z: int, x: int, y: int, samples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitudes and longitudes of a samples x samples grid of pixel centres in a tile (row-major)."""
+    n = 2 ** z
+    offsets = (np.arange(samples) + 0.5) / samples
+    longitudes = (x + offsets) / n * 360.0 - 180.0
+    latitudes = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    lat_grid, lng_grid = np.meshgrid(latitudes, longitudes, indexing='ij')
+    return lat_grid.reshape(-1), lng_grid.reshape(-1)
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (H, W, 4) uint8 array as a PNG using only the standard library."""
+    height, width, _ = rgba.shape
+    # Each scanline is prefixed with filter type 0 (None)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)]).tobytes()
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw, 6)) + chunk(b'IEND', b'')
+
+
+def _colourise(levels: np.ndarray, suitable: np.ndarray, visible: np.ndarray, layer: str) -> np.ndarray:
+    """Map per-sample values to RGBA for one layer."""
+    rgba = np.zeros(levels.shape + (4,), dtype=np.uint8)
+    if layer == 'water':
+        for channel in range(3):
+            rgba[..., channel] = np.interp(levels, WATER_STOPS, WATER_COLOURS[:, channel])
+    else:
+        rgba[..., :3] = np.where(suitable[..., None], SUITABLE_COLOUR, UNSUITABLE_COLOUR)
+    rgba[..., 3] = np.where(visible, OVERLAY_ALPHA, 0)
+    return rgba
+
+
+class TileCache:
+    """
+    On-disk tile cache with a size limit and least-recently-used eviction.
+    A file's mtime is refreshed on every hit and the oldest files are removed
+    first when the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._files())
+
+    def _files(self) -> List[str]:
+        paths = []
+        for directory, _, names in os.walk(self.root):
+            paths.extend(os.path.join(directory, name) for name in names if name.endswith('.png'))
+        return paths
+
+    def _path(self, namespace: str, layer: str, z: int, x: int, y: int) -> str:
+        return os.path.join(self.root, namespace, layer, str(z), str(x), f"{y}.png")
+
+    def get(self, namespace: str, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        """Return cached tile bytes, or None on a miss."""
+        path = self._path(namespace, layer, z, x, y)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path, None)  # Mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, namespace: str, layer: str, z: int, x: int, y: int, data: bytes):
+        """Store tile bytes, evicting old tiles if the cache is over its limit."""
+        path = self._path(namespace, layer, z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Trim to 90% of the limit so eviction does not run on every write
+        target = int(self.max_bytes * 0.9)
+        files = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Return size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'bytes': self._size,
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class TileRenderer:
+    """Serve map tiles from a `TileCache`, rendering missing ones in one batch."""
+
+    def __init__(self, predictor: GroundwaterPredictor, cache: TileCache, samples: int = DEFAULT_SAMPLES):
+        if TILE_SIZE % samples:
+            raise ValueError(f"samples must divide {TILE_SIZE}")
+        self.predictor = predictor
+        self.cache = cache
+        self.samples = samples
+        self._blank = encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+    def namespace(self, month: datetime.date) -> str:
+        """Cache namespace: tiles change with the model and with the month."""
+        return f"{self.predictor.model_version or 'model'}-{month:%Y-%m}"
+
+    def get_tiles(self, requests: List[Tuple[str, int, int, int]]) -> List[Dict]:
+        """
+        Return one entry per (layer, z, x, y) request with the PNG bytes and
+        whether it came from the cache. Tiles are rendered for the first day of
+        the current month, so every tile in a namespace describes the same date.
+        """
+        month = datetime.date.today().replace(day=1)
+        namespace = self.namespace(month)
+        results: List[Optional[Dict]] = [None] * len(requests)
+        missing: Dict[Tuple[int, int, int], List[int]] = {}
+
+        for i, (layer, z, x, y) in enumerate(requests):
+            if layer not in LAYERS:
+                raise ValueError(f"Unknown tile layer '{layer}'")
+            if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+                raise ValueError(f"Invalid tile {z}/{x}/{y}")
+            if not self._covers_data(z, x, y):
+                results[i] = {'png': self._blank, 'cached': True}
+                continue
+            data = self.cache.get(namespace, layer, z, x, y)
+            if data is not None:
+                results[i] = {'png': data, 'cached': True}
+            else:
+                missing.setdefault((z, x, y), []).append(i)
+
+        if missing:
+            rendered = self._render(list(missing), month)
+            for tile, indices in missing.items():
+                for layer in LAYERS:
+                    self.cache.put(namespace, layer, *tile, rendered[tile][layer])
+                for i in indices:
+                    results[i] = {'png': rendered[tile][requests[i][0]], 'cached': False}
+
+        return results
+
+    def _covers_data(self, z: int, x: int, y: int) -> bool:
+        west, south, east, north = tile_bounds(z, x, y)
+        c_west, c_south, c_east, c_north = COVERAGE_BBOX
+        return west < c_east and east > c_west and south < c_north and north > c_south
+
+    def _render(self, tiles: List[Tuple[int, int, int]],
+                month: datetime.date) -> Dict[Tuple[int, int, int], Dict[str, bytes]]:
+        """Render both layers for every tile with one model call, predicting for `month`."""
+        coordinates = [tile_sample_coordinates(z, x, y, self.samples) for z, x, y in tiles]
+        latitudes = np.concatenate([lat for lat, _ in coordinates])
+        longitudes = np.concatenate([lng for _, lng in coordinates])
+
+        levels = self.predictor.predict_levels(latitudes, longitudes, month)
+        visible = ~has_region_flag(classify_regions(latitudes, longitudes), 'outside_india')
+
+        shape = (len(tiles), self.samples, self.samples)
+        current = levels['currentWaterLevel'].reshape(shape)
+        suitable = levels['isSuitableForBorewell'].reshape(shape)
+        visible = visible.reshape(shape)
+        scale = TILE_SIZE // self.samples
+
+        rendered = {}
+        for i, tile in enumerate(tiles):
+            rendered[tile] = {}
+            for layer in LAYERS:
+                rgba = _colourise(current[i], suitable[i], visible[i], layer)
+                rgba = rgba.repeat(scale, axis=0).repeat(scale, axis=1)
+                rendered[tile][layer] = encode_png(rgba)
+        logger.info(f"Rendered {len(tiles)} tiles ({len(latitudes)} predictions)")
+        return rendered
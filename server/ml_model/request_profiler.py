@@ -0,0 +1,171 @@
+"""
+Sampled cProfile dumps for prediction requests.
+
+A `RequestProfiler` profiles a random fraction of requests. Each sampled
+request leaves three files in the profile directory, sharing one name:
+
+    <time>-<pid>-<seq>-<kind>.prof       cProfile stats (pstats / snakeviz)
+    <time>-<pid>-<seq>-<kind>.collapsed  folded stacks for flamegraph.pl / speedscope
+    <time>-<pid>-<seq>-<kind>.json       tags: coordinates, stage timings, duration
+
+Only the newest `keep` samples are kept. Enabled in the worker with
+--profile-dir (see `groundwater_predictor.enable_request_profiling`).
+"""
+import cProfile
+import datetime
+import itertools
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 0.01
+DEFAULT_KEEP = 50
+MIN_STACK_SECONDS = 1e-6
+
+
+def _frame_label(function) -> str:
+    filename, line, name = function
+    if filename == '~':
+        return name  # Built-ins such as <built-in method numpy...>
+    return f"{os.path.basename(filename)}:{line}:{name}"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """
+    Fold cProfile statistics into "frame;frame;frame microseconds" lines.
+
+    cProfile records caller/callee edges rather than whole stacks, so each
+    function's own time is split across its callers in proportion to the
+    cumulative time of each call edge, starting from the functions that have
+    no profiled caller. Recursive edges and paths under `MIN_STACK_SECONDS`
+    are cut.
+    """
+    raw = stats.stats
+    children: Dict = {}
+    for function, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((function, edge[3]))
+
+    folded: Counter = Counter()
+
+    def walk(function, stack, share, on_stack):
+        own_time, cumulative = raw[function][2], raw[function][3]
+        stack = stack + [_frame_label(function)]
+        if own_time * share > 0:
+            folded[';'.join(stack)] += own_time * share
+        for child, edge_cumulative in children.get(function, ()):
+            child_cumulative = raw[child][3]
+            if child in on_stack or child_cumulative <= 0 or cumulative <= 0:
+                continue
+            child_share = share * min(1.0, edge_cumulative / child_cumulative)
+            # Paths worth less than a microsecond are dropped; shared helpers would otherwise multiply them
+            if child_share * child_cumulative >= MIN_STACK_SECONDS:
+                walk(child, stack, child_share, on_stack | {child})
+
+    for function, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(function, [], 1.0, {function})
+
+    return [f"{stack} {max(1, round(seconds * 1e6))}" for stack, seconds in folded.most_common()]
+
+
+class ProfileSample:
+    """
+    One profiled request, used as a context manager. `tags` may be filled in
+    inside the block; the files are written when the block exits.
+    """
+
+    def __init__(self, profiler: 'RequestProfiler', kind: str, tags: Dict):
+        self.profiler = profiler
+        self.kind = kind
+        self.tags = tags
+        self._profile = cProfile.Profile()
+        self._started = 0.0
+
+    def __enter__(self) -> 'ProfileSample':
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._profile.disable()
+        self.tags['durationMs'] = round((time.perf_counter() - self._started) * 1000, 3)
+        if exc is not None:
+            self.tags['error'] = str(exc)
+        try:
+            self.profiler.write(self)
+        except OSError as e:
+            logger.error(f"Could not write request profile: {str(e)}")
+        return False
+
+
+class RequestProfiler:
+    """Profile a random `sample_rate` fraction of requests into `directory`, keeping the newest `keep`."""
+
+    def __init__(self, directory: str, sample_rate: float = DEFAULT_SAMPLE_RATE, keep: int = DEFAULT_KEEP,
+                 seed: Optional[int] = None):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._random = random.Random(seed)
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.samples = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def sample(self, kind: str, **tags) -> Optional[ProfileSample]:
+        """Return a `ProfileSample` for this request if it is picked for profiling, else None."""
+        with self._lock:
+            self.requests += 1
+            if self._random.random() >= self.sample_rate:
+                return None
+            self.samples += 1
+        return ProfileSample(self, kind, dict(tags))
+
+    def write(self, sample: ProfileSample):
+        """Write the .prof, .collapsed and .json files for a finished sample and rotate old ones."""
+        now = datetime.datetime.now()
+        name = f"{now:%Y%m%dT%H%M%S}{now.microsecond:06d}-{os.getpid()}-{next(self._sequence):06d}-{sample.kind}"
+        base = os.path.join(self.directory, name)
+
+        sample._profile.dump_stats(base + '.prof')
+        stats = pstats.Stats(sample._profile)
+        with open(base + '.collapsed', 'w') as f:
+            f.writelines(line + '\n' for line in collapsed_stacks(stats))
+        with open(base + '.json', 'w') as f:
+            json.dump({'kind': sample.kind, 'createdAt': now.isoformat(), 'pid': os.getpid(), **sample.tags}, f,
+                      default=str)
+        logger.info(f"Request profile written to {base}.prof ({sample.tags['durationMs']} ms)")
+        self._rotate()
+
+    def _rotate(self):
+        with self._lock:
+            dumps = sorted(name for name in os.listdir(self.directory) if name.endswith('.prof'))
+            for name in dumps[:max(0, len(dumps) - self.keep)]:
+                base = os.path.join(self.directory, name[:-len('.prof')])
+                for extension in ('.prof', '.collapsed', '.json'):
+                    try:
+                        os.remove(base + extension)
+                    except FileNotFoundError:
+                        pass
+
+    def stats(self) -> Dict:
+        """Return request and sample counters."""
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'sampleRate': self.sample_rate,
+                'requests': self.requests,
+                'samples': self.samples
+            }
@@ -0,0 +1,283 @@
+"""
+Flattened tree ensembles evaluated with NumPy.
+
+`compile_model` converts a fitted XGBoost or scikit-learn tree ensemble into a
+`CompiledTreeEnsemble`: every tree's nodes laid out in contiguous arrays
+(feature index, threshold, children, missing-value direction, leaf value).
+Its `predict` walks all trees for a whole batch at once, level by level, so
+predictions need neither the XGBoost runtime nor scikit-learn. Compiled
+ensembles are saved as .npz and can be passed anywhere a model path is
+accepted.
+"""
+import json
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# XGBoost objectives whose prediction is the raw margin
+_IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror', 'reg:quantileerror')
+
+
+class CompiledTreeEnsemble:
+    """
+    Tree ensemble stored as flat node arrays.
+
+    Internal nodes have `feature >= 0`; leaves have `feature == -1` and carry
+    their (already scaled) contribution in `value`. `roots` holds the first
+    node of each tree. With `strict` a sample goes left when x < threshold
+    (XGBoost), otherwise when x <= threshold (scikit-learn). NaN features
+    follow `default_left`. The prediction is `base` plus the sum of the leaf
+    values reached in each tree, divided by the number of trees when
+    `average` is set (random forests). With `float32_sum` the sum is carried
+    in float32 like XGBoost's predictor, otherwise in float64 like
+    scikit-learn's.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 base: float = 0.0, strict: bool = False, average: bool = False, float32_sum: bool = False,
+                 n_features: Optional[int] = None, source: str = ''):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.base = float(base)
+        self.strict = bool(strict)
+        self.average = bool(average)
+        self.float32_sum = bool(float32_sum)
+        self.n_features = n_features
+        self.source = source
+        self.max_depth = self._depth()
+
+        # Traversal arrays (native index width, so gathers need no conversion);
+        # a leaf sends every sample "left" to itself
+        leaf = self.feature < 0
+        self._step_feature = np.where(leaf, 0, self.feature).astype(np.intp)
+        self._step_threshold = np.where(leaf, np.inf, self.threshold)
+        self._step_default_left = self.default_left | leaf
+        self._step_left = np.where(leaf, np.arange(len(self.feature)), self.left).astype(np.intp)
+
+    def _depth(self) -> int:
+        # Walk all trees level by level until only leaves remain
+        frontier = self.roots
+        depth = 0
+        while len(frontier):
+            internal = frontier[self.feature[frontier] >= 0]
+            if not len(internal):
+                break
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+            depth += 1
+        return depth
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def predict(self, X) -> np.ndarray:
+        """Predict a (N, n_features) batch."""
+        # Both libraries compare float32 features against the thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_columns = X.shape
+        flat = X.reshape(-1)
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_columns)[:, None]
+        has_nan = bool(np.isnan(flat).any())
+        nodes = np.repeat(self.roots.astype(np.intp)[None, :], n_rows, axis=0)
+
+        # Leaves point to themselves, so every tree can take exactly max_depth steps
+        for _ in range(self.max_depth):
+            x = flat[row_offsets + self._step_feature[nodes]]
+            thresholds = self._step_threshold[nodes]
+            go_left = x < thresholds if self.strict else x <= thresholds
+            if has_nan:
+                go_left = np.where(np.isnan(x), self._step_default_left[nodes], go_left)
+            # Siblings are adjacent (right == left + 1)
+            nodes = self._step_left[nodes] + (~go_left)
+
+        # Accumulate trees in order (ufunc.accumulate is sequential) to match the libraries' summation
+        dtype = np.float32 if self.float32_sum else np.float64
+        leaf_values = np.concatenate([np.full((X.shape[0], 1), self.base, dtype=dtype),
+                                      self.value[nodes].astype(dtype, copy=False)], axis=1)
+        predictions = np.add.accumulate(leaf_values, axis=1)[:, -1]
+        if self.average:
+            predictions = predictions / self.n_trees
+        return predictions
+
+    def save(self, path: str):
+        """Write the node arrays and settings to a .npz file."""
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, value=self.value, roots=self.roots,
+            settings=np.array(json.dumps({
+                'base': self.base, 'strict': self.strict, 'average': self.average,
+                'float32Sum': self.float32_sum, 'nFeatures': self.n_features, 'source': self.source
+            }))
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledTreeEnsemble':
+        """Read an ensemble written by `save`."""
+        with np.load(path) as data:
+            settings = json.loads(str(data['settings']))
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'],
+                data['default_left'], data['value'], data['roots'],
+                base=settings['base'], strict=settings['strict'], average=settings['average'],
+                float32_sum=settings.get('float32Sum', False), n_features=settings['nFeatures'], source=settings['source']
+            )
+
+
+class _NodeBuffer:
+    """Collects trees into flat arrays, renumbering children to global indices."""
+
+    def __init__(self):
+        self.parts = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'default_left', 'value')}
+        self.roots = []
+        self.offset = 0
+
+    def add_tree(self, feature, threshold, left, right, default_left, value):
+        feature = np.asarray(feature, dtype=np.int64)
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        leaf = feature < 0
+
+        # Renumber breadth-first so the two children of a node are adjacent
+        order = [0]
+        for node in order:
+            if not leaf[node]:
+                order.extend((left[node], right[node]))
+        order = np.array(order, dtype=np.int64)
+        position = np.empty(len(feature), dtype=np.int64)
+        position[order] = np.arange(len(order))
+
+        leaf = leaf[order]
+        self.roots.append(self.offset)
+        self.parts['feature'].append(np.where(leaf, -1, feature[order]))
+        self.parts['threshold'].append(np.asarray(threshold, dtype=np.float64)[order])
+        self.parts['left'].append(np.where(leaf, -1, position[left[order]] + self.offset))
+        self.parts['right'].append(np.where(leaf, -1, position[right[order]] + self.offset))
+        self.parts['default_left'].append(np.asarray(default_left, dtype=bool)[order])
+        self.parts['value'].append(np.where(leaf, np.asarray(value, dtype=np.float64)[order], 0.0))
+        self.offset += len(order)
+
+    def build(self, **settings) -> CompiledTreeEnsemble:
+        arrays = {key: np.concatenate(parts) for key, parts in self.parts.items()}
+        return CompiledTreeEnsemble(roots=self.roots, **arrays, **settings)
+
+
+def _compile_xgboost(booster) -> CompiledTreeEnsemble:
+    config = json.loads(booster.save_config())
+    objective = config['learner']['objective']['name']
+    if objective not in _IDENTITY_OBJECTIVES:
+        raise ValueError(f"Unsupported XGBoost objective '{objective}'")
+
+    model = json.loads(booster.save_raw(raw_format='json'))
+    learner = model['learner']
+    booster_model = learner['gradient_booster']
+    if booster_model['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost booster '{booster_model['name']}'")
+    # Newer versions store base_score as a one-element list string such as "[5.2E0]"
+    base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+
+    buffer = _NodeBuffer()
+    for tree in booster_model['model']['trees']:
+        left = np.asarray(tree['left_children'])
+        leaf = left == -1
+        # XGBoost keeps a leaf's value (learning rate applied) in split_conditions
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+        buffer.add_tree(
+            feature=np.where(leaf, -1, tree['split_indices']),
+            threshold=conditions,
+            left=left,
+            right=np.asarray(tree['right_children']),
+            default_left=np.asarray(tree['default_left'], dtype=bool),
+            value=conditions
+        )
+    return buffer.build(base=base_score, strict=True, average=False, float32_sum=True,
+                        n_features=int(learner['learner_model_param']['num_feature']), source='xgboost')
+
+
+def _add_sklearn_tree(buffer: _NodeBuffer, tree, scale: float = 1.0):
+    tree = tree.tree_
+    if tree.n_outputs != 1:
+        raise ValueError("Only single-output trees are supported")
+    values = tree.value[:, 0, 0]
+    buffer.add_tree(
+        feature=tree.feature,
+        threshold=tree.threshold,
+        left=tree.children_left,
+        right=tree.children_right,
+        # scikit-learn >= 1.3 records where missing values go; older trees never see NaN
+        default_left=getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8)).astype(bool),
+        value=scale * values if scale != 1.0 else values
+    )
+
+
+def _compile_sklearn(model) -> CompiledTreeEnsemble:
+    name = type(model).__name__
+    buffer = _NodeBuffer()
+    n_features = getattr(model, 'n_features_in_', None)
+
+    if name in ('DecisionTreeRegressor', 'ExtraTreeRegressor'):
+        _add_sklearn_tree(buffer, model)
+        return buffer.build(base=0.0, n_features=n_features, source=name)
+
+    if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+        for estimator in model.estimators_:
+            _add_sklearn_tree(buffer, estimator)
+        return buffer.build(base=0.0, average=True, n_features=n_features, source=name)
+
+    if name == 'GradientBoostingRegressor':
+        init = model.init_
+        if init == 'zero':
+            base = 0.0
+        elif type(init).__name__ == 'DummyRegressor':
+            base = float(np.ravel(init.constant_)[0])
+        else:
+            raise ValueError(f"Unsupported GradientBoostingRegressor init '{type(init).__name__}'")
+        # predict_stages adds learning_rate * leaf value per stage; fold the scale into the leaves
+        for stage in model.estimators_[:, 0]:
+            _add_sklearn_tree(buffer, stage, model.learning_rate)
+        return buffer.build(base=base, n_features=n_features, source=name)
+
+    raise ValueError(f"Unsupported model type '{name}'")
+
+
+def compile_model(model) -> CompiledTreeEnsemble:
+    """Flatten a fitted XGBoost (XGBRegressor or Booster) or scikit-learn tree regressor."""
+    if isinstance(model, CompiledTreeEnsemble):
+        return model
+    if hasattr(model, 'get_booster'):
+        return _compile_xgboost(model.get_booster())
+    if type(model).__name__ == 'Booster' and hasattr(model, 'save_raw'):
+        return _compile_xgboost(model)
+    return _compile_sklearn(model)
+
+
+def check_parity(model, compiled: CompiledTreeEnsemble, X) -> Dict:
+    """Compare compiled predictions with the original model's on the rows of X."""
+    if type(model).__name__ == 'Booster':
+        import xgboost
+        expected = model.predict(xgboost.DMatrix(X))
+    else:
+        expected = model.predict(X)
+    expected = np.asarray(expected, dtype=np.float64).reshape(-1)
+    actual = compiled.predict(X)
+    difference = np.abs(actual - expected)
+    return {
+        'rows': int(len(expected)),
+        'maxAbsDiff': float(difference.max()) if len(difference) else 0.0,
+        'meanAbsDiff': float(difference.mean()) if len(difference) else 0.0,
+        'exactMatches': int(np.count_nonzero(difference == 0))
+    }
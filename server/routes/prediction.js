@@ -1,8 +1,60 @@
 const express = require('express');
-const { spawn } = require('child_process');
-const path = require('path');
+const { getPredictionPool } = require('../services/predictionWorkerPool');
+const tileRoutes = require('./tiles');
 const router = express.Router();
 
+router.use('/tiles', tileRoutes);
+
+// Optional response sections; mirrors OPTIONAL_FIELDS / DETAIL_LEVELS in groundwater_predictor.py
+const CORE_FIELDS = ['currentWaterLevel', 'futureWaterLevel', 'isSuitableForBorewell', 'location'];
+const OPTIONAL_FIELDS = [
+  'yearlyPredictions', 'suitabilityNote', 'seasonalAnalysis', 'drillingTimeline',
+  'bestDrillingTime', 'confidence', 'confidenceBreakdown', 'confidenceExplanation'
+];
+const DETAIL_LEVELS = ['minimal', 'summary', 'full'];
+// Mirrors MAX_FORECAST_YEARS in groundwater_predictor.py
+const MAX_FORECAST_YEARS = 20;
+
+// Read `fields` (array or comma-separated string) and `detail` from the body or query string
+const parseFieldOptions = (req) => {
+  const fields = req.body.fields !== undefined ? req.body.fields : req.query.fields;
+  const detail = req.body.detail !== undefined ? req.body.detail : req.query.detail;
+  const options = {};
+
+  if (fields !== undefined) {
+    const list = Array.isArray(fields) ? fields : String(fields).split(',').map((field) => field.trim()).filter(Boolean);
+    const unknown = list.filter((field) => !CORE_FIELDS.includes(field) && !OPTIONAL_FIELDS.includes(field));
+    if (unknown.length) {
+      return { error: `Unknown fields: ${unknown.join(', ')}` };
+    }
+    options.fields = list;
+  }
+
+  if (detail !== undefined) {
+    if (!DETAIL_LEVELS.includes(detail)) {
+      return { error: `Detail must be one of: ${DETAIL_LEVELS.join(', ')}` };
+    }
+    options.detail = detail;
+  }
+
+  // Prediction date for the model's temporal features (defaults to today)
+  const asOf = req.body.asOf !== undefined ? req.body.asOf : req.query.asOf;
+  if (asOf !== undefined) {
+    if (!/^\d{4}-\d{2}-\d{2}$/.test(String(asOf)) || Number.isNaN(Date.parse(asOf))) {
+      return { error: 'asOf must be a date in YYYY-MM-DD format' };
+    }
+    options.asOf = String(asOf);
+  }
+
+  // Per-stage timings are returned in data._timings (the result cache is bypassed)
+  const timings = req.body.timings !== undefined ? req.body.timings : req.query.timings;
+  if (timings === true || timings === 'true') {
+    options.timings = true;
+  }
+
+  return { options };
+};
+
 // Middleware to validate prediction request
 const validatePredictionRequest = (req, res, next) => {
   const { latitude, longitude } = req.body;
@@ -42,79 +94,25 @@ const validatePredictionRequest = (req, res, next) => {
 router.post('/groundwater', validatePredictionRequest, async (req, res) => {
   try {
     const { latitude, longitude } = req.body;
+    const { options, error: fieldError } = parseFieldOptions(req);
     
-    console.log(`Predicting groundwater for coordinates: ${latitude}, ${longitude}`);
+    if (fieldError) {
+      return res.status(400).json({
+        success: false,
+        message: fieldError
+      });
+    }
     
-    // Path to the Python script
-    const pythonScriptPath = path.join(__dirname, '..', 'ml_model', 'groundwater_predictor.py');
-    const modelPath = path.join(__dirname, '..', '..', '..', 'groundwater_model.pkl');
+    console.log(`Predicting groundwater for coordinates: ${latitude}, ${longitude}`);
     
-    // Create a promise to handle the Python script execution
-    const prediction = await new Promise((resolve, reject) => {
-      // Spawn Python process
-      const pythonProcess = spawn('python', [
-        '-c',
-        `
-import sys
-import json
-import os
-sys.path.append('${path.dirname(pythonScriptPath).replace(/\\/g, '\\\\')}')
-from groundwater_predictor import predict_groundwater
-
-try:
-    result = predict_groundwater(${latitude}, ${longitude}, '${modelPath.replace(/\\/g, '\\\\')}')
-    print(json.dumps(result))
-except Exception as e:
-    print(json.dumps({'success': False, 'error': str(e)}))
-        `
-      ]);
-      
-      let output = '';
-      let errorOutput = '';
-      
-      pythonProcess.stdout.on('data', (data) => {
-        output += data.toString();
-      });
-      
-      pythonProcess.stderr.on('data', (data) => {
-        errorOutput += data.toString();
-      });
-      
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          console.error('Python script error:', errorOutput);
-          reject(new Error(`Python script exited with code ${code}: ${errorOutput}`));
-          return;
-        }
-        
-        try {
-          // Parse the last line of output (should be JSON)
-          const lines = output.trim().split('\n');
-          const jsonOutput = lines[lines.length - 1];
-          const result = JSON.parse(jsonOutput);
-          resolve(result);
-        } catch (parseError) {
-          console.error('Failed to parse Python output:', output);
-          reject(new Error('Failed to parse prediction result'));
-        }
-      });
-      
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start Python process:', error);
-        reject(new Error('Failed to start prediction process'));
-      });
-      
-      // Set a timeout for the prediction (30 seconds)
-      setTimeout(() => {
-        pythonProcess.kill();
-        reject(new Error('Prediction timeout'));
-      }, 30000);
-    });
+    // Reuse a warm Python worker instead of starting an interpreter per request
+    const prediction = await getPredictionPool().predict(latitude, longitude, options);
     
     if (prediction.success) {
       res.json({
         success: true,
         data: prediction.data,
+        cache: prediction.cache,
         message: 'Groundwater prediction completed successfully'
       });
     } else {
@@ -136,11 +134,66 @@ except Exception as e:
   }
 });
 
+// Monthly water level forecast for one location, scored by the model for every month
+router.post('/forecast', validatePredictionRequest, async (req, res) => {
+  try {
+    const { latitude, longitude } = req.body;
+    const years = req.body.years !== undefined ? req.body.years : 5;
+    const { options, error: optionError } = parseFieldOptions(req);
+
+    if (optionError) {
+      return res.status(400).json({ success: false, message: optionError });
+    }
+    if (!Number.isInteger(years) || years < 1 || years > MAX_FORECAST_YEARS) {
+      return res.status(400).json({
+        success: false,
+        message: `Years must be an integer between 1 and ${MAX_FORECAST_YEARS}`
+      });
+    }
+
+    const forecast = await getPredictionPool().forecast(latitude, longitude, years, options);
+
+    if (forecast.success) {
+      res.json({
+        success: true,
+        data: forecast.data,
+        message: 'Groundwater forecast completed successfully'
+      });
+    } else {
+      console.error('Forecast failed:', forecast.error);
+      res.status(500).json({
+        success: false,
+        message: forecast.message || 'Forecast failed',
+        error: forecast.error
+      });
+    }
+  } catch (error) {
+    console.error('Forecast endpoint error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Internal server error during forecast',
+      error: process.env.NODE_ENV === 'development' ? error.message : undefined
+    });
+  }
+});
+
+// Stage latency histograms in Prometheus text format (workers need PREDICTION_STAGE_METRICS=true)
+router.get('/metrics', async (req, res) => {
+  try {
+    const metrics = await getPredictionPool().metrics();
+    res.type('text/plain; version=0.0.4').send(metrics);
+  } catch (error) {
+    console.error('Metrics endpoint error:', error);
+    res.status(500).type('text/plain').send('# metrics unavailable\n');
+  }
+});
+
 // Health check for prediction service
 router.get('/health', (req, res) => {
   res.json({
     success: true,
     message: 'Prediction service is running',
+    workers: getPredictionPool().stats(),
     timestamp: new Date().toISOString()
   });
 });
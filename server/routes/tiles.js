@@ -0,0 +1,50 @@
+const express = require('express');
+const { getPredictionPool } = require('../services/predictionWorkerPool');
+const router = express.Router();
+
+const TILE_LAYERS = ['water', 'suitability'];
+const MAX_TILE_ZOOM = 12;
+
+// Water-level and borewell-suitability map tiles: /:layer/:z/:x/:y.png
+router.get('/:layer/:z/:x/:y.png', async (req, res) => {
+  const { layer } = req.params;
+  const z = parseInt(req.params.z, 10);
+  const x = parseInt(req.params.x, 10);
+  const y = parseInt(req.params.y, 10);
+
+  if (!TILE_LAYERS.includes(layer)) {
+    return res.status(404).json({
+      success: false,
+      message: `Unknown tile layer. Use one of: ${TILE_LAYERS.join(', ')}`
+    });
+  }
+
+  const tileCount = 2 ** z;
+  if ([z, x, y].some(Number.isNaN) || z < 0 || z > MAX_TILE_ZOOM || x < 0 || x >= tileCount || y < 0 || y >= tileCount) {
+    return res.status(400).json({
+      success: false,
+      message: `Tile coordinates must be valid for zoom levels 0-${MAX_TILE_ZOOM}`
+    });
+  }
+
+  try {
+    // Cached tiles come straight off disk; missing ones are rendered in batches
+    const tile = await getPredictionPool().renderTile(layer, z, x, y);
+
+    res.set({
+      'Content-Type': 'image/png',
+      'Cache-Control': 'public, max-age=86400',
+      'X-Tile-Cache': tile.cached ? 'HIT' : 'MISS'
+    });
+    res.send(tile.png);
+  } catch (error) {
+    console.error('Tile rendering error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to render map tile',
+      error: process.env.NODE_ENV === 'development' ? error.message : undefined
+    });
+  }
+});
+
+module.exports = router;
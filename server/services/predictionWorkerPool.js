@@ -0,0 +1,358 @@
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+
+const ML_MODEL_DIR = path.join(__dirname, '..', 'ml_model');
+const DEFAULT_SCRIPT_PATH = path.join(ML_MODEL_DIR, 'groundwater_predictor.py');
+const DEFAULT_MODEL_PATH = path.join(__dirname, '..', '..', '..', 'groundwater_model.pkl');
+
+const DEFAULT_POOL_SIZE = 2;
+const DEFAULT_TIMEOUT_MS = 30000;
+const MAX_RESTART_DELAY_MS = 30000;
+const CLOSE_GRACE_MS = 2000;
+
+// Map tiles requested within this window are rendered by one worker call
+const TILE_BATCH_WINDOW_MS = 15;
+const MAX_TILES_PER_BATCH = 64;
+
+/**
+ * Keeps a fixed number of long-lived `groundwater_predictor.py worker`
+ * processes and spreads prediction requests across them.
+ *
+ * Workers speak newline-delimited JSON over stdin/stdout, so the Python
+ * interpreter, numpy and the model are loaded once per worker instead of
+ * once per request. A worker that exits or times out is restarted with
+ * exponential backoff and its in-flight requests are rejected.
+ */
+class PredictionWorkerPool {
+  constructor(options = {}) {
+    this.size = options.size || parseInt(process.env.PREDICTION_WORKERS, 10) || DEFAULT_POOL_SIZE;
+    this.pythonPath = options.pythonPath || process.env.PYTHON_PATH || 'python';
+    this.scriptPath = options.scriptPath || DEFAULT_SCRIPT_PATH;
+    this.modelPath = options.modelPath || process.env.GROUNDWATER_MODEL_PATH || DEFAULT_MODEL_PATH;
+    this.timeoutMs = options.timeoutMs || DEFAULT_TIMEOUT_MS;
+    this.resultCacheFile = options.resultCacheFile || process.env.PREDICTION_RESULT_CACHE_FILE || null;
+    this.trainingPointsPath = options.trainingPointsPath || process.env.TRAINING_POINTS_PATH || null;
+    this.stageMetrics = options.stageMetrics !== undefined
+      ? options.stageMetrics
+      : process.env.PREDICTION_STAGE_METRICS === 'true';
+    this.workerThreads = options.workerThreads || parseInt(process.env.PREDICTION_WORKER_THREADS, 10) || 1;
+    this.intraOpThreads = options.intraOpThreads || parseInt(process.env.PREDICTION_INTRA_OP_THREADS, 10) || null;
+    this.coalesceWindowMs = options.coalesceWindowMs || process.env.PREDICTION_COALESCE_WINDOW_MS || null;
+    this.profileDir = options.profileDir || process.env.PREDICTION_PROFILE_DIR || null;
+    this.profileSampleRate = options.profileSampleRate || process.env.PREDICTION_PROFILE_SAMPLE_RATE || null;
+
+    this.workers = [];
+    this.nextRequestId = 1;
+    this.started = false;
+    this.closed = false;
+    this.restarts = 0;
+
+    this.tileQueue = [];
+    this.tileTimer = null;
+  }
+
+  start() {
+    if (this.started) {
+      return this;
+    }
+    this.started = true;
+    for (let slot = 0; slot < this.size; slot++) {
+      this.workers[slot] = this._spawnWorker(slot, 0);
+    }
+    return this;
+  }
+
+  _spawnWorker(slot, crashCount) {
+    const args = [this.scriptPath, 'worker', '--model-path', this.modelPath];
+    if (this.trainingPointsPath) {
+      args.push('--training-points', this.trainingPointsPath);
+    }
+    if (this.resultCacheFile) {
+      // One file per slot so workers never overwrite each other's cache
+      args.push('--result-cache-file', `${this.resultCacheFile}.${slot}`);
+    }
+    if (this.stageMetrics) {
+      args.push('--stage-metrics');
+    }
+    if (this.workerThreads > 1) {
+      // Each worker serves this many requests at once from a thread pool
+      args.push('--threads', String(this.workerThreads));
+    }
+    if (this.intraOpThreads) {
+      args.push('--intra-op-threads', String(this.intraOpThreads));
+    }
+    if (this.coalesceWindowMs) {
+      // Concurrent single-point requests on a worker are scored in one model call
+      args.push('--coalesce-window-ms', String(this.coalesceWindowMs));
+    }
+    if (this.profileDir) {
+      // Profile a sample of requests with cProfile (dumps are rotated by the worker)
+      args.push('--profile-dir', this.profileDir);
+      if (this.profileSampleRate) {
+        args.push('--profile-sample-rate', String(this.profileSampleRate));
+      }
+    }
+
+    // BLAS/OpenMP pools read their size when the worker first imports numpy
+    const env = { ...process.env };
+    if (this.intraOpThreads) {
+      for (const variable of ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']) {
+        env[variable] = String(this.intraOpThreads);
+      }
+    }
+
+    const proc = spawn(this.pythonPath, args, {
+      cwd: ML_MODEL_DIR,
+      env,
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+
+    const worker = {
+      slot,
+      proc,
+      pending: new Map(),
+      ready: false,
+      alive: true,
+      crashCount,
+      startedAt: Date.now()
+    };
+
+    readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+      this._handleLine(worker, line);
+    });
+
+    // Writes to a worker that just died surface here; its exit handler cleans up
+    proc.stdin.on('error', (error) => {
+      console.error(`Prediction worker ${slot} stdin error:`, error.message);
+    });
+
+    proc.stderr.on('data', (data) => {
+      console.error(`[prediction worker ${slot}] ${data.toString().trim()}`);
+    });
+
+    proc.on('error', (error) => {
+      console.error(`Failed to start prediction worker ${slot}:`, error);
+      this._handleExit(worker);
+    });
+
+    proc.on('exit', (code, signal) => {
+      if (!this.closed) {
+        console.error(`Prediction worker ${slot} exited (code ${code}, signal ${signal})`);
+      }
+      this._handleExit(worker);
+    });
+
+    return worker;
+  }
+
+  _handleLine(worker, line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (parseError) {
+      console.error(`Prediction worker ${worker.slot} sent invalid output:`, line);
+      return;
+    }
+
+    if (message.ready) {
+      worker.ready = true;
+      worker.crashCount = 0;
+      return;
+    }
+
+    const request = worker.pending.get(message.id);
+    if (!request) {
+      return;
+    }
+    worker.pending.delete(message.id);
+    clearTimeout(request.timer);
+
+    delete message.id;
+    request.resolve(message);
+  }
+
+  _handleExit(worker) {
+    if (!worker.alive) {
+      return;
+    }
+    worker.alive = false;
+
+    for (const request of worker.pending.values()) {
+      clearTimeout(request.timer);
+      request.reject(new Error('Prediction worker exited before responding'));
+    }
+    worker.pending.clear();
+
+    if (this.closed) {
+      return;
+    }
+
+    // Back off on repeated crashes so a broken environment does not spin
+    const crashCount = worker.crashCount + 1;
+    const delay = Math.min(MAX_RESTART_DELAY_MS, 500 * 2 ** (crashCount - 1));
+    setTimeout(() => {
+      if (!this.closed) {
+        this.restarts++;
+        this.workers[worker.slot] = this._spawnWorker(worker.slot, crashCount);
+      }
+    }, delay);
+  }
+
+  _pickWorker() {
+    let best = null;
+    for (const worker of this.workers) {
+      if (!worker || !worker.alive) {
+        continue;
+      }
+      if (!best || worker.pending.size < best.pending.size) {
+        best = worker;
+      }
+    }
+    return best;
+  }
+
+  /**
+   * Send one request to the least busy worker and resolve with its JSON reply.
+   */
+  request(payload) {
+    this.start();
+
+    const worker = this._pickWorker();
+    if (!worker) {
+      return Promise.reject(new Error('No prediction workers available'));
+    }
+    return this._send(worker, payload);
+  }
+
+  _send(worker, payload) {
+    return new Promise((resolve, reject) => {
+      const id = this.nextRequestId++;
+      const timer = setTimeout(() => {
+        worker.pending.delete(id);
+        reject(new Error('Prediction timeout'));
+        // A worker that stops answering is replaced
+        worker.proc.kill();
+      }, this.timeoutMs);
+
+      worker.pending.set(id, { resolve, reject, timer });
+      worker.proc.stdin.write(JSON.stringify({ id, ...payload }) + '\n');
+    });
+  }
+
+  /**
+   * Resolve with the stage latency histograms of every live worker in
+   * Prometheus text format, each series labelled with its worker slot.
+   */
+  async metrics() {
+    this.start();
+
+    const workers = this.workers.filter((worker) => worker && worker.alive);
+    const replies = await Promise.all(
+      workers.map((worker) => this._send(worker, { metrics: true, labels: { worker: String(worker.slot) } }))
+    );
+
+    // All workers export the same metric family; keep one HELP/TYPE header
+    const lines = [];
+    replies.forEach((reply, index) => {
+      for (const line of reply.metrics.split('\n')) {
+        if (line && (index === 0 || !line.startsWith('#'))) {
+          lines.push(line);
+        }
+      }
+    });
+    return lines.join('\n') + '\n';
+  }
+
+  predict(latitude, longitude, options = {}) {
+    return this.request({ latitude, longitude, options });
+  }
+
+  predictBatch(coordinates, options = {}) {
+    return this.request({ coordinates, options });
+  }
+
+  // Monthly model forecast for one location; options may hold asOf (YYYY-MM-DD)
+  forecast(latitude, longitude, years, options = {}) {
+    return this.request({ latitude, longitude, forecast: { years }, options });
+  }
+
+  /**
+   * Resolve with the PNG buffer for one map tile. Tiles requested together
+   * while the map is panned are coalesced into a single worker request, so
+   * the worker renders all missing tiles with one model call.
+   */
+  renderTile(layer, z, x, y) {
+    return new Promise((resolve, reject) => {
+      this.tileQueue.push({ tile: { layer, z, x, y }, resolve, reject });
+      if (!this.tileTimer) {
+        this.tileTimer = setTimeout(() => this._flushTiles(), TILE_BATCH_WINDOW_MS);
+      }
+    });
+  }
+
+  _flushTiles() {
+    this.tileTimer = null;
+    const queued = this.tileQueue;
+    this.tileQueue = [];
+
+    for (let start = 0; start < queued.length; start += MAX_TILES_PER_BATCH) {
+      const batch = queued.slice(start, start + MAX_TILES_PER_BATCH);
+      this.request({ tiles: batch.map((entry) => entry.tile) })
+        .then((result) => {
+          if (!result.success) {
+            throw new Error(result.error || 'Tile rendering failed');
+          }
+          batch.forEach((entry, index) => {
+            const tile = result.tiles[index];
+            entry.resolve({ png: Buffer.from(tile.png, 'base64'), cached: tile.cached });
+          });
+        })
+        .catch((error) => {
+          batch.forEach((entry) => entry.reject(error));
+        });
+    }
+  }
+
+  stats() {
+    return {
+      size: this.size,
+      threadsPerWorker: this.workerThreads,
+      restarts: this.restarts,
+      workers: this.workers.map((worker) => ({
+        slot: worker.slot,
+        pid: worker.proc.pid,
+        alive: worker.alive,
+        ready: worker.ready,
+        pending: worker.pending.size,
+        uptimeMs: Date.now() - worker.startedAt
+      }))
+    };
+  }
+
+  close() {
+    this.closed = true;
+    for (const worker of this.workers) {
+      if (worker && worker.alive) {
+        // Closing stdin lets the worker save its caches and exit on its own
+        worker.proc.stdin.end();
+        setTimeout(() => worker.proc.kill(), CLOSE_GRACE_MS).unref();
+      }
+    }
+  }
+}
+
+let sharedPool = null;
+
+// Lazily create the process-wide pool used by the prediction routes
+const getPredictionPool = () => {
+  if (!sharedPool) {
+    sharedPool = new PredictionWorkerPool().start();
+  }
+  return sharedPool;
+};
+
+module.exports = {
+  PredictionWorkerPool,
+  getPredictionPool
+};
@@ -992,6 +992,9 @@ except Exception as e:
   }
 });
 
+// Groundwater map tiles, rendered by the persistent prediction workers
+app.use('/api/prediction/tiles', require('./server/routes/tiles'));
+
 // Health check for prediction service
 app.get('/api/prediction/health', (req, res) => {
   res.json({